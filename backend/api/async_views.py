@@ -0,0 +1,211 @@
+"""ASGI-native read endpoints for the hottest list views.
+
+These mirror the DRF views they shadow but run on the event loop with the
+async ORM, so a single daphne worker can keep many slow database reads in
+flight instead of parking each one on a thread-pool slot. They spend the
+same throttle budgets as the viewset actions they mirror.
+"""
+
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .models import Comment, Project, ProjectMember, Task
+from .renderers import ORJSONRenderer
+from .serializers import FastCommentSerializer, FastTaskListSerializer
+from .services import ProjectService, UserService
+from .viewsets import CommentViewSet, ProjectViewSet, TaskViewSet
+
+_jwt = JWTAuthentication()
+_renderer = ORJSONRenderer()
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    return HttpResponse(
+        _renderer.render(data), status=status, content_type="application/json"
+    )
+
+
+def error_response(exc: exceptions.APIException) -> HttpResponse:
+    response = json_response({"detail": exc.detail}, status=exc.status_code)
+    if getattr(exc, "wait", None):
+        response["Retry-After"] = "%d" % exc.wait
+    return response
+
+
+async def authenticate(request: HttpRequest) -> Optional[User]:
+    """JWT authentication without the thread hop of JWTAuthentication.get_user"""
+    header = _jwt.get_header(request)
+    if header is None:
+        return None
+    raw_token = _jwt.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = _jwt.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+
+    user_id = token.get(settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id"))
+    try:
+        user = await User.objects.aget(id=user_id)
+    except User.DoesNotExist:
+        return None
+    return user if user.is_active else None
+
+
+async def is_member(user: User, project_id: Any) -> bool:
+    """Membership of a project that is not being deleted"""
+    return (
+        await ProjectMember.objects.filter(project_id=project_id, user=user)
+        .exclude(project__status="deleting")
+        .aexists()
+    )
+
+
+@sync_to_async
+def check_throttles(
+    request: HttpRequest, user: User, viewset: type, action: str, **kwargs: Any
+) -> Optional[HttpResponse]:
+    """Runs the throttles of the mirrored viewset action; returns the 429"""
+    drf_request = Request(request)
+    drf_request.user = user
+    view = viewset(action=action, kwargs=kwargs, request=drf_request)
+    try:
+        view.check_throttles(drf_request)
+    except exceptions.Throttled as exc:
+        return error_response(exc)
+    return None
+
+
+async def paginate(request: HttpRequest, queryset, serializer) -> Dict[str, Any]:
+    """PageNumberPagination-compatible envelope"""
+    page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+
+    count = await queryset.acount()
+    offset = (page - 1) * page_size
+    rows = [row async for row in queryset[offset : offset + page_size]]
+
+    def link(number: int) -> str:
+        query = request.GET.copy()
+        query["page"] = number
+        return request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+
+    return {
+        "count": count,
+        "next": link(page + 1) if offset + page_size < count else None,
+        "previous": link(page - 1) if page > 1 else None,
+        "results": serializer.render(rows),
+    }
+
+
+@require_GET
+async def me(request: HttpRequest) -> HttpResponse:
+    user = await authenticate(request)
+    if user is None:
+        return error_response(exceptions.NotAuthenticated())
+    return json_response(
+        {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+        }
+    )
+
+
+@require_GET
+async def project_board(request: HttpRequest, project_id: int) -> HttpResponse:
+    """Async-версия /projects/{id}/board/ с тем же ETag"""
+    user = await authenticate(request)
+    if user is None:
+        return error_response(exceptions.NotAuthenticated())
+    throttled = await check_throttles(
+        request, user, ProjectViewSet, "board", pk=project_id
+    )
+    if throttled is not None:
+        return throttled
+    if not await is_member(user, project_id):
+        return error_response(exceptions.NotFound())
+
+    project = await Project.objects.only("id", "title", "status").aget(id=project_id)
+    generation = await sync_to_async(ProjectService.get_generation)(project.id)
+    profiles = await sync_to_async(UserService.get_profiles_generation)()
+    etag = f'"board-{project.id}-{generation}-{profiles}"'
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = json_response(
+        await ProjectService.aget_board(project, generation, profiles)
+    )
+    response["ETag"] = etag
+    return response
+
+
+@require_GET
+async def task_list(request: HttpRequest) -> HttpResponse:
+    """Async-версия /tasks/?project= (обязательный фильтр по проекту)"""
+    user = await authenticate(request)
+    if user is None:
+        return error_response(exceptions.NotAuthenticated())
+
+    throttled = await check_throttles(request, user, TaskViewSet, "list")
+    if throttled is not None:
+        return throttled
+    project_id = request.GET.get("project")
+    if not project_id or not project_id.isdigit():
+        return error_response(exceptions.ValidationError({"project": "required"}))
+    if not await is_member(user, project_id):
+        return error_response(exceptions.PermissionDenied())
+
+    queryset = Task.objects.filter(project_id=project_id).order_by(
+        "order", "-created_at"
+    )
+    for field in ["status", "priority"]:
+        if request.GET.get(field):
+            queryset = queryset.filter(**{field: request.GET[field]})
+    if request.GET.get("assignee", "").isdigit():
+        queryset = queryset.filter(assignee_id=request.GET["assignee"])
+
+    serializer = FastTaskListSerializer()
+    return json_response(await paginate(request, serializer.rows(queryset), serializer))
+
+
+@require_GET
+async def comment_list(request: HttpRequest) -> HttpResponse:
+    """Async-версия /comments/?task="""
+    user = await authenticate(request)
+    if user is None:
+        return error_response(exceptions.NotAuthenticated())
+
+    throttled = await check_throttles(request, user, CommentViewSet, "list")
+    if throttled is not None:
+        return throttled
+    task_id = request.GET.get("task")
+    if not task_id or not task_id.isdigit():
+        return error_response(exceptions.ValidationError({"task": "required"}))
+    task = await Task.objects.only("project_id").filter(id=task_id).afirst()
+    if task is None or not await is_member(user, task.project_id):
+        return error_response(exceptions.NotFound())
+
+    serializer = FastCommentSerializer()
+    queryset = serializer.rows(
+        Comment.objects.filter(task_id=task_id).order_by("-created_at")
+    )
+    return json_response(await paginate(request, queryset, serializer))
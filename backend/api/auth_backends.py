@@ -0,0 +1,31 @@
+from typing import Any, Optional
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+from .hashing import verify_password
+
+
+class PreloadedUserBackend(ModelBackend):
+    """``authenticate(request, user=..., password=...)`` for a user the caller
+    already loaded (the login view finds it by email). Skips ModelBackend's
+    second lookup and checks the password on the hashing pool; may raise
+    ``HashingPoolSaturated`` or ``TimeoutError``.
+    """
+
+    def authenticate(
+        self,
+        request: Any,
+        user: Optional[User] = None,
+        password: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Optional[User]:
+        if user is None or password is None:
+            return None
+        valid, rehashed = verify_password(password, user.password)
+        if rehashed:
+            user.password = rehashed
+            user.save(update_fields=["password"])
+        if valid and self.user_can_authenticate(user):
+            return user
+        return None
@@ -1,10 +1,27 @@
 from rest_framework import status, serializers
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+from .hashing import HashingPoolSaturated, hash_password
+from .services import UserService
+from .throttling import AuthIPThrottle, LoginAccountThrottle
+from .tokens import RevocableRefreshToken, TokenRevocation
+
+
+def hashing_unavailable() -> Response:
+    response = Response(
+        {"detail": "Сервер перегружен, повторите попытку позже"},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+    response["Retry-After"] = "1"
+    return response
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -21,7 +38,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         return data
 
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if UserService.by_email(value).exists():
             raise serializers.ValidationError()
         return value
 
@@ -29,13 +46,20 @@ class RegisterSerializer(serializers.ModelSerializer):
         validated_data.pop("password_confirm")
         email = validated_data["email"]
         username = email.split("@")[0]
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=validated_data["password"],
+        # Same fields as create_user(), with the hash computed on the pool
+        user = User(
+            username=User.normalize_username(username),
+            email=User.objects.normalize_email(email),
+            password=hash_password(validated_data["password"]),
             first_name=validated_data.get("first_name", ""),
             last_name=validated_data.get("last_name", ""),
         )
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # A concurrent sign-up won the race past validate_email
+            raise serializers.ValidationError({"email": "Email уже используется"})
         return user
 
 
@@ -46,10 +70,14 @@ class LoginSerializer(serializers.Serializer):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle])
 def register(request):
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
-        user = serializer.save()
+        try:
+            user = serializer.save()
+        except (HashingPoolSaturated, TimeoutError):
+            return hashing_unavailable()
         refresh = RefreshToken.for_user(user)
         return Response(
             {
@@ -72,6 +100,7 @@ def register(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([AuthIPThrottle, LoginAccountThrottle])
 def login(request):
     serializer = LoginSerializer(data=request.data)
     if not serializer.is_valid():
@@ -81,18 +110,27 @@ def login(request):
     password = serializer.validated_data["password"]
 
     try:
-        user = User.objects.get(email=email)
+        # .get() rather than .first(): ORDER BY id could steer the planner
+        # away from the email index
+        user = UserService.by_email(email).get()
     except User.DoesNotExist:
         return Response(
             {"detail": "Пользователь с таким email не найден"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    user = authenticate(username=user.username, password=password)
+    # The row is already loaded: PreloadedUserBackend checks the password
+    # without a second lookup; failures send user_login_failed as usual
+    try:
+        user = authenticate(request, user=user, password=password)
+    except (HashingPoolSaturated, TimeoutError):
+        return hashing_unavailable()
     if user is None:
+        LoginAccountThrottle.record_failure(email)
         return Response(
             {"detail": "Неверный email или пароль"}, status=status.HTTP_401_UNAUTHORIZED
         )
+    LoginAccountThrottle.reset(email)
 
     refresh = RefreshToken.for_user(user)
     return Response(
@@ -138,14 +176,22 @@ def logout(request):
             {"detail": "Refresh токен обязателен"}, status=status.HTTP_400_BAD_REQUEST
         )
     try:
-        token = RefreshToken(refresh_token)
-        token.blacklist()
-        return Response({"detail": "Вы успешно вышли"}, status=status.HTTP_200_OK)
-    except Exception:
+        token = RevocableRefreshToken(refresh_token)
+    except TokenError:
+        return Response(
+            {"detail": "Недействительный токен"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    if str(token[api_settings.USER_ID_CLAIM]) != str(request.user.pk):
         return Response(
             {"detail": "Недействительный токен"}, status=status.HTTP_400_BAD_REQUEST
         )
 
+    TokenRevocation.revoke(token)
+    # Also ends WebSocket sessions authenticated with this access token
+    if request.auth is not None:
+        TokenRevocation.revoke(request.auth)
+    return Response({"detail": "Вы успешно вышли"}, status=status.HTTP_200_OK)
+
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -157,7 +203,7 @@ def refresh_token(request):
             {"detail": "Требуется refresh токен"}, status=status.HTTP_400_BAD_REQUEST
         )
     try:
-        refresh = RefreshToken(refresh_token)
+        refresh = RevocableRefreshToken(refresh_token)
         return Response(
             {"access": str(refresh.access_token)}, status=status.HTTP_200_OK
         )
@@ -0,0 +1,528 @@
+"""Redis cache backend, value encoding, two-tier caching and memory reporting.
+
+Values are stored as msgpack (``CompactSerializer``) and zstd-compressed
+above ``COMPRESS_MIN_LENGTH`` bytes (``ZstdCompressor``), both configured
+in ``CACHES["default"]["OPTIONS"]``. Cached values must therefore be plain
+data: dicts, lists, strings, numbers, datetimes, Decimals and UUIDs.
+
+``TwoTierCache`` puts a bounded per-process LRU in front of Redis for
+small read models that are read far more often than they change.
+Invalidations are broadcast over Redis pub/sub to every process.
+
+``get_or_compute`` caches expensive computations without stampedes.
+"""
+
+import asyncio
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+import msgpack
+import pyzstd
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+from redis.exceptions import LockError, ResponseError
+
+from .db_routers import primary_reads
+from .profiling import cache_tier_metrics, record_cache_access
+
+_MISSING = object()
+
+# msgpack extension type codes for values msgpack has no native type for
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+_EXT_UUID = 4
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class ProfiledRedisCache(RedisCache):
+    """RedisCache that reports hits/misses to the active request profile"""
+
+    def get(
+        self,
+        key: Any,
+        default: Any = None,
+        version: Optional[int] = None,
+        client: Any = None,
+    ) -> Any:
+        value = super().get(key, _MISSING, version, client)
+        if value is _MISSING:
+            record_cache_access(0, 1)
+            return default
+        record_cache_access(1, 0)
+        return value
+
+    def get_many(self, keys: Iterable[Any], *args: Any, **kwargs: Any) -> Dict:
+        keys = list(keys)
+        values = super().get_many(keys, *args, **kwargs)
+        record_cache_access(len(values), len(keys) - len(values))
+        return values
+
+    def clear(self) -> bool:
+        # Local tiers would otherwise keep serving what was just flushed
+        cleared = super().clear()
+        get_invalidation_listener().clear_all(broadcast=True)
+        return cleared
+
+
+def _pack_default(value: Any) -> msgpack.ExtType:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    raise TypeError(f"Cannot cache {type(value).__name__}; cache plain data")
+
+
+def _unpack_ext(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+class CompactSerializer(BaseSerializer):
+    """msgpack instead of pickle: smaller, faster to load and unable to
+    smuggle ORM objects into the cache. Tuples come back as lists."""
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_pack_default)
+
+    def loads(self, value: bytes) -> Any:
+        return msgpack.unpackb(
+            value, ext_hook=_unpack_ext, raw=False, strict_map_key=False
+        )
+
+
+class ZstdCompressor(BaseCompressor):
+    """zstd for values over COMPRESS_MIN_LENGTH bytes; smaller ones are
+    stored as is, where compression saves little and costs a round trip
+    through the codec on every hit"""
+
+    def __init__(self, options: Dict[str, Any]) -> None:
+        super().__init__(options)
+        self.min_length = options.get("COMPRESS_MIN_LENGTH", 1024)
+        self.level = options.get("COMPRESS_LEVEL", 3)
+
+    def compress(self, value: bytes) -> bytes:
+        if len(value) > self.min_length:
+            return pyzstd.compress(value, self.level)
+        return value
+
+    def decompress(self, value: bytes) -> bytes:
+        if not value.startswith(_ZSTD_MAGIC):
+            raise CompressorError("Value is not compressed")
+        try:
+            return pyzstd.decompress(value)
+        except pyzstd.ZstdError as e:
+            raise CompressorError from e
+
+
+class InvalidationListener:
+    """Subscribes to INVALIDATION_CHANNEL and evicts local tiers.
+
+    Local tiers serve only while ``ready`` is set: from the confirmed
+    subscription until the connection drops. Every (re)subscription clears
+    them, since messages may have been missed in between.
+    """
+
+    CHANNEL = "cache:invalidate"
+    ALL = "*"
+
+    def __init__(self) -> None:
+        self.pid = os.getpid()
+        self.ready = threading.Event()
+        self._caches: Dict[str, "TwoTierCache"] = {}
+        threading.Thread(
+            target=self._listen, name="cache-invalidation", daemon=True
+        ).start()
+
+    def register(self, two_tier: "TwoTierCache") -> None:
+        self._caches[two_tier.name] = two_tier
+
+    def publish(self, name: str, key: str) -> None:
+        get_redis_connection("default").publish(self.CHANNEL, f"{name}:{key}")
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_connection("default").pubsub()
+                pubsub.subscribe(self.CHANNEL)
+                while True:
+                    # Shorter than the socket timeout, so idle is not an error
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    if message["type"] == "subscribe":
+                        self.clear_all()
+                        self.ready.set()
+                    elif message["type"] == "message":
+                        name, _, key = message["data"].decode().partition(":")
+                        if name == self.ALL:
+                            self.clear_all()
+                        elif name in self._caches:
+                            self._caches[name].evict_local(key)
+            except Exception:
+                self.ready.clear()
+                self.clear_all()
+                time.sleep(1)
+
+    def clear_all(self, broadcast: bool = False) -> None:
+        for two_tier in list(self._caches.values()):
+            two_tier.clear_local()
+        if broadcast:
+            self.publish(self.ALL, "")
+
+
+_listener: Optional[InvalidationListener] = None
+_listener_lock = threading.Lock()
+
+
+def get_invalidation_listener() -> InvalidationListener:
+    """One listener per process; a forked worker starts its own"""
+    global _listener
+    if _listener is None or _listener.pid != os.getpid():
+        with _listener_lock:
+            if _listener is None or _listener.pid != os.getpid():
+                _listener = InvalidationListener()
+    return _listener
+
+
+class TwoTierCache:
+    """Per-process LRU (``LOCAL_CACHE_MAX_ENTRIES``, ``LOCAL_CACHE_SECONDS``)
+    over the Redis cache. Values must be treated as read-only: local hits
+    return the same object to every caller.
+
+    Each key has a version counter in Redis that ``invalidate()`` bumps.
+    Redis entries are stored with the version read before ``load()`` ran, so
+    a load that raced an invalidation is never served afterwards, and a
+    local entry is not kept if an eviction arrived while it was loading.
+    """
+
+    def __init__(self, name: str, timeout: int = 300) -> None:
+        self.name = name
+        self.timeout = timeout
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._registered_pid: Optional[int] = None
+
+    def get_or_set(self, key: Any, load: Callable[[], Any]) -> Any:
+        key = str(key)
+        listener = self._listener()
+        local = listener.ready.is_set()
+        if local:
+            with self._lock:
+                entry = self._local.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._local.move_to_end(key)
+                    cache_tier_metrics.observe(self.name, "local", True)
+                    record_cache_access(1, 0)
+                    return entry[1]
+                evictions = self._evictions
+            cache_tier_metrics.observe(self.name, "local", False)
+
+        version_key, redis_key = self._version_key(key), self._redis_key(key)
+        found = cache.get_many([version_key, redis_key])
+        version = found.get(version_key)
+        if version is None:
+            version = self._seed_version(version_key)
+        stored = found.get(redis_key)
+        hit = stored is not None and stored[0] == version
+        cache_tier_metrics.observe(self.name, "redis", hit)
+        if hit:
+            value = stored[1]
+        else:
+            value = load()
+            cache.set(redis_key, [version, value], self.timeout)
+
+        if local:
+            with self._lock:
+                if self._evictions != evictions:
+                    return value
+                self._local[key] = (
+                    time.monotonic() + settings.LOCAL_CACHE_SECONDS,
+                    value,
+                )
+                self._local.move_to_end(key)
+                while len(self._local) > settings.LOCAL_CACHE_MAX_ENTRIES:
+                    self._local.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Any) -> None:
+        key = str(key)
+        version_key = self._version_key(key)
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            self._seed_version(version_key)
+        cache.delete(self._redis_key(key))
+        self.evict_local(key)
+        self._listener().publish(self.name, key)
+
+    def evict_local(self, key: str) -> None:
+        with self._lock:
+            self._evictions += 1
+            self._local.pop(key, None)
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._evictions += 1
+            self._local.clear()
+
+    def _listener(self) -> InvalidationListener:
+        listener = get_invalidation_listener()
+        if self._registered_pid != listener.pid:
+            listener.register(self)
+            self._registered_pid = listener.pid
+        return listener
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.name}_{key}"
+
+    def _version_key(self, key: str) -> str:
+        return f"{self.name}_version_{key}"
+
+    @staticmethod
+    def _seed_version(version_key: str) -> int:
+        # From the clock, so an evicted counter never reuses old versions
+        version = int(time.time() * 1000)
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+        return version
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int,
+    stale_timeout: int = 0,
+    beta: float = 1.0,
+) -> Any:
+    """``compute()`` cached under ``key`` for ``timeout`` seconds, without
+    letting concurrent callers recompute it all at once:
+
+    - Misses are single-flight. One caller computes under a Redis lock and
+      the others wait for its result. If the holder gives up (``compute()``
+      raised), the next waiter to take the lock computes. Callers compute
+      unlocked only when the lock stays taken for CACHE_COMPUTE_WAIT_SECONDS.
+    - Probabilistic early refresh (XFetch). A read refreshes the entry ahead
+      of its expiry with a probability that grows as expiry nears and with
+      how long the computation took. A hot key is then recomputed by one
+      caller before it expires, not by all of them after.
+    - Stale-while-revalidate. For ``stale_timeout`` seconds after expiry the
+      old value is still served while the lock holder recomputes.
+
+    ``compute()`` reads from the primary database, since its result is
+    served to every caller until the key changes.
+    """
+    entry = cache.get(key)
+    lock = _compute_lock(key)
+    if entry is not None:
+        if not _should_refresh(entry, beta):
+            return entry["value"]
+        if not lock.acquire(blocking=False):
+            return entry["value"]
+        return _compute_and_store(key, compute, timeout, stale_timeout, lock)
+
+    deadline = time.monotonic() + settings.CACHE_COMPUTE_WAIT_SECONDS
+    waited = False
+    while not lock.acquire(blocking=False):
+        if time.monotonic() >= deadline:
+            return _compute_and_store(key, compute, timeout, stale_timeout)
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]
+        waited = True
+    if waited:
+        # The holder may have stored the value just before releasing
+        entry = cache.get(key)
+        if entry is not None:
+            _release(lock)
+            return entry["value"]
+    return _compute_and_store(key, compute, timeout, stale_timeout, lock)
+
+
+async def aget_or_compute(
+    key: str,
+    compute: Callable[[], Awaitable[Any]],
+    timeout: int,
+    stale_timeout: int = 0,
+    beta: float = 1.0,
+) -> Any:
+    """``get_or_compute`` for async views, with a coroutine ``compute``"""
+    entry = await cache.aget(key)
+    lock = _compute_lock(key)
+    acquire = sync_to_async(lock.acquire)
+    if entry is not None:
+        if not _should_refresh(entry, beta):
+            return entry["value"]
+        if not await acquire(blocking=False):
+            return entry["value"]
+    else:
+        deadline = time.monotonic() + settings.CACHE_COMPUTE_WAIT_SECONDS
+        waited = False
+        while not await acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                lock = None
+                break
+            await asyncio.sleep(0.05)
+            entry = await cache.aget(key)
+            if entry is not None:
+                return entry["value"]
+            waited = True
+        if waited and lock is not None:
+            entry = await cache.aget(key)
+            if entry is not None:
+                await sync_to_async(_release)(lock)
+                return entry["value"]
+
+    try:
+        started = time.monotonic()
+        with primary_reads():
+            value = await compute()
+        await cache.aset(
+            key,
+            _entry(value, timeout, time.monotonic() - started),
+            timeout + stale_timeout,
+        )
+        return value
+    finally:
+        if lock is not None:
+            await sync_to_async(_release)(lock)
+
+
+def _should_refresh(entry: Dict[str, Any], beta: float) -> bool:
+    # 1 - random() is in (0, 1], so the log is defined and never positive
+    jitter = -entry["delta"] * beta * math.log(1.0 - random.random())
+    return time.time() + jitter >= entry["expires"]
+
+
+def _compute_lock(key: str) -> Any:
+    return get_redis_connection("default").lock(
+        f"lock:{key}", timeout=settings.CACHE_COMPUTE_LOCK_SECONDS
+    )
+
+
+def _entry(value: Any, timeout: int, delta: float) -> Dict[str, Any]:
+    return {"value": value, "expires": time.time() + timeout, "delta": delta}
+
+
+def _compute_and_store(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int,
+    stale_timeout: int,
+    lock: Any = None,
+) -> Any:
+    try:
+        started = time.monotonic()
+        with primary_reads():
+            value = compute()
+        cache.set(
+            key,
+            _entry(value, timeout, time.monotonic() - started),
+            timeout + stale_timeout,
+        )
+        return value
+    finally:
+        if lock is not None:
+            _release(lock)
+
+
+def _release(lock: Any) -> None:
+    try:
+        lock.release()
+    except LockError:
+        # Expired while computing; another caller may hold it by now
+        pass
+
+
+def key_prefix(key: str) -> str:
+    """``:1:project_board_5_17`` -> ``project_board``,
+    ``throttle:user:3:read:29`` -> ``throttle:user``"""
+    key = re.sub(r"^:\d+:", "", key)
+    parts = []
+    for part in re.split(r"([_:])", key):
+        if any(char.isdigit() for char in part):
+            break
+        parts.append(part)
+    return "".join(parts).strip("_:") or key
+
+
+def memory_by_prefix(batch: int = 500) -> List[Dict[str, Any]]:
+    """Keys, stored value bytes and Redis memory per key prefix, largest
+    first. Walks the cache database with SCAN, so it is safe on a live
+    server. ``memory`` is None where MEMORY USAGE is unavailable."""
+    connection = get_redis_connection("default")
+    report: Dict[str, Dict[str, Any]] = defaultdict(
+        lambda: {"keys": 0, "value_bytes": 0, "memory": 0}
+    )
+    with_memory: Optional[bool] = None
+    keys: List[bytes] = []
+
+    def measure() -> None:
+        nonlocal with_memory
+        if with_memory is None:
+            try:
+                connection.memory_usage(keys[0])
+                with_memory = True
+            except ResponseError:
+                with_memory = False
+        pipe = connection.pipeline(transaction=False)
+        for key in keys:
+            pipe.type(key)
+            pipe.strlen(key)
+            if with_memory:
+                pipe.memory_usage(key)
+        results = iter(pipe.execute(raise_on_error=False))
+        for key in keys:
+            kind, length = next(results), next(results)
+            entry = report[key_prefix(key.decode(errors="replace"))]
+            entry["keys"] += 1
+            if kind == b"string":
+                entry["value_bytes"] += length
+            if with_memory:
+                entry["memory"] += next(results) or 0
+            else:
+                entry["memory"] = None
+        keys.clear()
+
+    for key in connection.scan_iter(count=batch):
+        keys.append(key)
+        if len(keys) >= batch:
+            measure()
+    if keys:
+        measure()
+
+    return sorted(
+        ({"prefix": prefix, **entry} for prefix, entry in report.items()),
+        key=lambda entry: (entry["memory"] or 0, entry["value_bytes"]),
+        reverse=True,
+    )
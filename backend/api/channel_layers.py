@@ -0,0 +1,63 @@
+import bisect
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+from channels_redis.core import RedisChannelLayer
+
+
+def host_identity(host: Dict[str, Any]) -> str:
+    """Stable name for a decoded channels_redis host entry"""
+    address = host.get("address")
+    if address:
+        return str(address)
+    return ",".join(f"{key}={host[key]}" for key in sorted(host))
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes.
+
+    Nodes are keyed by their identity rather than their position in the
+    host list, so adding or removing a shard only moves the groups that
+    hashed to it (about 1/N of them) instead of reshuffling every range.
+    """
+
+    def __init__(self, nodes: List[str], replicas: int = 160):
+        self.nodes = nodes
+        points: List[Tuple[int, int]] = []
+        for index, node in enumerate(nodes):
+            for replica in range(replicas):
+                points.append((self._hash(f"{node}#{replica}"), index))
+        points.sort()
+        self._points = [point for point, _ in points]
+        self._indexes = [index for _, index in points]
+
+    def get_index(self, value: Any) -> int:
+        if len(self.nodes) == 1:
+            return 0
+        position = bisect.bisect(self._points, self._hash(value))
+        return self._indexes[position % len(self._points)]
+
+    @staticmethod
+    def _hash(value: Any) -> int:
+        if isinstance(value, str):
+            value = value.encode("utf8")
+        return int.from_bytes(hashlib.md5(value).digest()[:8], "big")
+
+
+class ConsistentHashRedisChannelLayer(RedisChannelLayer):
+    """RedisChannelLayer that places ``project_{id}``/``user_{id}`` groups and
+    process-specific channels on shards via a consistent hash ring.
+
+    The stock layer maps a CRC bucket onto contiguous index ranges, so
+    growing the shard list remaps most group memberships while sockets are
+    connected. Configure it with one entry per Redis instance in ``hosts``.
+    """
+
+    def __init__(self, *args, ring_replicas: int = 160, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ring = HashRing(
+            [host_identity(host) for host in self.hosts], replicas=ring_replicas
+        )
+
+    def consistent_hash(self, value):
+        return self.ring.get_index(value)
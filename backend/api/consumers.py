@@ -1,10 +1,20 @@
+import asyncio
 import json
+import logging
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
+from .services import PresenceService
+
+logger = logging.getLogger(__name__)
 
 
 class ProjectConsumer(AsyncWebsocketConsumer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flush_tasks = set()
+
     async def connect(self):
         self.project_id = self.scope["url_route"]["kwargs"]["project_id"]
         self.room_group_name = f"project_{self.project_id}"
@@ -17,13 +27,20 @@ class ProjectConsumer(AsyncWebsocketConsumer):
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        self.is_present = True
+        await self.update_presence(PresenceService.join)
 
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        if getattr(self, "is_present", False):
+            await self.update_presence(PresenceService.leave)
 
     async def receive(self, text_data):
         try:
             data = json.loads(text_data)
+            if isinstance(data, dict) and data.get("type") == "heartbeat":
+                await self.update_presence(PresenceService.heartbeat)
+                return
             await self.channel_layer.group_send(
                 self.room_group_name, {"type": "project.broadcast", "message": data}
             )
@@ -56,6 +73,42 @@ class ProjectConsumer(AsyncWebsocketConsumer):
         """Когда участник удалён из проекта"""
         await self.send_json("member.removed", {"user_id": event.get("user_id")})
 
+    async def project_deleted(self, event):
+        """Проект удалён целиком (одно событие вместо task.deleted на каждую задачу)"""
+        await self.send_json("project.deleted", {"id": event.get("project_id")})
+
+    async def presence_diff(self, event):
+        """Пакет изменений списка зрителей доски: {joined: [...], left: [...]}"""
+        await self.send_json("presence.diff", event.get("diff"))
+
+    async def update_presence(self, operation):
+        """Обновляет присутствие; первый изменивший за интервал планирует рассылку"""
+        should_flush = await sync_to_async(operation)(
+            self.project_id, self.user.id, self.channel_name
+        )
+        if should_flush:
+            # The event loop only keeps weak references to tasks
+            task = asyncio.create_task(self.flush_presence(self.project_id))
+            self.flush_tasks.add(task)
+            task.add_done_callback(self.flush_done)
+
+    def flush_done(self, task):
+        self.flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Presence flush for project %s failed",
+                self.project_id,
+                exc_info=task.exception(),
+            )
+
+    async def flush_presence(self, project_id):
+        await asyncio.sleep(PresenceService.BROADCAST_INTERVAL)
+        diff = await sync_to_async(PresenceService.flush)(project_id)
+        if diff:
+            await self.channel_layer.group_send(
+                f"project_{project_id}", {"type": "presence.diff", "diff": diff}
+            )
+
     async def send_json(self, event_type: str, data):
         """Отправляет сообщение в формате {'type': ..., 'data': ...}"""
         await self.send(text_data=json.dumps({"type": event_type, "data": data}))
@@ -69,7 +122,7 @@ class ProjectConsumer(AsyncWebsocketConsumer):
             return False
 
         return ProjectMember.objects.filter(
-            project_id=self.project_id, user=self.user
+            project_id=self.project_id, user_id=self.user.id
         ).exists()
 
 
@@ -87,6 +140,15 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "unread_count",
+                    "data": {"count": await self.get_unread_count()},
+                }
+            )
+        )
+
     async def disconnect(self, close_code):
         if hasattr(self, "room_group_name"):
             await self.channel_layer.group_discard(
@@ -98,3 +160,10 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         await self.send(
             text_data=json.dumps({"type": "notification", "data": event.get("message")})
         )
+
+    @database_sync_to_async
+    def get_unread_count(self) -> int:
+        """Счётчик непрочитанных из кэша (пересчитывается при промахе)"""
+        from .services import NotificationService
+
+        return NotificationService.get_unread_count(self.user.id)
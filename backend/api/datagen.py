@@ -0,0 +1,230 @@
+"""Synthetic datasets for benchmarks and load tests.
+
+Rows are written in batches with ``bulk_create``; on PostgreSQL the leaf
+tables (comments and history) are streamed with ``COPY`` instead. Model
+signals do not fire, so seeding produces no realtime events or
+notifications.
+"""
+
+import csv
+import io
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .models import Comment, Project, ProjectMember, Task, TaskHistory
+
+STATUS_WEIGHTS = {"todo": 35, "in_progress": 25, "review": 10, "done": 30}
+PRIORITY_WEIGHTS = {"low": 25, "medium": 45, "high": 22, "urgent": 8}
+ROLE_WEIGHTS = {"member": 70, "viewer": 30}
+HISTORY_FIELDS = ["status", "priority", "assignee", "title"]
+
+# Share of tasks with no deadline, and of the rest, the share already past it
+NO_DEADLINE_SHARE = 0.25
+PAST_DEADLINE_SHARE = 0.2
+UNASSIGNED_SHARE = 0.15
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 1000
+    projects: int = 100
+    members_per_project: int = 10
+    tasks_per_project: int = 1000
+    comments_per_task: float = 2.0
+    history_per_task: float = 3.0
+    batch_size: int = 5000
+    seed: int = 0
+    prefix: str = "seed"
+
+
+class DatasetGenerator:
+    """Writes a ``DatasetSpec`` worth of rows, one project at a time"""
+
+    def __init__(
+        self, spec: DatasetSpec, progress: Optional[Callable[[str], None]] = None
+    ):
+        self.spec = spec
+        self.progress = progress or (lambda message: None)
+        self.random = random.Random(spec.seed)
+        self.now = timezone.now()
+        self.counts = dict.fromkeys(
+            ["users", "projects", "members", "tasks", "comments", "history"], 0
+        )
+
+    def generate(self) -> Dict[str, int]:
+        user_ids = self.create_users()
+        for index in range(self.spec.projects):
+            with transaction.atomic():
+                self.create_project(index, user_ids)
+            if (index + 1) % 10 == 0 or index + 1 == self.spec.projects:
+                self.progress(
+                    f"{index + 1}/{self.spec.projects} projects, {self.counts}"
+                )
+        return self.counts
+
+    def create_users(self) -> List[int]:
+        prefix = self.spec.prefix
+        # Hashing once keeps seeding fast; every user logs in with "password"
+        password = make_password("password")
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{prefix}-{index}",
+                    email=f"{prefix}-{index}@example.com",
+                    first_name=f"User{index}",
+                    password=password,
+                )
+                for index in range(self.spec.users)
+            ],
+            batch_size=self.spec.batch_size,
+        )
+        self.counts["users"] = self.spec.users
+        return list(
+            User.objects.filter(username__startswith=f"{prefix}-")
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def create_project(self, index: int, user_ids: List[int]) -> None:
+        team = self.random.sample(
+            user_ids, min(self.spec.members_per_project, len(user_ids))
+        )
+        owner_id, others = team[0], team[1:]
+        project = Project.objects.create(
+            title=f"{self.spec.prefix} project {index}", owner_id=owner_id
+        )
+        roles = {owner_id: "owner"}
+        roles.update({user_id: self.pick(ROLE_WEIGHTS) for user_id in others})
+        ProjectMember.objects.bulk_create(
+            [
+                ProjectMember(project=project, user_id=user_id, role=role)
+                for user_id, role in roles.items()
+            ]
+        )
+        self.counts["projects"] += 1
+        self.counts["members"] += len(roles)
+
+        writers = [user_id for user_id, role in roles.items() if role != "viewer"]
+        tasks = Task.objects.bulk_create(
+            [
+                self.build_task(project, position, team, writers)
+                for position in range(self.spec.tasks_per_project)
+            ],
+            batch_size=self.spec.batch_size,
+        )
+        self.counts["tasks"] += len(tasks)
+
+        comments, history = [], []
+        for task in tasks:
+            for number in range(self.amount(self.spec.comments_per_task)):
+                comments.append(self.comment_row(task, number, team))
+            for _ in range(self.amount(self.spec.history_per_task)):
+                history.append(self.history_row(task, writers))
+        self.write(Comment, comments)
+        self.write(TaskHistory, history)
+        self.counts["comments"] += len(comments)
+        self.counts["history"] += len(history)
+
+    def build_task(
+        self, project: Project, position: int, team: List[int], writers: List[int]
+    ) -> Task:
+        deadline = None
+        if self.random.random() >= NO_DEADLINE_SHARE:
+            if self.random.random() < PAST_DEADLINE_SHARE:
+                deadline = self.now - timedelta(days=self.random.uniform(1, 30))
+            else:
+                deadline = self.now + timedelta(days=self.random.uniform(1, 60))
+        assignee_id = None
+        if self.random.random() >= UNASSIGNED_SHARE:
+            assignee_id = self.random.choice(team)
+        return Task(
+            project=project,
+            title=f"Task {position} in {project.title}",
+            description=f"Generated task {position}",
+            status=self.pick(STATUS_WEIGHTS),
+            priority=self.pick(PRIORITY_WEIGHTS),
+            deadline=deadline,
+            assignee_id=assignee_id,
+            created_by_id=self.random.choice(writers),
+            order=position,
+        )
+
+    def comment_row(self, task: Task, number: int, team: List[int]) -> Dict[str, Any]:
+        created_at = self.now - timedelta(minutes=self.random.uniform(0, 60 * 24 * 90))
+        return {
+            "task_id": task.id,
+            "author_id": self.random.choice(team),
+            "content": f"Comment {number} on {task.title}",
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    def history_row(self, task: Task, writers: List[int]) -> Dict[str, Any]:
+        field_name = self.random.choice(HISTORY_FIELDS)
+        if field_name == "status":
+            old_value, new_value = "todo", task.status
+        elif field_name == "priority":
+            old_value, new_value = "medium", task.priority
+        elif field_name == "assignee":
+            old_value, new_value = "", str(task.assignee_id or "")
+        else:
+            old_value, new_value = "Untitled", task.title
+        return {
+            "task_id": task.id,
+            "project_id": task.project_id,
+            "changed_by_id": self.random.choice(writers),
+            "field_name": field_name,
+            "old_value": old_value,
+            "new_value": new_value,
+            "changed_at": self.now
+            - timedelta(minutes=self.random.uniform(0, 60 * 24 * 90)),
+        }
+
+    def write(self, model: Type[models.Model], rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if connection.vendor == "postgresql":
+            self.copy(model, rows)
+        else:
+            model.objects.bulk_create(
+                [model(**row) for row in rows], batch_size=self.spec.batch_size
+            )
+
+    @staticmethod
+    def copy(model: Type[models.Model], rows: List[Dict[str, Any]]) -> None:
+        """Streams rows through ``COPY ... FROM STDIN`` (psycopg2)"""
+        attnames = list(rows[0])
+        buffer = io.StringIO()
+        # Quoted strings keep '' distinct from NULL in CSV COPY
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows:
+            writer.writerow(
+                [
+                    value.isoformat() if hasattr(value, "isoformat") else value
+                    for value in row.values()
+                ]
+            )
+        buffer.seek(0)
+        columns = ", ".join(
+            connection.ops.quote_name(model._meta.get_field(name).column)
+            for name in attnames
+        )
+        table = connection.ops.quote_name(model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+
+    def pick(self, weights: Dict[str, int]) -> str:
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def amount(self, mean: float) -> int:
+        """Per-row count spread uniformly around ``mean``"""
+        return round(self.random.uniform(0, 2 * mean))
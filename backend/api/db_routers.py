@@ -0,0 +1,91 @@
+"""Read-replica routing.
+
+Reads go to ``default`` unless they run inside ``replica_reads()``. The
+viewsets enter it for their ``replica_actions``. Values computed for the
+shared cache are read inside ``primary_reads()`` instead. A user who wrote within
+REPLICA_STICKY_SECONDS is pinned to the primary for their requests, so
+they read their own writes despite replication lag.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+@dataclass
+class ReadRouting:
+    pinned: bool = False
+
+
+_read_routing: ContextVar[Optional[ReadRouting]] = ContextVar(
+    "read_routing", default=None
+)
+
+
+@contextmanager
+def replica_reads() -> Iterator[ReadRouting]:
+    """Routes ORM reads in this context to a replica; nesting reuses the outer one"""
+    routing = _read_routing.get()
+    if routing is not None:
+        yield routing
+        return
+    routing = ReadRouting()
+    token = _read_routing.set(routing)
+    try:
+        yield routing
+    finally:
+        _read_routing.reset(token)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Routes ORM reads in this context to the primary, even inside
+    ``replica_reads()``. For data cached for every reader: a lagging replica
+    would otherwise be frozen in the cache."""
+    token = _read_routing.set(ReadRouting(pinned=True))
+    try:
+        yield
+    finally:
+        _read_routing.reset(token)
+
+
+def pin_to_primary() -> None:
+    routing = _read_routing.get()
+    if routing is not None:
+        routing.pinned = True
+
+
+def mark_recent_write(user_id: int) -> None:
+    cache.set(_sticky_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def has_recent_write(user_id: int) -> bool:
+    return bool(cache.get(_sticky_key(user_id)))
+
+
+def _sticky_key(user_id: int) -> str:
+    return f"db_sticky_{user_id}"
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        routing = _read_routing.get()
+        if routing is None or routing.pinned or not settings.DATABASE_REPLICAS:
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        return "default"
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> Optional[bool]:
+        # Replicas receive schema changes through replication
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,22 @@
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django_filters import rest_framework as filters
+
+from .models import Task
+
+
+class TaskFilter(filters.FilterSet):
+    overdue = filters.BooleanFilter(method="filter_overdue")
+
+    class Meta:
+        model = Task
+        fields = ["project", "status", "priority", "assignee"]
+
+    def filter_overdue(self, queryset: QuerySet, name: str, value: bool) -> QuerySet:
+        if value:
+            return queryset.overdue()
+        return queryset.filter(
+            Q(deadline__isnull=True)
+            | Q(deadline__gte=timezone.now())
+            | Q(status="done")
+        )
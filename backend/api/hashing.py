@@ -0,0 +1,72 @@
+"""Password hashing on a bounded worker pool.
+
+PBKDF2 takes a request worker for hundreds of milliseconds, so a burst of
+logins would otherwise occupy every worker and starve the rest of the API.
+Hashing runs on a small thread pool instead (``hashlib.pbkdf2_hmac``
+releases the GIL). When the pool and its queue are full, callers fail at
+once with ``HashingPoolSaturated`` and the views answer 503.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashingPoolSaturated(Exception):
+    pass
+
+
+class HashingPool:
+    def __init__(self, workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        # Running plus queued jobs; released when a job finishes, even if
+        # its caller already gave up waiting
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def run(
+        self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None
+    ) -> Any:
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout)
+
+
+@lru_cache(maxsize=None)
+def get_hashing_pool() -> HashingPool:
+    return HashingPool(
+        settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE
+    )
+
+
+def hash_password(raw_password: str) -> str:
+    return get_hashing_pool().run(
+        make_password, raw_password, timeout=settings.PASSWORD_HASHING_TIMEOUT
+    )
+
+
+def verify_password(raw_password: str, encoded: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, rehashed): ``rehashed`` is set when the stored hash
+    uses outdated parameters and should be saved (no DB access in the pool)"""
+    return get_hashing_pool().run(
+        _verify, raw_password, encoded, timeout=settings.PASSWORD_HASHING_TIMEOUT
+    )
+
+
+def _verify(raw_password: str, encoded: str) -> Tuple[bool, Optional[str]]:
+    rehashed: List[str] = []
+    valid = check_password(
+        raw_password, encoded, setter=lambda raw: rehashed.append(make_password(raw))
+    )
+    return valid, rehashed[0] if rehashed else None
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import memory_by_prefix
+
+
+class Command(BaseCommand):
+    help = "Report Redis keys, stored value bytes and memory per cache key prefix"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        report = memory_by_prefix(options["batch_size"])
+        self.stdout.write(
+            f"{'prefix':<32}{'keys':>10}{'value bytes':>14}{'memory':>14}"
+        )
+        for entry in report[: options["top"]]:
+            memory = "n/a" if entry["memory"] is None else entry["memory"]
+            self.stdout.write(
+                f"{entry['prefix']:<32}{entry['keys']:>10}"
+                f"{entry['value_bytes']:>14}{memory:>14}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{sum(entry['keys'] for entry in report)} keys in "
+                f"{len(report)} prefixes"
+            )
+        )
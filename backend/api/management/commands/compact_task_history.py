@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.services import TaskHistoryService
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact old per-field TaskHistory rows into per-save TaskHistoryArchive rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TASK_HISTORY_RETENTION_DAYS,
+            help="Keep per-field rows newer than this many days",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options["days"])
+        compacted = TaskHistoryService.compact_history(before, options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compacted {compacted} history rows older than {before}"
+            )
+        )
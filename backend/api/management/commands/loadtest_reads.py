@@ -0,0 +1,100 @@
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+# (label, sync path, async path); {project} and {task} are filled from options
+ENDPOINTS = [
+    ("me", "/api/auth/me/", "/api/async/auth/me/"),
+    (
+        "board",
+        "/api/projects/{project}/board/",
+        "/api/async/projects/{project}/board/",
+    ),
+    ("tasks", "/api/tasks/?project={project}", "/api/async/tasks/?project={project}"),
+    ("comments", "/api/comments/?task={task}", "/api/async/comments/?task={task}"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare latency of the sync DRF read endpoints and their async "
+        "counterparts against a running server"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--token", required=True, help="JWT access token")
+        parser.add_argument("--project", type=int, required=True)
+        parser.add_argument("--task", type=int, required=True)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--only", choices=[label for label, _, _ in ENDPOINTS], default=None
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            "Run the server with the worker count under test, e.g. "
+            "`daphne -p 8000 config.asgi:application` (one worker) vs "
+            "`ASGI_THREADS=<n> daphne ...` for the sync thread pool.\n"
+        )
+        self.stdout.write(
+            f"{'endpoint':<10} {'mode':<6} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for label, sync_path, async_path in ENDPOINTS:
+            if options["only"] and label != options["only"]:
+                continue
+            for mode, path in [("sync", sync_path), ("async", async_path)]:
+                url = path.format(project=options["project"], task=options["task"])
+                result = asyncio.run(self.run_endpoint(url, options))
+                self.stdout.write(
+                    f"{label:<10} {mode:<6} {result['rps']:>8.1f} "
+                    f"{result['p50']:>8.1f} {result['p95']:>8.1f} "
+                    f"{result['p99']:>8.1f} {result['errors']:>7}"
+                )
+
+    async def run_endpoint(self, url: str, options) -> Dict[str, float]:
+        latencies: List[float] = []
+        errors = 0
+        remaining = options["requests"]
+        headers = {"Authorization": f"Bearer {options['token']}"}
+
+        async with httpx.AsyncClient(
+            base_url=options["base_url"],
+            headers=headers,
+            timeout=30,
+            limits=httpx.Limits(max_connections=options["concurrency"]),
+        ) as client:
+
+            async def worker():
+                nonlocal remaining, errors
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(options["concurrency"])))
+            elapsed = time.perf_counter() - started
+
+        if not latencies:
+            raise CommandError("No requests were made")
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {
+            "rps": len(latencies) / elapsed,
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "p99": percentiles[98],
+            "errors": errors,
+        }
@@ -0,0 +1,214 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+import uuid
+from typing import Dict, List
+
+import httpx
+from asgiref.sync import sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import Project, ProjectMember, Task
+
+TITLE_PREFIX = "loadtest"
+
+
+class Command(BaseCommand):
+    help = (
+        "In-process WebSocket fan-out benchmark: N clients on ws/projects/<id>/ "
+        "receive task updates driven through the REST API"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=20,
+            help="Distinct project members; clients are spread across them",
+        )
+        parser.add_argument("--updates", type=int, default=50)
+        parser.add_argument(
+            "--rate", type=float, default=20, help="REST updates per second"
+        )
+        parser.add_argument(
+            "--layer",
+            choices=["settings", "memory", "redis"],
+            default="settings",
+            help=(
+                "Channel layer to run against "
+                "(settings = CHANNEL_LAYERS as configured)"
+            ),
+        )
+        parser.add_argument("--redis-url", default="redis://127.0.0.1:6379/2")
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        layers = {
+            "memory": {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+            "redis": {
+                "default": {
+                    "BACKEND": "api.channel_layers.ConsistentHashRedisChannelLayer",
+                    "CONFIG": {"hosts": [options["redis_url"]]},
+                }
+            },
+        }
+        if options["layer"] in layers:
+            with override_settings(CHANNEL_LAYERS=layers[options["layer"]]):
+                result = asyncio.run(self.run(options))
+        else:
+            result = asyncio.run(self.run(options))
+
+        self.stdout.write(
+            f"clients: {options['clients']}  updates: {options['updates']}  "
+            f"layer: {options['layer']}"
+        )
+        self.stdout.write(
+            f"delivered: {result['delivered']}/{result['expected']}  "
+            f"throughput: {result['throughput']:.0f} msg/s"
+        )
+        self.stdout.write(
+            "event latency ms: "
+            f"p50 {result['p50']:.1f}  p95 {result['p95']:.1f}  p99 {result['p99']:.1f}"
+        )
+        self.stdout.write(f"REST update p50 ms: {result['rest_p50']:.1f}")
+        self.stdout.write(
+            f"memory per connection: {result['memory_per_client'] / 1024:.1f} KiB"
+        )
+
+    async def run(self, options) -> Dict[str, float]:
+        from config.asgi import application
+
+        owner, project, task, tokens = await sync_to_async(self.create_fixtures)(
+            options
+        )
+        communicators: List[WebsocketCommunicator] = []
+        receivers: List[asyncio.Task] = []
+        try:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            for index in range(options["clients"]):
+                communicator = WebsocketCommunicator(
+                    application,
+                    f"/ws/projects/{project.id}/?token={tokens[index % len(tokens)]}",
+                )
+                connected, _ = await communicator.connect(timeout=options["timeout"])
+                if not connected:
+                    raise CommandError(f"Client {index} was rejected")
+                communicators.append(communicator)
+            memory_per_client = (
+                tracemalloc.get_traced_memory()[0] - baseline
+            ) / options["clients"]
+            tracemalloc.stop()
+
+            sent: Dict[int, float] = {}
+            latencies: List[float] = []
+            expected = options["updates"] * options["clients"]
+            done = asyncio.Event()
+
+            async def receive(communicator: WebsocketCommunicator):
+                while True:
+                    message = await communicator.receive_json_from(
+                        timeout=options["timeout"]
+                    )
+                    if message.get("type") != "task.updated":
+                        continue
+                    seq = int(message["data"]["title"].rsplit(" ", 1)[-1])
+                    latencies.append((time.perf_counter() - sent[seq]) * 1000)
+                    if len(latencies) >= expected:
+                        done.set()
+
+            receivers = [asyncio.create_task(receive(c)) for c in communicators]
+            rest_latencies = await self.drive_updates(
+                application, owner, task, sent, options
+            )
+            try:
+                await asyncio.wait_for(done.wait(), options["timeout"])
+            except asyncio.TimeoutError:
+                pass
+            elapsed = time.perf_counter() - min(sent.values())
+        finally:
+            for receiver in receivers:
+                receiver.cancel()
+            await asyncio.gather(*receivers, return_exceptions=True)
+            for communicator in communicators:
+                await communicator.disconnect()
+            await sync_to_async(self.delete_fixtures)(project)
+
+        if not latencies:
+            raise CommandError("No task.updated events were delivered")
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {
+            "delivered": len(latencies),
+            "expected": expected,
+            "throughput": len(latencies) / elapsed,
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "p99": percentiles[98],
+            "rest_p50": statistics.median(rest_latencies),
+            "memory_per_client": memory_per_client,
+        }
+
+    async def drive_updates(self, application, owner, task, sent, options):
+        """PATCHes the task title with a sequence number clients echo back"""
+        latencies = []
+        interval = 1 / options["rate"]
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(owner)}"}
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=application),
+            base_url="http://localhost",
+            headers=headers,
+        ) as client:
+            for seq in range(options["updates"]):
+                started = sent[seq] = time.perf_counter()
+                response = await client.patch(
+                    f"/api/tasks/{task.id}/", json={"title": f"{TITLE_PREFIX} {seq}"}
+                )
+                if response.status_code != 200:
+                    raise CommandError(
+                        f"Update failed: {response.status_code} {response.text}"
+                    )
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(max(0, interval - (time.perf_counter() - started)))
+        return latencies
+
+    @staticmethod
+    def create_fixtures(options):
+        run_id = uuid.uuid4().hex[:8]
+        User.objects.bulk_create(
+            [
+                User(username=f"{TITLE_PREFIX}-{run_id}-{index}")
+                for index in range(options["users"])
+            ]
+        )
+        users = list(
+            User.objects.filter(username__startswith=f"{TITLE_PREFIX}-{run_id}-")
+        )
+        owner = users[0]
+        project = Project.objects.create(title=f"{TITLE_PREFIX} {run_id}", owner=owner)
+        ProjectMember.objects.bulk_create(
+            [
+                ProjectMember(
+                    project=project,
+                    user=user,
+                    role="owner" if user == owner else "member",
+                )
+                for user in users
+            ]
+        )
+        task = Task.objects.create(
+            project=project, title=f"{TITLE_PREFIX} start", created_by=owner
+        )
+        tokens = [str(AccessToken.for_user(user)) for user in users]
+        return owner, project, task, tokens
+
+    @staticmethod
+    def delete_fixtures(project):
+        user_ids = list(project.members.values_list("user_id", flat=True))
+        project.delete()
+        User.objects.filter(id__in=user_ids).delete()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Project
+from api.services import ProjectDeletionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Finish deletions of projects left in the 'deleting' status, e.g. after "
+        "the process running the background deletion was restarted"
+    )
+
+    def handle(self, *args, **options):
+        project_ids = list(
+            Project.objects.filter(status="deleting").values_list("id", flat=True)
+        )
+        for project_id in project_ids:
+            progress = ProjectDeletionService.run(project_id)
+            self.stdout.write(
+                f"Project {project_id}: {progress['tasks_deleted']} tasks deleted"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Finished {len(project_ids)} project deletions")
+        )
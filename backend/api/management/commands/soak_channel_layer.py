@@ -0,0 +1,185 @@
+import asyncio
+import shutil
+import statistics
+import subprocess
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import redis
+from django.core.management.base import BaseCommand, CommandError
+
+from api.channel_layers import ConsistentHashRedisChannelLayer, HashRing
+
+
+class Command(BaseCommand):
+    help = (
+        "Soak the sharded channel layer: fan group messages out to simulated "
+        "sockets and report events/sec and delivery latency per shard count"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hosts",
+            default="",
+            help="Comma-separated Redis URLs to shard over; when omitted, "
+            "local redis-server stand-ins are started from --base-port",
+        )
+        parser.add_argument("--base-port", type=int, default=6390)
+        parser.add_argument("--shards", default="1,2,4")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--groups", type=int, default=100)
+        parser.add_argument("--sockets", type=int, default=5)
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument(
+            "--concurrency", type=int, default=20, help="In-flight group_send calls"
+        )
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        shard_counts = [int(count) for count in options["shards"].split(",")]
+        hosts = [url for url in options["hosts"].split(",") if url]
+
+        with self.redis_stand_ins(hosts, max(shard_counts), options) as hosts:
+            if len(hosts) < max(shard_counts):
+                raise CommandError(
+                    f"{max(shard_counts)} shards requested, {len(hosts)} hosts given"
+                )
+            self.stdout.write(
+                f"{'shards':>6} {'events/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+                f"{'p99 ms':>8} {'lost':>6} {'remapped':>9}  groups per shard"
+            )
+            previous = None
+            for count in shard_counts:
+                result = asyncio.run(self.run_soak(hosts[:count], options))
+                remapped = self.remapped_fraction(previous, hosts[:count], options)
+                previous = hosts[:count]
+                self.stdout.write(
+                    f"{count:>6} {result['rate']:>9.0f} {result['p50']:>8.2f} "
+                    f"{result['p95']:>8.2f} {result['p99']:>8.2f} "
+                    f"{result['lost']:>6} {remapped:>9}  {result['distribution']}"
+                )
+
+    async def run_soak(self, hosts: List[str], options) -> Dict[str, object]:
+        prefix = f"soak-{uuid.uuid4().hex[:8]}"
+        expected = options["messages"] * options["sockets"]
+        layers = [
+            ConsistentHashRedisChannelLayer(
+                hosts=hosts, prefix=prefix, capacity=options["messages"]
+            )
+            for _ in range(options["workers"])
+        ]
+
+        channels = []
+        for group in range(options["groups"]):
+            for socket in range(options["sockets"]):
+                layer = layers[(group * options["sockets"] + socket) % len(layers)]
+                channel = await layer.new_channel()
+                await layer.group_add(f"project_{group}", channel)
+                channels.append((layer, channel))
+
+        latencies: List[float] = []
+        done = asyncio.Event()
+
+        async def receive(layer, channel):
+            while True:
+                message = await layer.receive(channel)
+                latencies.append((time.perf_counter() - message["sent"]) * 1000)
+                if len(latencies) >= expected:
+                    done.set()
+
+        receivers = [asyncio.create_task(receive(*pair)) for pair in channels]
+        started = time.perf_counter()
+        sender = layers[0]
+        step = options["concurrency"]
+        for batch_start in range(0, options["messages"], step):
+            batch = range(batch_start, min(batch_start + step, options["messages"]))
+            await asyncio.gather(
+                *(
+                    sender.group_send(
+                        f"project_{index % options['groups']}",
+                        {"type": "soak.event", "sent": time.perf_counter()},
+                    )
+                    for index in batch
+                )
+            )
+        try:
+            await asyncio.wait_for(done.wait(), options["timeout"])
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - started
+
+        for task in receivers:
+            task.cancel()
+        await asyncio.gather(*receivers, return_exceptions=True)
+        distribution = [0] * len(hosts)
+        for group in range(options["groups"]):
+            distribution[sender.consistent_hash(f"project_{group}")] += 1
+        await sender.flush()
+        for layer in layers[1:]:
+            await layer.close_pools()
+
+        if not latencies:
+            raise CommandError("No messages were delivered")
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        return {
+            "rate": len(latencies) / elapsed,
+            "p50": percentiles[49],
+            "p95": percentiles[94],
+            "p99": percentiles[98],
+            "lost": expected - len(latencies),
+            "distribution": distribution,
+        }
+
+    @staticmethod
+    def remapped_fraction(previous, hosts: List[str], options) -> str:
+        """Share of groups whose shard changed since the previous host list"""
+        if previous is None:
+            return "-"
+        before, after = HashRing(previous), HashRing(hosts)
+        moved = sum(
+            previous[before.get_index(f"project_{group}")]
+            != hosts[after.get_index(f"project_{group}")]
+            for group in range(options["groups"])
+        )
+        return f"{moved / options['groups']:.0%}"
+
+    @contextmanager
+    def redis_stand_ins(self, hosts: List[str], count: int, options) -> Iterator:
+        if hosts:
+            yield hosts
+            return
+        if shutil.which("redis-server") is None:
+            raise CommandError("redis-server not found; pass --hosts instead")
+
+        processes = []
+        try:
+            for offset in range(count):
+                port = options["base_port"] + offset
+                processes.append(
+                    subprocess.Popen(
+                        ["redis-server", "--port", str(port), "--save", ""],
+                        stdout=subprocess.DEVNULL,
+                    )
+                )
+                self.wait_for_redis(port)
+            yield [
+                f"redis://127.0.0.1:{options['base_port'] + offset}/0"
+                for offset in range(count)
+            ]
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+    @staticmethod
+    def wait_for_redis(port: int) -> None:
+        client = redis.Redis(port=port)
+        for _ in range(50):
+            try:
+                client.ping()
+                return
+            except redis.ConnectionError:
+                time.sleep(0.1)
+        raise CommandError(f"redis-server on port {port} did not start")
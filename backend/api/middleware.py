@@ -1,9 +1,20 @@
 import jwt
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, User
+from django.core.exceptions import MiddlewareNotUsed
 from django.utils.deprecation import MiddlewareMixin
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.settings import api_settings
 from urllib.parse import parse_qs
+from .tokens import RevocableAccessToken
+from .profiling import (
+    QueryBudgetExceeded,
+    enable_sql_profiling,
+    profile_request,
+    route_metrics,
+    route_name,
+)
 
 
 class JWTAuthMiddleware:
@@ -18,10 +29,13 @@ class JWTAuthMiddleware:
         if token_list:
             token = token_list[0]
             try:
-                access_token = AccessToken(token)
-                user_id = access_token["user_id"]
-                user = await self.get_user(user_id)
-                scope["user"] = user
+                # Signature, expiry and a Redis revocation check, then one
+                # primary-key lookup so deactivated users are turned away
+                access_token = await sync_to_async(RevocableAccessToken)(token)
+                user = await User.objects.filter(
+                    id=access_token[api_settings.USER_ID_CLAIM], is_active=True
+                ).afirst()
+                scope["user"] = user or AnonymousUser()
             except Exception:
                 scope["user"] = AnonymousUser()
         else:
@@ -29,15 +43,80 @@ class JWTAuthMiddleware:
 
         return await self.inner(scope, receive, send)
 
-    @staticmethod
-    async def get_user(user_id):
-        from channels.db import database_sync_to_async
-
-        return await database_sync_to_async(User.objects.get)(id=user_id)
-
 
 class DisableCSRFForAPIMiddleware(MiddlewareMixin):
     def process_request(self, request):
         if request.path.startswith("/api/"):
             setattr(request, "_dont_enforce_csrf_checks", True)
         return None
+
+
+class RateLimitHeadersMiddleware(MiddlewareMixin):
+    """Reports the tightest API throttle budget of the request"""
+
+    def process_response(self, request, response):
+        rate_limit = getattr(request, "rate_limit", None)
+        if rate_limit is not None:
+            limit, remaining, reset = rate_limit
+            response["X-RateLimit-Limit"] = str(limit)
+            response["X-RateLimit-Remaining"] = str(remaining)
+            response["X-RateLimit-Reset"] = str(reset)
+        return response
+
+
+class RequestProfilingMiddleware:
+    """Opt-in (REQUEST_PROFILING) per-request SQL/cache/serializer profiling.
+
+    Adds a ``Server-Timing`` header, feeds per-route counters for
+    ``/api/metrics/`` and checks the view's ``query_budgets[action]``; with
+    REQUEST_PROFILING_ENFORCE_BUDGETS (tests) an overrun raises.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        enable_sql_profiling()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with profile_request() as profile:
+            response = self.get_response(request)
+        return self.finish(request, response, profile, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with profile_request() as profile:
+            response = await self.get_response(request)
+        return self.finish(request, response, profile, started)
+
+    def finish(self, request, response, profile, started):
+        total = time.perf_counter() - started
+        response["Server-Timing"] = profile.server_timing(total)
+
+        budget = self.query_budget(response)
+        over_budget = budget is not None and profile.queries > budget
+        route_metrics.observe(
+            request.method, route_name(request), profile, total, over_budget
+        )
+        if over_budget and settings.REQUEST_PROFILING_ENFORCE_BUDGETS:
+            raise QueryBudgetExceeded(
+                f"{request.method} {request.path} ran {profile.queries} queries, "
+                f"budget is {budget}"
+            )
+        return response
+
+    @staticmethod
+    def query_budget(response):
+        view = getattr(response, "renderer_context", {}).get("view")
+        budgets = getattr(view, "query_budgets", None)
+        if not budgets:
+            return None
+        return budgets.get(getattr(view, "action", None))
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="task",
+            name="priority",
+            field=models.CharField(
+                choices=[
+                    ("low", "Low"),
+                    ("medium", "Medium"),
+                    ("high", "High"),
+                    ("urgent", "Urgent"),
+                ],
+                db_index=True,
+                default="medium",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskhistory",
+            name="changed_at",
+            field=models.DateTimeField(
+                db_index=True, default=django.utils.timezone.now
+            ),
+        ),
+        migrations.CreateModel(
+            name="TaskHistoryArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("changes", models.JSONField(default=dict)),
+                ("changed_at", models.DateTimeField(db_index=True)),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_history",
+                        to="api.task",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["task", "changed_at"],
+                        name="api_taskhis_task_id_376f1d_idx",
+                    )
+                ],
+            },
+        ),
+    ]
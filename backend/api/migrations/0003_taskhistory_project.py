@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_project(apps, schema_editor):
+    Task = apps.get_model("api", "Task")
+    TaskHistory = apps.get_model("api", "TaskHistory")
+    TaskHistory.objects.update(
+        project_id=Subquery(
+            Task.objects.filter(id=OuterRef("task_id")).values("project_id")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_task_history_archive"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskhistory",
+            name="project",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="history",
+                to="api.project",
+            ),
+        ),
+        migrations.RunPython(backfill_project, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="taskhistory",
+            name="project",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="history",
+                to="api.project",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskhistory",
+            index=models.Index(
+                fields=["project", "-changed_at", "-id"],
+                name="api_taskhis_project_3db70e_idx",
+            ),
+        ),
+    ]
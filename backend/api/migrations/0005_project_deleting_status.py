@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_notification"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="project",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("active", "Active"),
+                    ("archived", "Archived"),
+                    ("deleting", "Deleting"),
+                ],
+                db_index=True,
+                default="active",
+                max_length=20,
+            ),
+        ),
+    ]
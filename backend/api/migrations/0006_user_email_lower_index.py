@@ -0,0 +1,72 @@
+from django.db import migrations
+
+INDEX_NAME = "auth_user_email_lower_uniq"
+
+
+def check_duplicates(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT LOWER(email) FROM auth_user WHERE email <> '' "
+            "GROUP BY LOWER(email) HAVING COUNT(*) > 1 LIMIT 10"
+        )
+        duplicates = [row[0] for row in cursor.fetchall()]
+    if duplicates:
+        raise RuntimeError(
+            f"Can't create {INDEX_NAME}: these emails belong to several users "
+            f"(ignoring case): {', '.join(duplicates)}. Merge or change them "
+            "and run the migration again."
+        )
+
+
+def index_validity(schema_editor):
+    """True/False for a valid/invalid index, None when there is none"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = %s",
+            [INDEX_NAME],
+        )
+        row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def create_index(apps, schema_editor):
+    check_duplicates(schema_editor)
+    # Partial so users without an email (createsuperuser, imports) don't clash.
+    # text_pattern_ops also serves the LIKE 'prefix%' lookups of user search.
+    if schema_editor.connection.vendor == "postgresql":
+        valid = index_validity(schema_editor)
+        if valid:
+            return
+        if valid is not None:
+            # Left INVALID by an interrupted or failed concurrent build
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY {INDEX_NAME}")
+        schema_editor.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY {INDEX_NAME} "
+            "ON auth_user (LOWER(email) text_pattern_ops) WHERE email <> ''"
+        )
+    else:
+        # Spelled the way the ORM renders ~Q(email=""): SQLite only uses a
+        # partial index whose predicate appears verbatim in the query
+        # (PostgreSQL normalizes NOT (email = '') to email <> '')
+        schema_editor.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} "
+            "ON auth_user (LOWER(email)) WHERE NOT (email = '')"
+        )
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction; it avoids
+    # locking auth_user against logins and sign-ups while the index builds
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("api", "0005_project_deleting_status"),
+    ]
+
+    operations = [migrations.RunPython(create_index, drop_index)]
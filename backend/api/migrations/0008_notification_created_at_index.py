@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_task_open_deadline_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="notification",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="api_notific_recipie_d2c7d2_idx",
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="api_notific_recipie_1bdb42_idx",
+            ),
+        ),
+    ]
@@ -9,6 +9,7 @@ class Project(models.Model):
     STATUS_CHOICES = [
         ("active", "Active"),
         ("archived", "Archived"),
+        ("deleting", "Deleting"),
     ]
 
     title = models.CharField(max_length=255, db_index=True)
@@ -57,6 +58,29 @@ class ProjectMember(models.Model):
         return f"{self.user.username} - {self.project.title} ({self.role})"
 
 
+class TaskQuerySet(models.QuerySet):
+    def overdue(self, now: Optional[timezone.datetime] = None) -> "TaskQuerySet":
+        """Open tasks past their deadline; the predicate matches the partial
+        index api_task_open_deadline_idx"""
+        return self.filter(deadline__lt=now or timezone.now()).exclude(status="done")
+
+    def with_overdue(self, now: Optional[timezone.datetime] = None) -> "TaskQuerySet":
+        """Annotates ``overdue``, the SQL counterpart of ``Task.is_overdue``"""
+        if "overdue" in self.query.annotations:
+            return self
+        return self.annotate(
+            overdue=models.Case(
+                models.When(
+                    ~models.Q(status="done"),
+                    deadline__lt=now or timezone.now(),
+                    then=models.Value(True),
+                ),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ("todo", "To Do"),
@@ -96,6 +120,8 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     order = models.IntegerField(default=0, validators=[MinValueValidator(0)])
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ["order", "-created_at"]
         indexes = [
@@ -103,6 +129,15 @@ class Task(models.Model):
             models.Index(fields=["assignee", "status"]),
             models.Index(fields=["project", "deadline"]),
             models.Index(fields=["priority", "status"]),
+            # Partial: done tasks are never overdue and make up most of an old
+            # project. INCLUDE (id) keeps the overdue id/count queries
+            # index-only (PostgreSQL).
+            models.Index(
+                fields=["project", "deadline"],
+                include=["id"],
+                condition=~models.Q(status="done"),
+                name="api_task_open_deadline_idx",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -116,8 +151,15 @@ class Task(models.Model):
     def due_date(self, value: Optional[timezone.datetime]) -> None:
         self.deadline = value
 
+    def save(self, *args, **kwargs) -> None:
+        # An ``overdue`` annotation describes the row as it was loaded
+        self.__dict__.pop("overdue", None)
+        super().save(*args, **kwargs)
+
     @property
     def is_overdue(self) -> bool:
+        if "overdue" in self.__dict__:
+            return self.__dict__["overdue"]
         return (
             self.deadline is not None
             and self.deadline < timezone.now()
@@ -142,15 +184,82 @@ class Comment(models.Model):
 
 class TaskHistory(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="history")
+    # Denormalized from task so the project activity feed is a single index scan
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="history"
+    )
     changed_by = models.ForeignKey(User, on_delete=models.CASCADE)
     field_name = models.CharField(max_length=50)
     old_value = models.TextField(blank=True)
     new_value = models.TextField(blank=True)
-    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
 
     class Meta:
         ordering = ["-changed_at"]
-        indexes = [models.Index(fields=["task", "changed_at"])]
+        indexes = [
+            models.Index(fields=["task", "changed_at"]),
+            models.Index(fields=["project", "-changed_at", "-id"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.task.title} - {self.field_name} changed by {self.changed_by.username}"
+
+
+class TaskHistoryArchive(models.Model):
+    """Compacted history: one row per save with all changed fields."""
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="archived_history"
+    )
+    changed_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    changes = models.JSONField(default=dict)
+    changed_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ["-changed_at"]
+        indexes = [models.Index(fields=["task", "changed_at"])]
+
+    def __str__(self) -> str:
+        changes = ", ".join(self.changes)
+        return f"{self.task.title} - {changes} changed by {self.changed_by.username}"
+
+
+class Notification(models.Model):
+    """Persisted inbox entry; repeated events on a task are coalesced into one."""
+
+    KIND_CHOICES = [
+        ("task_updated", "Task Updated"),
+        ("comment_created", "New Comment"),
+    ]
+
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications"
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="notifications",
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    count = models.PositiveIntegerField(default=1)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["recipient", "-created_at", "-id"]),
+            models.Index(
+                fields=["recipient", "task", "kind"],
+                condition=models.Q(is_read=False),
+                name="api_notification_unread_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.title} for {self.recipient.username}"
@@ -0,0 +1,106 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Seek pagination over a descending (timestamp, id) pair.
+
+    Every page is a bounded index range scan, so deep pages cost the same as
+    the first one, unlike OFFSET-based page numbers.
+    """
+
+    timestamp_field = "created_at"
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Any, view: Any = None
+    ) -> List[Any]:
+        self.request = request
+        page_size = self.get_page_size(request)
+        field = self.timestamp_field
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            timestamp, pk = position
+            queryset = queryset.filter(
+                Q(**{f"{field}__lt": timestamp})
+                | Q(**{field: timestamp, "id__lt": pk}),
+                **{f"{field}__lte": timestamp},
+            )
+
+        rows = list(queryset.order_by(f"-{field}", "-id")[: page_size + 1])
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_position = (getattr(last, field), last.pk)
+        return rows
+
+    def get_page_size(self, request: Any) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        timestamp, pk = self.next_position
+        token = urlsafe_b64encode(f"{timestamp.isoformat()}|{pk}".encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, request: Any) -> Optional[Tuple[Any, int]]:
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw_timestamp, raw_pk = (
+                urlsafe_b64decode(token.encode()).decode().split("|")
+            )
+            timestamp = parse_datetime(raw_timestamp)
+            pk = int(raw_pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, pk
+
+    def get_paginated_response(self, data: List[Any]) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class HistoryPagination(KeysetPagination):
+    timestamp_field = "changed_at"
+
+
+class CommentPagination(KeysetPagination):
+    timestamp_field = "created_at"
+
+
+class NotificationPagination(KeysetPagination):
+    # Not updated_at: digests bump it, which would move rows across pages
+    timestamp_field = "created_at"
@@ -0,0 +1,247 @@
+"""Per-request SQL, cache and serializer profiling.
+
+A ``RequestProfile`` is bound to a context variable for the duration of a
+request by ``RequestProfilingMiddleware``; the database execute wrapper,
+``ProfiledRedisCache`` and the serializers report into it when one is
+active and cost a single context variable lookup otherwise. Finished
+profiles are aggregated per route for the Prometheus endpoint.
+"""
+
+import hmac
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseForbidden
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class RequestProfile:
+    queries: int = 0
+    sql_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    serializer_time: float = 0.0
+    serializing: bool = False
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join(
+            [
+                f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"serialize;dur={self.serializer_time * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            ]
+        )
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_request() -> Iterator[RequestProfile]:
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+@contextmanager
+def serializer_timer(profile: RequestProfile) -> Iterator[None]:
+    """Times the outermost serializer only, so nesting is not double counted"""
+    profile.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_time += time.perf_counter() - started
+        profile.serializing = False
+
+
+def record_cache_access(hits: int, misses: int) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+def sql_profiler(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.sql_time += time.perf_counter() - started
+
+
+def install_sql_profiler(connection: Any, **kwargs: Any) -> None:
+    if sql_profiler not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_profiler)
+
+
+def enable_sql_profiling() -> None:
+    """Wraps existing and future connections (they are per thread)"""
+    connection_created.connect(install_sql_profiler, dispatch_uid="sql_profiler")
+    for connection in connections.all(initialized_only=True):
+        install_sql_profiler(connection)
+
+
+class RouteMetrics:
+    """In-process per-route counters, rendered in Prometheus text format"""
+
+    COUNTERS = {
+        "requests": "Requests served",
+        "request_seconds": "Wall time spent in requests",
+        "db_queries": "SQL queries executed",
+        "db_seconds": "Time spent executing SQL",
+        "cache_hits": "Cache lookups that hit",
+        "cache_misses": "Cache lookups that missed",
+        "serializer_seconds": "Time spent serializing responses",
+        "query_budget_exceeded": "Requests over their viewset query budget",
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(self.COUNTERS, 0)
+        )
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        profile: RequestProfile,
+        total: float,
+        over_budget: bool,
+    ) -> None:
+        with self._lock:
+            counters = self._routes[(method, route)]
+            counters["requests"] += 1
+            counters["request_seconds"] += total
+            counters["db_queries"] += profile.queries
+            counters["db_seconds"] += profile.sql_time
+            counters["cache_hits"] += profile.cache_hits
+            counters["cache_misses"] += profile.cache_misses
+            counters["serializer_seconds"] += profile.serializer_time
+            counters["query_budget_exceeded"] += over_budget
+
+    def render(self) -> str:
+        with self._lock:
+            routes = {key: dict(value) for key, value in self._routes.items()}
+        lines = []
+        for name, description in self.COUNTERS.items():
+            metric = f"api_{name}_total"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for (method, route), counters in sorted(routes.items()):
+                lines.append(
+                    f'{metric}{{method="{method}",route="{route}"}} {counters[name]:g}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_metrics = RouteMetrics()
+
+
+class CacheTierMetrics:
+    """Hits and misses per cache and tier (local LRU, Redis) of TwoTierCache"""
+
+    METRICS = {
+        "hits_total": ("counter", "Two-tier cache lookups that hit"),
+        "misses_total": ("counter", "Two-tier cache lookups that missed"),
+        "hit_ratio": ("gauge", "Share of two-tier cache lookups that hit"),
+    }
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0}
+        )
+
+    def observe(self, cache: str, tier: str, hit: bool) -> None:
+        with self._lock:
+            self._counts[(cache, tier)]["hits" if hit else "misses"] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            rows = {
+                key: {
+                    "hits_total": counts["hits"],
+                    "misses_total": counts["misses"],
+                    "hit_ratio": counts["hits"] / (counts["hits"] + counts["misses"]),
+                }
+                for key, counts in self._counts.items()
+            }
+        lines = []
+        for name, (kind, description) in self.METRICS.items():
+            metric = f"api_cache_tier_{name}"
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for (cache, tier), values in sorted(rows.items()):
+                lines.append(
+                    f'{metric}{{cache="{cache}",tier="{tier}"}} {values[name]:g}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+cache_tier_metrics = CacheTierMetrics()
+
+
+def route_name(request: HttpRequest) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+def can_read_metrics(request: HttpRequest) -> bool:
+    """The scraper's ``Authorization: Bearer <METRICS_TOKEN>``, or a staff
+    member's session"""
+    token = settings.METRICS_TOKEN
+    header = request.headers.get("Authorization", "")
+    if token and hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """Prometheus scrape endpoint; 404 unless profiling is enabled"""
+    if not settings.REQUEST_PROFILING:
+        raise Http404
+    if not can_read_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        route_metrics.render() + cache_tier_metrics.render(),
+        content_type="text/plain; version=0.0.4",
+    )
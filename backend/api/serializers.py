@@ -1,17 +1,88 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.contrib.auth.models import User
-from typing import Dict, Any
-from .models import Project, Task, Comment, ProjectMember, TaskHistory
+from django.db.models import QuerySet, prefetch_related_objects
+from django.utils import timezone
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence, Set, Tuple
+from .models import (
+    Project,
+    Task,
+    Comment,
+    ProjectMember,
+    TaskHistory,
+    TaskHistoryArchive,
+    Notification,
+)
+from .profiling import current_profile, serializer_timer
 
 
-class UserSerializer(serializers.ModelSerializer):
+def parse_field_list(value: Optional[str]) -> Set[str]:
+    """Parse a comma-separated query parameter into a set of names"""
+    if not value:
+        return set()
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def prune_fields(serializer: serializers.BaseSerializer, requested: Set[str]) -> None:
+    """Keep only ``requested`` fields; dotted names (``owner.id``) prune nested ones"""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+
+    nested: Dict[str, Set[str]] = {}
+    for name in requested:
+        head, _, rest = name.partition(".")
+        nested.setdefault(head, set())
+        if rest:
+            nested[head].add(rest)
+
+    for name in list(serializer.fields):
+        if name not in nested:
+            serializer.fields.pop(name)
+        elif nested[name] and isinstance(
+            serializer.fields[name], serializers.BaseSerializer
+        ):
+            prune_fields(serializer.fields[name], nested[name])
+
+
+class DynamicFieldsMixin:
+    """Sparse fieldsets for top-level serializers.
+
+    ``?fields=a,b,owner.id`` keeps only the listed fields on safe requests,
+    and fields named in ``Meta.expandable_fields`` are rendered only when
+    requested via ``?expand=``. Nested serializers are not bound to the
+    request yet when they are built, so they are pruned by their parent.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        query_params = getattr(request, "query_params", {})
+
+        expand = parse_field_list(query_params.get("expand"))
+        for name in getattr(self.Meta, "expandable_fields", []):
+            if name not in expand:
+                self.fields.pop(name, None)
+
+        requested = parse_field_list(query_params.get("fields"))
+        if requested and request.method in SAFE_METHODS:
+            prune_fields(self, requested | expand)
+
+    def to_representation(self, instance: Any) -> Dict[str, Any]:
+        profile = current_profile()
+        if profile is None or profile.serializing:
+            return super().to_representation(instance)
+        with serializer_timer(profile):
+            return super().to_representation(instance)
+
+
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name"]
         read_only_fields = ["id"]
 
 
-class ProjectMemberSerializer(serializers.ModelSerializer):
+class ProjectMemberSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="user", write_only=True
@@ -23,7 +94,7 @@ class ProjectMemberSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "joined_at"]
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     name = serializers.CharField(source="title")  # 👈 alias для фронта
     owner = UserSerializer(read_only=True)
     members = serializers.SerializerMethodField()
@@ -47,7 +118,8 @@ class ProjectListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at", "owner"]
 
     def get_members(self, obj):
-        members = ProjectMember.objects.filter(project=obj).select_related("user")
+        # Uses the members__user prefetch from the viewset instead of a query per row
+        members = obj.members.all()
         return [
             {
                 "id": m.user.id,
@@ -60,7 +132,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     name = serializers.CharField(source="title")  # 👈 alias
     owner = UserSerializer(read_only=True)
     members = ProjectMemberSerializer(many=True, read_only=True)
@@ -92,6 +164,20 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at", "owner"]
 
+    def validate_status(self, value: str) -> str:
+        if value == "deleting":
+            raise serializers.ValidationError("Use DELETE to remove a project")
+        return value
+
+    def to_representation(self, instance: Project) -> Dict[str, Any]:
+        # Writes drop the viewset's prefetch (DRF clears it after update), so
+        # load members with their users here instead of one query per member
+        if "members" in self.fields and "members" not in getattr(
+            instance, "_prefetched_objects_cache", {}
+        ):
+            prefetch_related_objects([instance], "members__user")
+        return super().to_representation(instance)
+
     def create(self, validated_data: Dict[str, Any]) -> Project:
         owner = validated_data.pop("owner", None) or self.context["request"].user
         project = Project.objects.create(owner=owner, **validated_data)
@@ -99,7 +185,7 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         return project
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
 
     class Meta:
@@ -119,7 +205,7 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     assignee = UserSerializer(read_only=True)
     project_title = serializers.CharField(source="project.title", read_only=True)
     due_date = serializers.DateTimeField(source="deadline", read_only=True)  # 👈 alias
@@ -145,9 +231,11 @@ class TaskListSerializer(serializers.ModelSerializer):
             "is_overdue",
         ]
         read_only_fields = ["id", "created_at", "updated_at", "is_overdue"]
+        # Model columns read by computed properties, for sparse querysets
+        source_columns = {"is_overdue": ["deadline", "status"]}
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     assignee = UserSerializer(read_only=True)
     assignee_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(),
@@ -189,13 +277,21 @@ class TaskDetailSerializer(serializers.ModelSerializer):
             "updated_at",
             "is_overdue",
         ]
+        # Comments are paginated via /tasks/{id}/comments/ unless ?expand=comments
+        expandable_fields = ["comments"]
+        source_columns = {"is_overdue": ["deadline", "status"]}
+
+    def validate_project(self, value: Project) -> Project:
+        if value.status == "deleting":
+            raise serializers.ValidationError("Project is being deleted")
+        return value
 
     def create(self, validated_data: Dict[str, Any]) -> Task:
         validated_data["created_by"] = self.context["request"].user
         return super().create(validated_data)
 
 
-class TaskHistorySerializer(serializers.ModelSerializer):
+class TaskHistorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     changed_by = UserSerializer(read_only=True)
 
     class Meta:
@@ -212,6 +308,231 @@ class TaskHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "changed_at"]
 
 
+class ProjectActivitySerializer(TaskHistorySerializer):
+    task_title = serializers.CharField(source="task.title", read_only=True)
+
+    class Meta(TaskHistorySerializer.Meta):
+        fields = TaskHistorySerializer.Meta.fields + ["task_title"]
+
+
+class TaskHistoryArchiveSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    changed_by = UserSerializer(read_only=True)
+
+    class Meta:
+        model = TaskHistoryArchive
+        fields = ["id", "task", "changed_by", "changes", "changed_at"]
+        read_only_fields = fields
+
+
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = [
+            "id",
+            "kind",
+            "title",
+            "body",
+            "task",
+            "count",
+            "is_read",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
 class TaskStatusUpdateSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
     order = serializers.IntegerField(min_value=0, required=False)
+
+
+def datetime_representation(value: Optional[timezone.datetime]) -> Optional[str]:
+    """Same output as DRF's ISO-8601 DateTimeField in the current timezone"""
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class FastListSerializer:
+    """Read-only list rendering straight from ``.values_list()`` tuples.
+
+    ``plan`` is a sequence of ``(key, spec)`` pairs, where ``spec`` is a
+    values lookup, a ``(lookup, converter)`` pair, a list of lookups rendered
+    as a nested block (``None`` when its first lookup is null), or a
+    ``([lookups], func)`` pair whose func receives those values as a dict.
+    The plan is compiled once per class into tuple indexes, so each row costs
+    a few dict stores instead of DRF's per-field ``to_representation``
+    machinery. Subclasses must render exactly what their DRF counterpart
+    renders.
+    """
+
+    plan: Sequence[Tuple[str, Any]] = ()
+    _compiled: Optional[Tuple[List[str], List[Callable[[tuple], Any]]]] = None
+
+    @classmethod
+    def compile(cls) -> Tuple[List[str], List[Callable[[tuple], Any]]]:
+        if cls.__dict__.get("_compiled") is None:
+            lookups: List[str] = []
+
+            def index(lookup: str) -> int:
+                if lookup not in lookups:
+                    lookups.append(lookup)
+                return lookups.index(lookup)
+
+            steps = [(key, cls._compile_step(spec, index)) for key, spec in cls.plan]
+            cls._compiled = (lookups, steps)
+        return cls._compiled
+
+    @staticmethod
+    def _compile_step(spec: Any, index: Callable[[str], int]) -> Callable:
+        if isinstance(spec, str):
+            i = index(spec)
+            return lambda row: row[i]
+        if isinstance(spec, tuple) and isinstance(spec[0], list):
+            lookups, func = spec
+            positions = {lookup: index(lookup) for lookup in lookups}
+            return lambda row: func({k: row[i] for k, i in positions.items()})
+        if isinstance(spec, tuple):
+            lookup, convert = spec
+            i = index(lookup)
+            return lambda row: convert(row[i])
+        if isinstance(spec, list):
+            prefix = spec[0].split("__")[0]
+            keys = [lookup[len(prefix) + 2 :] for lookup in spec]
+            positions = [index(lookup) for lookup in spec]
+            first = positions[0]
+            return lambda row: (
+                None
+                if row[first] is None
+                else {key: row[i] for key, i in zip(keys, positions)}
+            )
+        raise TypeError(f"Unsupported plan entry: {spec!r}")
+
+    def rows(self, queryset: QuerySet) -> QuerySet:
+        lookups, _ = self.compile()
+        return queryset.prefetch_related(None).values_list(*lookups)
+
+    def render(self, rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+        _, steps = self.compile()
+        profile = current_profile()
+        if profile is None or profile.serializing:
+            return [{key: step(row) for key, step in steps} for row in rows]
+        with serializer_timer(profile):
+            return [{key: step(row) for key, step in steps} for row in rows]
+
+
+def _user_block(prefix: str) -> List[str]:
+    return [f"{prefix}__{field}" for field in UserSerializer.Meta.fields]
+
+
+class FastTaskListSerializer(FastListSerializer):
+    """Fast path for TaskListSerializer"""
+
+    plan = [
+        ("id", "id"),
+        ("title", "title"),
+        ("description", "description"),
+        ("project", "project_id"),
+        ("project_title", "project__title"),
+        ("assignee", _user_block("assignee")),
+        ("status", "status"),
+        ("priority", "priority"),
+        ("due_date", ("deadline", datetime_representation)),
+        ("created_at", ("created_at", datetime_representation)),
+        ("updated_at", ("updated_at", datetime_representation)),
+        ("order", "order"),
+        ("is_overdue", "overdue"),
+    ]
+
+    def rows(self, queryset: QuerySet) -> QuerySet:
+        return super().rows(queryset.with_overdue())
+
+
+class FastCommentSerializer(FastListSerializer):
+    """Fast path for CommentSerializer"""
+
+    plan = [
+        ("id", "id"),
+        ("task", "task_id"),
+        ("author", _user_block("author")),
+        ("content", "content"),
+        ("created_at", ("created_at", datetime_representation)),
+        ("updated_at", ("updated_at", datetime_representation)),
+    ]
+
+
+class BoardTaskSerializer(FastListSerializer):
+    """Minimal task card for board snapshots.
+
+    Overdue state depends on the clock, not on the board generation, so it is
+    left to the client (``due_date`` is included).
+    """
+
+    plan = [
+        ("id", "id"),
+        ("title", "title"),
+        ("status", "status"),
+        ("priority", "priority"),
+        ("order", "order"),
+        ("assignee", "assignee_id"),
+        ("due_date", ("deadline", datetime_representation)),
+    ]
+
+
+class FastProjectListSerializer(FastListSerializer):
+    """Fast path for ProjectListSerializer; members come from one extra query"""
+
+    plan = [
+        ("id", "id"),
+        ("name", "title"),
+        ("description", "description"),
+        ("status", "status"),
+        ("owner", _user_block("owner")),
+        ("created_at", ("created_at", datetime_representation)),
+        ("updated_at", ("updated_at", datetime_representation)),
+    ]
+
+    def render(self, rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+        projects = super().render(rows)
+        members: Dict[int, List[Dict[str, Any]]] = {
+            project["id"]: [] for project in projects
+        }
+        rows = (
+            ProjectMember.objects.filter(project_id__in=members)
+            .order_by("id")
+            .values_list(
+                "project_id",
+                "user__id",
+                "user__first_name",
+                "user__last_name",
+                "user__email",
+                "role",
+            )
+        )
+        for project_id, user_id, first_name, last_name, email, role in rows:
+            members[project_id].append(
+                {
+                    "id": user_id,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "email": email,
+                    "role": role,
+                }
+            )
+        # Same key order as ProjectListSerializer, members after owner
+        return [
+            {
+                "id": project["id"],
+                "name": project["name"],
+                "description": project["description"],
+                "status": project["status"],
+                "owner": project["owner"],
+                "members": members[project["id"]],
+                "created_at": project["created_at"],
+                "updated_at": project["updated_at"],
+            }
+            for project in projects
+        ]
@@ -1,12 +1,29 @@
+from django.db import connections, router, transaction
 from django.db.models import Count, Q, Prefetch, QuerySet
+from django.db.models.functions import Lower
 from django.utils import timezone
+from django.conf import settings
 from django.core.cache import cache
 from django.contrib.auth.models import User
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from typing import Dict, Any, Optional, List
+from django_redis import get_redis_connection
+from datetime import datetime, timedelta
+import threading
+import time
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 
-from .models import Project, Task, Comment, ProjectMember, TaskHistory
+from .models import (
+    Project,
+    Task,
+    Comment,
+    ProjectMember,
+    TaskHistory,
+    TaskHistoryArchive,
+    Notification,
+)
+from .cache import TwoTierCache, aget_or_compute, get_or_compute
+from .serializers import BoardTaskSerializer, ProjectDetailSerializer
 
 
 class RealtimeService:
@@ -35,9 +52,33 @@ class RealtimeService:
         )
 
 
+# user id -> role for every member, read by the permission classes
+member_roles_cache = TwoTierCache("project_member_roles")
+
+
 class ProjectService:
     """Service layer for Project operations"""
 
+    @staticmethod
+    def get_member_roles(project_id: int) -> Dict[int, str]:
+        # Permissions must not outlive a removal on a lagging replica, and
+        # whatever is loaded here is cached for every other request
+        return member_roles_cache.get_or_set(
+            int(project_id),
+            lambda: dict(
+                ProjectMember.objects.using("default")
+                .filter(project_id=project_id)
+                .values_list("user_id", "role")
+            ),
+        )
+
+    @staticmethod
+    def invalidate_member_roles(project_id: int) -> None:
+        # Again after commit: a concurrent request may reload the old roles
+        # before the writing transaction commits
+        member_roles_cache.invalidate(project_id)
+        transaction.on_commit(lambda: member_roles_cache.invalidate(project_id))
+
     @staticmethod
     def get_projects_with_stats(user: User) -> QuerySet:
         return (
@@ -51,15 +92,32 @@ class ProjectService:
         )
 
     @staticmethod
-    def get_project_detail(project_id: int, user: User) -> Optional[Project]:
-        cache_key = f"project_detail_{project_id}_{user.id}"
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
+    def get_project_detail(
+        project_id: int,
+        user: User,
+        generation: Optional[int] = None,
+        profiles: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Serialized project detail for a member, shared by all members and
+        cached per project and user profiles generation as plain data"""
+        if user.id not in ProjectService.get_member_roles(project_id):
+            return None
+        if generation is None:
+            generation = ProjectService.get_generation(project_id)
+        if profiles is None:
+            profiles = UserService.get_profiles_generation()
+        return get_or_compute(
+            f"project_detail_{project_id}_{generation}_{profiles}",
+            lambda: ProjectService._build_project_detail(project_id),
+            300,
+            stale_timeout=60,
+        )
 
+    @staticmethod
+    def _build_project_detail(project_id: int) -> Optional[Dict[str, Any]]:
         now = timezone.now()
         project = (
-            Project.objects.filter(id=project_id, members__user=user)
+            Project.objects.filter(id=project_id)
             .select_related("owner")
             .prefetch_related(
                 Prefetch(
@@ -91,24 +149,153 @@ class ProjectService:
             )
             .first()
         )
-        if project:
-            cache.set(cache_key, project, 300)
-        return project
+        if project is None:
+            return None
+        return ProjectDetailSerializer(project).data
 
     @staticmethod
-    def invalidate_project_cache(
-        project_id: int, user_ids: Optional[List[int]] = None
-    ) -> None:
-        if user_ids is None:
-            user_ids = ProjectMember.objects.filter(project_id=project_id).values_list(
-                "user_id", flat=True
+    def get_generation(project_id: int) -> int:
+        """Counter bumped on every write that changes what the project renders"""
+        key = f"project_generation_{project_id}"
+        generation = cache.get(key)
+        if generation is None:
+            # Seed from the clock so an evicted counter never reuses old values.
+            generation = int(time.time() * 1000)
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+        return generation
+
+    @staticmethod
+    def get_generations(project_ids: List[int]) -> Dict[int, int]:
+        keys = {f"project_generation_{pk}": pk for pk in project_ids}
+        found = cache.get_many(list(keys))
+        generations = {keys[key]: value for key, value in found.items()}
+        for pk in project_ids:
+            if pk not in generations:
+                generations[pk] = ProjectService.get_generation(pk)
+        return generations
+
+    @staticmethod
+    def bump_generation(project_id: int) -> int:
+        try:
+            return cache.incr(f"project_generation_{project_id}")
+        except ValueError:
+            return ProjectService.get_generation(project_id)
+
+    @staticmethod
+    def get_board(
+        project: Project,
+        generation: Optional[int] = None,
+        profiles: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Whole Kanban board in two queries, cached per project and user
+        profiles generation (the members list embeds names)"""
+        if generation is None:
+            generation = ProjectService.get_generation(project.id)
+        if profiles is None:
+            profiles = UserService.get_profiles_generation()
+
+        def build() -> Dict[str, Any]:
+            tasks, members = ProjectService._board_querysets(project.id)
+            return ProjectService._build_board(
+                project, generation, list(tasks), list(members)
             )
-        for user_id in user_ids:
-            cache_key = f"project_detail_{project_id}_{user_id}"
-            cache.delete(cache_key)
+
+        return get_or_compute(
+            f"project_board_{project.id}_{generation}_{profiles}",
+            build,
+            300,
+            stale_timeout=60,
+        )
+
+    @staticmethod
+    async def aget_board(
+        project: Project, generation: int, profiles: int
+    ) -> Dict[str, Any]:
+
+        async def build() -> Dict[str, Any]:
+            tasks, members = ProjectService._board_querysets(project.id)
+            return ProjectService._build_board(
+                project,
+                generation,
+                [row async for row in tasks],
+                [row async for row in members],
+            )
+
+        return await aget_or_compute(
+            f"project_board_{project.id}_{generation}_{profiles}",
+            build,
+            300,
+            stale_timeout=60,
+        )
+
+    @staticmethod
+    def _board_querysets(project_id: int) -> Tuple[QuerySet, QuerySet]:
+        tasks = BoardTaskSerializer().rows(
+            Task.objects.filter(project_id=project_id).order_by("order", "-created_at")
+        )
+        members = ProjectMember.objects.filter(project_id=project_id).values(
+            "role",
+            "user_id",
+            "user__username",
+            "user__first_name",
+            "user__last_name",
+        )
+        return tasks, members
+
+    @staticmethod
+    def _build_board(
+        project: Project,
+        generation: int,
+        task_rows: List[tuple],
+        member_rows: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        columns = {
+            status: {"status": status, "title": title, "tasks": []}
+            for status, title in Task.STATUS_CHOICES
+        }
+        for task in BoardTaskSerializer().render(task_rows):
+            columns[task["status"]]["tasks"].append(task)
+
+        return {
+            "project": {
+                "id": project.id,
+                "name": project.title,
+                "status": project.status,
+            },
+            "generation": generation,
+            "members": [
+                {
+                    "id": m["user_id"],
+                    "username": m["user__username"],
+                    "first_name": m["user__first_name"],
+                    "last_name": m["user__last_name"],
+                    "role": m["role"],
+                }
+                for m in member_rows
+            ],
+            "columns": list(columns.values()),
+        }
+
+    @staticmethod
+    def invalidate_project_cache(project_id: int) -> None:
+        # Detail, statistics and board entries are keyed by generation
+        ProjectService.bump_generation(project_id)
 
     @staticmethod
     def get_project_statistics(project_id: int) -> Dict[str, Any]:
+        """Task counts per status; overdue counts move with the clock, so
+        entries are kept for a minute even without writes"""
+        generation = ProjectService.get_generation(project_id)
+        return get_or_compute(
+            f"project_statistics_{project_id}_{generation}",
+            lambda: ProjectService._compute_project_statistics(project_id),
+            60,
+            stale_timeout=30,
+        )
+
+    @staticmethod
+    def _compute_project_statistics(project_id: int) -> Dict[str, Any]:
         now = timezone.now()
         stats = Task.objects.filter(project_id=project_id).aggregate(
             total=Count("id"),
@@ -126,6 +313,147 @@ class ProjectService:
         return stats
 
 
+class ProjectDeletionService:
+    """Deletes a project in bounded batches instead of one big cascade.
+
+    ``Project.delete()`` collects every task, comment and history row in a
+    single transaction and fires ``post_delete`` (one group_send) per task.
+    Here the project is marked ``deleting`` and its tasks are removed a batch
+    at a time with plain DELETE statements, children first. A single
+    ``project_deleted`` event is sent at the end. Progress is kept in the
+    cache for the user who requested the deletion.
+    """
+
+    PROGRESS_TIMEOUT = 24 * 60 * 60
+    TASK_CHILDREN = [Comment, TaskHistory, TaskHistoryArchive, Notification]
+
+    @staticmethod
+    def start(project: Project, user: User) -> Dict[str, Any]:
+        Project.objects.filter(pk=project.pk).update(status="deleting")
+        ProjectService.invalidate_project_cache(project.pk)
+        progress = {
+            "project_id": project.id,
+            "status": "deleting",
+            "requested_by": user.id,
+            "tasks_total": Task.objects.filter(project_id=project.id).count(),
+            "tasks_deleted": 0,
+        }
+        ProjectDeletionService._save_progress(progress)
+        project_id = project.id
+        transaction.on_commit(lambda: ProjectDeletionService._schedule(project_id))
+        return progress
+
+    @staticmethod
+    def get_progress(project_id: int) -> Optional[Dict[str, Any]]:
+        return cache.get(ProjectDeletionService._progress_key(project_id))
+
+    @staticmethod
+    def in_progress(project_id: int) -> bool:
+        progress = ProjectDeletionService.get_progress(project_id)
+        return progress is not None and progress["status"] != "deleted"
+
+    @staticmethod
+    def run(project_id: int) -> Dict[str, Any]:
+        progress = ProjectDeletionService.get_progress(project_id) or {
+            "project_id": project_id,
+            "status": "deleting",
+            "requested_by": None,
+            "tasks_total": None,
+            "tasks_deleted": 0,
+        }
+        batch_size = settings.PROJECT_DELETE_BATCH_SIZE
+        try:
+            while True:
+                with transaction.atomic():
+                    task_ids = list(
+                        Task.objects.filter(project_id=project_id)
+                        .order_by()
+                        .values_list("id", flat=True)[:batch_size]
+                    )
+                    if not task_ids:
+                        break
+                    ProjectDeletionService._delete_tasks(task_ids)
+                progress["tasks_deleted"] += len(task_ids)
+                ProjectDeletionService._save_progress(progress)
+
+            with transaction.atomic():
+                ProjectMember.objects.filter(project_id=project_id).delete()
+                Project.objects.filter(pk=project_id).delete()
+        except Exception:
+            progress["status"] = "failed"
+            ProjectDeletionService._save_progress(progress)
+            raise
+
+        ProjectService.invalidate_project_cache(project_id)
+        ProjectService.invalidate_member_roles(project_id)
+        RealtimeService.send_to_project(
+            project_id, "project_deleted", {"project_id": project_id}
+        )
+        progress["status"] = "deleted"
+        ProjectDeletionService._save_progress(progress)
+        return progress
+
+    @staticmethod
+    def _delete_tasks(task_ids: List[int]) -> None:
+        # Plain DELETE statements skip the collector and its per-row
+        # post_delete signals. They are scoped to one batch of task ids, and
+        # TASK_CHILDREN lists every table referencing a task, so nothing is
+        # left dangling.
+        recipients = list(
+            Notification.objects.filter(task_id__in=task_ids, is_read=False)
+            .values_list("recipient_id", flat=True)
+            .distinct()
+        )
+        connection = connections[router.db_for_write(Task)]
+        quote = connection.ops.quote_name
+        placeholders = ", ".join(["%s"] * len(task_ids))
+        with connection.cursor() as cursor:
+            for model in ProjectDeletionService.TASK_CHILDREN:
+                cursor.execute(
+                    f"DELETE FROM {quote(model._meta.db_table)} "
+                    f"WHERE {quote(model._meta.get_field('task').column)} "
+                    f"IN ({placeholders})",
+                    task_ids,
+                )
+            cursor.execute(
+                f"DELETE FROM {quote(Task._meta.db_table)} "
+                f"WHERE {quote(Task._meta.pk.column)} IN ({placeholders})",
+                task_ids,
+            )
+        NotificationService.invalidate_unread_counts(recipients)
+
+    @staticmethod
+    def _schedule(project_id: int) -> None:
+        if not settings.PROJECT_DELETE_IN_BACKGROUND:
+            ProjectDeletionService.run(project_id)
+            return
+        threading.Thread(
+            target=ProjectDeletionService._run_in_thread,
+            args=(project_id,),
+            name=f"delete-project-{project_id}",
+            daemon=True,
+        ).start()
+
+    @staticmethod
+    def _run_in_thread(project_id: int) -> None:
+        try:
+            ProjectDeletionService.run(project_id)
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def _save_progress(progress: Dict[str, Any]) -> None:
+        cache.set(
+            ProjectDeletionService._progress_key(progress["project_id"]),
+            progress,
+            ProjectDeletionService.PROGRESS_TIMEOUT,
+        )
+
+    @staticmethod
+    def _progress_key(project_id: int) -> str:
+        return f"project_deletion_{project_id}"
+
+
 class TaskService:
     @staticmethod
     def get_tasks_optimized(
@@ -163,18 +491,30 @@ class TaskService:
 
         return queryset.distinct()
 
+    @staticmethod
+    def get_overdue_task_ids(user: User) -> QuerySet:
+        """Ids of overdue tasks across the user's projects, oldest deadline
+        first. Only ``api_task_open_deadline_idx`` is read; callers page the
+        ids and then load the rows of one page."""
+        return (
+            Task.objects.overdue()
+            .filter(
+                project_id__in=ProjectMember.objects.filter(user=user).values(
+                    "project_id"
+                )
+            )
+            .order_by("deadline", "id")
+            .values_list("id", flat=True)
+        )
+
     @staticmethod
     def update_task_status(
         task: Task, new_status: str, user: User, order: Optional[int] = None
     ) -> Task:
         old_status = task.status
         if old_status != new_status:
-            TaskHistory.objects.create(
-                task=task,
-                changed_by=user,
-                field_name="status",
-                old_value=old_status,
-                new_value=new_status,
+            TaskHistoryService.record_changes(
+                task, user, {"status": (old_status, new_status)}
             )
             task.status = new_status
 
@@ -202,6 +542,142 @@ class TaskService:
         }
 
 
+class TaskHistoryService:
+    """Per-field history rows for recent changes, compacted change-sets for old ones"""
+
+    @staticmethod
+    def record_changes(
+        task: Task, user: User, changes: Dict[str, Tuple[Any, Any]]
+    ) -> List[TaskHistory]:
+        # One timestamp per save lets compaction regroup the rows later.
+        changed_at = timezone.now()
+        return TaskHistory.objects.bulk_create(
+            [
+                TaskHistory(
+                    task=task,
+                    project_id=task.project_id,
+                    changed_by=user,
+                    field_name=field,
+                    old_value=TaskHistoryService._to_text(old_value),
+                    new_value=TaskHistoryService._to_text(new_value),
+                    changed_at=changed_at,
+                )
+                for field, (old_value, new_value) in changes.items()
+            ]
+        )
+
+    USER_COLUMNS = ["id", "username", "email", "first_name", "last_name"]
+
+    @staticmethod
+    def get_task_history(task_id: int) -> QuerySet:
+        return (
+            TaskHistory.objects.filter(task_id=task_id)
+            .select_related("changed_by")
+            .only(
+                "id",
+                "task_id",
+                "field_name",
+                "old_value",
+                "new_value",
+                "changed_at",
+                *TaskHistoryService._user_columns(),
+            )
+        )
+
+    @staticmethod
+    def get_archived_history(task_id: int) -> QuerySet:
+        return (
+            TaskHistoryArchive.objects.filter(task_id=task_id)
+            .select_related("changed_by")
+            .only(
+                "id",
+                "task_id",
+                "changes",
+                "changed_at",
+                *TaskHistoryService._user_columns(),
+            )
+        )
+
+    @staticmethod
+    def get_project_activity(project_id: int) -> QuerySet:
+        return (
+            TaskHistory.objects.filter(project_id=project_id)
+            .select_related("changed_by", "task")
+            .only(
+                "id",
+                "task__id",
+                "task__title",
+                "field_name",
+                "old_value",
+                "new_value",
+                "changed_at",
+                *TaskHistoryService._user_columns(),
+            )
+        )
+
+    @staticmethod
+    def compact_history(before: datetime, batch_size: int = 1000) -> int:
+        """Roll rows older than ``before`` into TaskHistoryArchive, one row per save"""
+        compacted = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    TaskHistory.objects.filter(changed_at__lt=before)
+                    .order_by("changed_at", "id")
+                    .values(
+                        "id",
+                        "task_id",
+                        "changed_by_id",
+                        "field_name",
+                        "old_value",
+                        "new_value",
+                        "changed_at",
+                    )[:batch_size]
+                )
+                if not rows:
+                    break
+
+                # Don't split a save across batches: leave its tail for the next one.
+                if len(rows) == batch_size:
+                    last_changed_at = rows[-1]["changed_at"]
+                    head = [r for r in rows if r["changed_at"] != last_changed_at]
+                    rows = head or rows
+
+                change_sets: Dict[Tuple[int, int, datetime], Dict[str, List[str]]] = {}
+                for row in rows:
+                    key = (row["task_id"], row["changed_by_id"], row["changed_at"])
+                    change_sets.setdefault(key, {})[row["field_name"]] = [
+                        row["old_value"],
+                        row["new_value"],
+                    ]
+
+                TaskHistoryArchive.objects.bulk_create(
+                    [
+                        TaskHistoryArchive(
+                            task_id=task_id,
+                            changed_by_id=changed_by_id,
+                            changed_at=changed_at,
+                            changes=changes,
+                        )
+                        for (task_id, changed_by_id, changed_at), changes in (
+                            change_sets.items()
+                        )
+                    ]
+                )
+                TaskHistory.objects.filter(id__in=[r["id"] for r in rows]).delete()
+                compacted += len(rows)
+
+        return compacted
+
+    @staticmethod
+    def _user_columns() -> List[str]:
+        return [f"changed_by__{column}" for column in TaskHistoryService.USER_COLUMNS]
+
+    @staticmethod
+    def _to_text(value: Any) -> str:
+        return str(value) if value else ""
+
+
 class CommentService:
     @staticmethod
     def get_task_comments(task_id: int) -> QuerySet:
@@ -243,6 +719,245 @@ class CommentService:
         }
 
 
+class NotificationService:
+    """Persisted notifications with digest batching and a cached unread counter"""
+
+    @staticmethod
+    def notify(
+        recipient_id: int,
+        kind: str,
+        title: str,
+        body: str = "",
+        task: Optional[Task] = None,
+    ) -> Notification:
+        """Stores a notification, folding it into an unread one for the same
+        task and kind if that was touched within the digest window. Only the
+        first event of a digest is pushed over the websocket."""
+        now = timezone.now()
+        window = timedelta(seconds=settings.NOTIFICATION_DIGEST_WINDOW_SECONDS)
+
+        with transaction.atomic():
+            notification = (
+                Notification.objects.select_for_update()
+                .filter(
+                    recipient_id=recipient_id,
+                    task=task,
+                    kind=kind,
+                    is_read=False,
+                    updated_at__gte=now - window,
+                )
+                .order_by("-updated_at")
+                .first()
+            )
+            if notification is not None:
+                notification.count += 1
+                notification.body = body
+                notification.updated_at = now
+                notification.save(update_fields=["count", "body", "updated_at"])
+                return notification
+
+            notification = Notification.objects.create(
+                recipient_id=recipient_id,
+                task=task,
+                kind=kind,
+                title=title,
+                body=body,
+                updated_at=now,
+            )
+
+        unread_count = NotificationService._incr_unread_count(recipient_id)
+        RealtimeService.send_to_user(
+            recipient_id,
+            {
+                "id": notification.id,
+                "title": title,
+                "body": body,
+                "task_id": task.id if task else None,
+                "unread_count": unread_count,
+            },
+        )
+        return notification
+
+    @staticmethod
+    def get_inbox(user: User, unread_only: bool = False) -> QuerySet:
+        queryset = Notification.objects.filter(recipient=user)
+        if unread_only:
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+    @staticmethod
+    def get_unread_count(user_id: int) -> int:
+        cache_key = NotificationService._unread_cache_key(user_id)
+        count = cache.get(cache_key)
+        if count is None:
+            count = Notification.objects.filter(
+                recipient_id=user_id, is_read=False
+            ).count()
+            cache.set(cache_key, count, settings.NOTIFICATION_UNREAD_COUNT_SECONDS)
+        return count
+
+    @staticmethod
+    def invalidate_unread_counts(user_ids: Iterable[int]) -> None:
+        """For deletes that bypass mark_read (task and project cascades)"""
+        keys = [NotificationService._unread_cache_key(pk) for pk in set(user_ids)]
+        if not keys:
+            return
+        # Again after commit: a concurrent read may recount the deleted rows
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def mark_read(user: User, notification_ids: Optional[List[int]] = None) -> int:
+        """Marks the given (or all) unread notifications as read"""
+        queryset = Notification.objects.filter(recipient=user, is_read=False)
+        if notification_ids is not None:
+            queryset = queryset.filter(id__in=notification_ids)
+        updated = queryset.update(is_read=True)
+        if updated:
+            cache.delete(NotificationService._unread_cache_key(user.id))
+        return updated
+
+    @staticmethod
+    def _incr_unread_count(user_id: int) -> int:
+        try:
+            return cache.incr(NotificationService._unread_cache_key(user_id))
+        except ValueError:
+            return NotificationService.get_unread_count(user_id)
+
+    @staticmethod
+    def _unread_cache_key(user_id: int) -> str:
+        return f"notifications_unread_{user_id}"
+
+
+class PresenceService:
+    """Who is viewing a project board, kept in Redis.
+
+    Each project has a sorted set ``presence:project:{id}`` of user ids
+    scored by heartbeat expiry, so a heartbeat is a single ZADD no matter
+    how many sockets are open, and per viewer a set ``...:sockets:{user}``
+    of their open sockets' channel names, so closing one of several tabs
+    doesn't drop the viewer. Every heartbeat re-adds its socket, so the set
+    is rebuilt from the live sockets after an expiry. Joins and leaves are
+    queued in two small sets and flushed as one diff at most once per
+    ``BROADCAST_INTERVAL``; the caller that wins the ``SET NX`` throttle is
+    responsible for the flush.
+    """
+
+    BROADCAST_INTERVAL = 1
+
+    # Removing the socket and, for the user's last one, the viewer must be
+    # one step, or a join between them would be lost
+    LEAVE_SCRIPT = """
+    redis.call('SREM', KEYS[2], ARGV[2])
+    if redis.call('SCARD', KEYS[2]) > 0 then
+        return 0
+    end
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('SADD', KEYS[3], ARGV[1])
+    redis.call('SREM', KEYS[4], ARGV[1])
+    return 1
+    """
+
+    @staticmethod
+    def join(project_id: int, user_id: int, socket: str) -> bool:
+        """Returns True if the caller should schedule a diff flush"""
+        key = PresenceService._key(project_id)
+        pipe = get_redis_connection("default").pipeline()
+        PresenceService._touch(pipe, key, user_id, socket)
+        pipe.sadd(f"{key}:joined", user_id)
+        pipe.srem(f"{key}:left", user_id)
+        return PresenceService._claim_flush(pipe, key)
+
+    @staticmethod
+    def leave(project_id: int, user_id: int, socket: str) -> bool:
+        """Only the user's last open socket removes them from the viewers"""
+        key = PresenceService._key(project_id)
+        connection = get_redis_connection("default")
+        last = connection.eval(
+            PresenceService.LEAVE_SCRIPT,
+            4,
+            key,
+            PresenceService._sockets_key(key, user_id),
+            f"{key}:left",
+            f"{key}:joined",
+            user_id,
+            socket,
+        )
+        if not last:
+            return False
+        return PresenceService._claim_flush(connection.pipeline(), key)
+
+    @staticmethod
+    def heartbeat(project_id: int, user_id: int, socket: str) -> bool:
+        """Extends the viewer's TTL; only re-announces expired viewers"""
+        key = PresenceService._key(project_id)
+        pipe = get_redis_connection("default").pipeline()
+        PresenceService._touch(pipe, key, user_id, socket)
+        added, *_ = pipe.execute()
+        if not added:
+            return False
+        return PresenceService.join(project_id, user_id, socket)
+
+    @staticmethod
+    def flush(project_id: int) -> Optional[Dict[str, List[int]]]:
+        """Collects queued joins/leaves plus viewers whose heartbeat lapsed"""
+        key = PresenceService._key(project_id)
+        now = time.time()
+        pipe = get_redis_connection("default").pipeline()
+        pipe.zrangebyscore(key, "-inf", now)
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.smembers(f"{key}:joined")
+        pipe.smembers(f"{key}:left")
+        pipe.delete(f"{key}:joined", f"{key}:left")
+        expired, _, joined, left, _ = pipe.execute()
+        if expired:
+            # None of their sockets sent a heartbeat within the TTL; live ones
+            # add themselves back with the next one
+            get_redis_connection("default").delete(
+                *[PresenceService._sockets_key(key, user_id) for user_id in expired]
+            )
+
+        joined = {int(user_id) for user_id in joined}
+        left = {int(user_id) for user_id in [*left, *expired]} - joined
+        if not joined and not left:
+            return None
+        return {"joined": sorted(joined), "left": sorted(left)}
+
+    @staticmethod
+    def get_viewers(project_id: int) -> List[int]:
+        key = PresenceService._key(project_id)
+        return [
+            int(user_id)
+            for user_id in get_redis_connection("default").zrangebyscore(
+                key, time.time(), "+inf"
+            )
+        ]
+
+    @staticmethod
+    def _claim_flush(pipe: Any, key: str) -> bool:
+        pipe.set(
+            f"{key}:flush", 1, nx=True, px=PresenceService.BROADCAST_INTERVAL * 1000
+        )
+        return bool(pipe.execute()[-1])
+
+    @staticmethod
+    def _touch(pipe: Any, key: str, user_id: int, socket: str) -> None:
+        ttl = settings.PRESENCE_TTL_SECONDS
+        sockets = PresenceService._sockets_key(key, user_id)
+        pipe.zadd(key, {user_id: time.time() + ttl})
+        pipe.sadd(sockets, socket)
+        pipe.expire(key, ttl)
+        pipe.expire(sockets, ttl)
+
+    @staticmethod
+    def _key(project_id: int) -> str:
+        return f"presence:project:{project_id}"
+
+    @staticmethod
+    def _sockets_key(key: str, user_id: Any) -> str:
+        return f"{key}:sockets:{int(user_id)}"
+
+
 class MembershipService:
     @staticmethod
     def add_member(project: Project, user: User, role: str = "viewer") -> ProjectMember:
@@ -254,7 +969,8 @@ class MembershipService:
             membership.role = role
             membership.save()
 
-        ProjectService.invalidate_project_cache(project.id, [user.id])
+        ProjectService.invalidate_project_cache(project.id)
+        ProjectService.invalidate_member_roles(project.id)
         RealtimeService.send_to_project(
             project.id,
             "member_added",
@@ -266,7 +982,8 @@ class MembershipService:
     @staticmethod
     def remove_member(project: Project, user: User) -> None:
         ProjectMember.objects.filter(project=project, user=user).delete()
-        ProjectService.invalidate_project_cache(project.id, [user.id])
+        ProjectService.invalidate_project_cache(project.id)
+        ProjectService.invalidate_member_roles(project.id)
         RealtimeService.send_to_project(
             project.id, "member_removed", {"user_id": user.id}
         )
@@ -277,7 +994,8 @@ class MembershipService:
         membership.role = role
         membership.save()
 
-        ProjectService.invalidate_project_cache(project.id, [user.id])
+        ProjectService.invalidate_project_cache(project.id)
+        ProjectService.invalidate_member_roles(project.id)
         RealtimeService.send_to_project(
             project.id,
             "member_updated",
@@ -292,3 +1010,59 @@ class MembershipService:
             return ProjectMember.objects.get(project=project, user=user).role
         except ProjectMember.DoesNotExist:
             return None
+
+
+class UserService:
+    """Email lookups served by the LOWER(email) unique index (migration 0006)"""
+
+    PROFILES_GENERATION_KEY = "user_profiles_generation"
+
+    @staticmethod
+    def get_profiles_generation() -> int:
+        """Counter bumped when any user's rendered fields may have changed;
+        part of every ETag whose payload embeds user blocks"""
+        key = UserService.PROFILES_GENERATION_KEY
+        generation = cache.get(key)
+        if generation is None:
+            # Seeded from the clock like project generations
+            generation = int(time.time() * 1000)
+            if not cache.add(key, generation, None):
+                generation = cache.get(key, generation)
+        return generation
+
+    @staticmethod
+    def bump_profiles_generation() -> None:
+        try:
+            cache.incr(UserService.PROFILES_GENERATION_KEY)
+        except ValueError:
+            UserService.get_profiles_generation()
+
+    @staticmethod
+    def by_email(email: str) -> QuerySet:
+        # The index is partial (email <> ''), so the query has to imply that
+        return User.objects.alias(email_lower=Lower("email")).filter(
+            ~Q(email=""), email_lower=email.lower()
+        )
+
+    @staticmethod
+    def search(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Users whose email, username or name contains ``query``"""
+        fields = ("id", "username", "email", "first_name", "last_name")
+        found: List[Dict[str, Any]] = []
+        if "@" in query:
+            # Email prefixes are an index range scan, and usually all that a
+            # query with '@' is after; the substring scan only fills the rest
+            found = list(
+                User.objects.alias(email_lower=Lower("email"))
+                .filter(~Q(email=""), email_lower__startswith=query.lower())
+                .values(*fields)[:limit]
+            )
+            if len(found) == limit:
+                return found
+        users = User.objects.filter(
+            Q(email__icontains=query)
+            | Q(username__icontains=query)
+            | Q(first_name__icontains=query)
+            | Q(last_name__icontains=query)
+        ).exclude(id__in=[row["id"] for row in found])
+        return found + list(users.values(*fields)[: limit - len(found)])
@@ -1,34 +1,33 @@
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
+from django.contrib.auth.models import User
 from asgiref.sync import async_to_sync
-from .models import Task, Comment, TaskHistory
+from .models import Comment, Notification, Task
 from .serializers import TaskListSerializer, CommentSerializer
+from .services import NotificationService, TaskHistoryService, UserService
 
 
 @receiver(pre_save, sender=Task)
 def track_task_changes(sender, instance, **kwargs):
-    if instance.pk:
+    changed_by = getattr(instance, "_changed_by", None)
+    # Changes are only recorded when attributed, so skip the lookup otherwise
+    if instance.pk and changed_by:
         try:
             old_task = Task.objects.get(pk=instance.pk)
 
             tracked_fields = ["status", "priority", "assignee_id", "deadline"]
 
+            changes = {}
             for field in tracked_fields:
                 old_value = getattr(old_task, field)
                 new_value = getattr(instance, field)
 
                 if old_value != new_value:
-                    changed_by = getattr(instance, "_changed_by", None)
-
-                    if changed_by:
-                        TaskHistory.objects.create(
-                            task=instance,
-                            changed_by=changed_by,
-                            field_name=field,
-                            old_value=str(old_value) if old_value else "",
-                            new_value=str(new_value) if new_value else "",
-                        )
+                    changes[field] = (old_value, new_value)
+
+            if changes:
+                TaskHistoryService.record_changes(instance, changed_by, changes)
         except Task.DoesNotExist:
             pass
 
@@ -46,17 +45,13 @@ def broadcast_task_update(sender, instance, created, **kwargs):
         room_group_name, {"type": event_type, "task": serializer.data}
     )
 
-    if instance.assignee and not created:
-        async_to_sync(channel_layer.group_send)(
-            f"user_{instance.assignee.id}",
-            {
-                "type": "notification",
-                "message": {
-                    "title": "Task Updated",
-                    "body": f'Task "{instance.title}" has been updated',
-                    "task_id": instance.id,
-                },
-            },
+    if instance.assignee_id and not created:
+        NotificationService.notify(
+            instance.assignee_id,
+            "task_updated",
+            "Task Updated",
+            f'Task "{instance.title}" has been updated',
+            task=instance,
         )
 
 
@@ -82,15 +77,30 @@ def broadcast_comment_created(sender, instance, created, **kwargs):
             room_group_name, {"type": "comment_created", "comment": serializer.data}
         )
 
-        if instance.task.assignee and instance.task.assignee != instance.author:
-            async_to_sync(channel_layer.group_send)(
-                f"user_{instance.task.assignee.id}",
-                {
-                    "type": "notification",
-                    "message": {
-                        "title": "New Comment",
-                        "body": f'{instance.author.username} commented on "{instance.task.title}"',
-                        "task_id": instance.task.id,
-                    },
-                },
+        task = instance.task
+        if task.assignee_id and task.assignee_id != instance.author_id:
+            NotificationService.notify(
+                task.assignee_id,
+                "comment_created",
+                "New Comment",
+                f'{instance.author.username} commented on "{task.title}"',
+                task=task,
             )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def track_user_profile_changes(sender, instance, created=False, **kwargs):
+    # New users aren't rendered anywhere yet; logins and rehashes only touch
+    # fields no payload renders
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields and set(update_fields) <= {"last_login", "password"}):
+        return
+    UserService.bump_profiles_generation()
+
+
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    # Task deletes cascade to notifications without NotificationService
+    if not instance.is_read:
+        NotificationService.invalidate_unread_counts([instance.recipient_id])
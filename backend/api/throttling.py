@@ -0,0 +1,280 @@
+"""API throttling on Redis counters.
+
+Login and registration use fixed windows created with ``SET NX EX`` and
+bumped with ``INCR`` in one MULTI/EXEC, so concurrent workers never lose
+an attempt. Per client IP every auth attempt counts. Per account only
+failed passwords count, which caps guessing against one account from many
+addresses.
+
+The rest of the API uses sliding-window counters (REST_FRAMEWORK
+``DEFAULT_THROTTLE_CLASSES``): per user, per project and per endpoint
+class, with separate read and write budgets from
+``DEFAULT_THROTTLE_RATES``. The tightest budget of a request is reported
+in ``X-RateLimit-*`` headers by ``RateLimitHeadersMiddleware``.
+
+Without a Redis cache (e.g. locmem in local runs) the same counters are
+kept through the Django cache API, like DRF's own throttles, and are not
+atomic across processes.
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django_redis import get_redis_connection
+from django_redis.cache import RedisCache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .services import ProjectService
+
+
+def _redis() -> bool:
+    return isinstance(caches["default"], RedisCache)
+
+
+def _window_count(key: str, window: int, increment: bool) -> Tuple[int, int]:
+    """Returns (attempts in the current window, seconds until it resets)"""
+    if not _redis():
+        return _cache_window_count(key, window, increment)
+    pipe = get_redis_connection("default").pipeline()
+    if increment:
+        pipe.set(key, 0, ex=window, nx=True)
+        pipe.incr(key)
+    else:
+        pipe.get(key)
+    pipe.ttl(key)
+    *_, count, ttl = pipe.execute()
+    return int(count or 0), max(int(ttl), 1)
+
+
+def _cache_window_count(key: str, window: int, increment: bool) -> Tuple[int, int]:
+    # The cache API has no TTL lookup, so the window's end is stored beside it
+    if increment:
+        cache.add(f"{key}:reset", time.time() + window, window)
+        cache.add(key, 0, window)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            count = 1
+            cache.set(key, count, window)
+    else:
+        count = cache.get(key, 0)
+    reset = cache.get(f"{key}:reset", time.time() + window) - time.time()
+    return int(count), max(int(reset), 1)
+
+
+class AuthIPThrottle(BaseThrottle):
+    """Every login/register attempt from one client address"""
+
+    def allow_request(self, request, view) -> bool:
+        count, self.retry_after = _window_count(
+            f"throttle:auth:ip:{self.get_ident(request)}",
+            settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+            increment=True,
+        )
+        return count <= settings.LOGIN_ATTEMPTS_PER_IP
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
+
+
+class LoginAccountThrottle(BaseThrottle):
+    """Failed passwords for one email, recorded by the login view"""
+
+    def allow_request(self, request, view) -> bool:
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not isinstance(email, str) or not email:
+            return True
+        count, self.retry_after = _window_count(
+            self.key(email), settings.LOGIN_THROTTLE_WINDOW_SECONDS, increment=False
+        )
+        return count < settings.LOGIN_FAILURES_PER_ACCOUNT
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
+
+    @staticmethod
+    def key(email: str) -> str:
+        return f"throttle:auth:account:{email.lower()}"
+
+    @classmethod
+    def record_failure(cls, email: str) -> None:
+        _window_count(
+            cls.key(email), settings.LOGIN_THROTTLE_WINDOW_SECONDS, increment=True
+        )
+
+    @classmethod
+    def reset(cls, email: str) -> None:
+        if not _redis():
+            cache.delete(cls.key(email))
+            return
+        get_redis_connection("default").delete(cls.key(email))
+
+
+def _parse_rate(rate: str) -> Tuple[int, int]:
+    """DRF rate strings such as ``100/min`` -> (100, 60)"""
+    count, period = rate.split("/")
+    return int(count), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+# Estimate, compare and count in one step, so concurrent requests at the
+# limit can't all pass or all be refused. ARGV: limit, window, weight of
+# the previous window. Returns {allowed, estimate without this request}.
+SLIDING_WINDOW_SCRIPT = """
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local estimate = previous * tonumber(ARGV[3]) + current
+if estimate + 1 > tonumber(ARGV[1]) then
+    return {0, tostring(estimate)}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]) * 2)
+return {1, tostring(estimate)}
+"""
+
+
+def _sliding_window(
+    key: str, window: int, limit: int
+) -> Tuple[bool, float, float, str]:
+    """Sliding-window counter: the current fixed window plus the previous
+    one weighted by how much of it still overlaps the last ``window``
+    seconds. Returns (allowed, estimated requests, seconds into the window,
+    key of the current window). Rejected requests are not counted."""
+    now = time.time()
+    index = int(now // window)
+    elapsed = now - index * window
+    current = f"{key}:{index}"
+    weight = (window - elapsed) / window
+    if _redis():
+        script = get_redis_connection("default").register_script(SLIDING_WINDOW_SCRIPT)
+        allowed, estimate = script(
+            keys=[current, f"{key}:{index - 1}"], args=[limit, window, weight]
+        )
+    else:
+        estimate = cache.get(f"{key}:{index - 1}", 0) * weight + cache.get(current, 0)
+        allowed = estimate + 1 <= limit
+        if allowed:
+            cache.add(current, 0, window * 2)
+            cache.incr(current)
+    if not allowed:
+        return False, float(estimate), elapsed, current
+    return True, float(estimate) + 1, elapsed, current
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Base for the API throttles; subclasses pick the key and the rate.
+
+    DRF asks every throttle in turn. When one refuses, the budgets already
+    charged for the request are given back and the remaining throttles are
+    not charged.
+    """
+
+    def get_budget(self, request, view) -> Optional[Tuple[str, str]]:
+        """Returns (Redis key, rate name), or None to skip the request"""
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        if getattr(request._request, "throttled", False):
+            return True
+        budget = self.get_budget(request, view)
+        if budget is None:
+            return True
+        key, rate_name = budget
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(rate_name)
+        if rate is None:
+            return True
+        limit, window = _parse_rate(rate)
+
+        allowed, estimate, elapsed, counter = _sliding_window(
+            f"throttle:{key}", window, limit
+        )
+        self.retry_after = None if allowed else window - elapsed
+        self.record(request, limit, max(int(limit - estimate), 0), window - elapsed)
+        if allowed:
+            charged = getattr(request._request, "throttle_charged", [])
+            request._request.throttle_charged = [*charged, counter]
+        else:
+            request._request.throttled = True
+            self.refund(getattr(request._request, "throttle_charged", []))
+        return allowed
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
+
+    @staticmethod
+    def refund(counters: List[str]) -> None:
+        if counters and not _redis():
+            for counter in counters:
+                try:
+                    cache.decr(counter)
+                except ValueError:
+                    pass
+        elif counters:
+            pipe = get_redis_connection("default").pipeline()
+            for counter in counters:
+                pipe.decr(counter)
+            pipe.execute()
+
+    @staticmethod
+    def record(request, limit: int, remaining: int, reset: float) -> None:
+        """Keeps the budget closest to running out for the response headers"""
+        current = getattr(request._request, "rate_limit", None)
+        if current is None or remaining < current[1]:
+            request._request.rate_limit = (limit, remaining, int(reset) + 1)
+
+    @staticmethod
+    def kind(request) -> str:
+        return "read" if request.method in SAFE_METHODS else "write"
+
+
+class UserRateThrottle(SlidingWindowThrottle):
+    """All requests of one user (or one address when anonymous)"""
+
+    def get_budget(self, request, view) -> Optional[Tuple[str, str]]:
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        kind = self.kind(request)
+        return f"{ident}:{kind}", f"user_{kind}"
+
+
+class ProjectRateThrottle(SlidingWindowThrottle):
+    """All requests of the members of one project.
+
+    The project comes from the view's ``throttle_project_kwarg`` URL
+    argument, else from the ``project`` query parameter or request field.
+    Requests that don't name their project (a task by id) are skipped
+    rather than costing a query, and so are requests from non-members
+    (checked against the cached role map), who could otherwise spend
+    another team's budget.
+    """
+
+    def get_budget(self, request, view) -> Optional[Tuple[str, str]]:
+        kwarg = getattr(view, "throttle_project_kwarg", None)
+        if kwarg:
+            project_id = view.kwargs.get(kwarg)
+        else:
+            project_id = request.query_params.get("project")
+            if project_id is None and hasattr(request.data, "get"):
+                project_id = request.data.get("project")
+        if not str(project_id or "").isdigit() or not request.user.is_authenticated:
+            return None
+        if request.user.pk not in ProjectService.get_member_roles(int(project_id)):
+            return None
+        kind = self.kind(request)
+        return f"project:{project_id}:{kind}", f"project_{kind}"
+
+
+class EndpointRateThrottle(SlidingWindowThrottle):
+    """Expensive endpoint classes (listing, search, reports) per user, from
+    the view's ``throttle_scopes`` mapping of action to rate name"""
+
+    def get_budget(self, request, view) -> Optional[Tuple[str, str]]:
+        scope = getattr(view, "throttle_scopes", {}).get(getattr(view, "action", None))
+        if scope is None or not request.user.is_authenticated:
+            return None
+        return f"scope:{scope}:{request.user.pk}", scope
@@ -0,0 +1,48 @@
+"""JWT revocation backed by Redis instead of the simplejwt blacklist app.
+
+The blacklist app records every issued refresh token in the database and
+checks the outstanding/blacklisted tables on each refresh. Here only
+revoked token ids (``jti``) are stored, one Redis key per token expiring
+together with the token, so a check is a single EXISTS and expired
+entries purge themselves.
+"""
+
+import time
+
+from django_redis import get_redis_connection
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+
+
+class TokenRevocation:
+    @staticmethod
+    def revoke(token: Token) -> None:
+        ttl = int(token["exp"] - time.time())
+        if ttl > 0:
+            get_redis_connection("default").set(
+                TokenRevocation._key(token[api_settings.JTI_CLAIM]), 1, ex=ttl
+            )
+
+    @staticmethod
+    def is_revoked(jti: str) -> bool:
+        return bool(get_redis_connection("default").exists(TokenRevocation._key(jti)))
+
+    @staticmethod
+    def _key(jti: str) -> str:
+        return f"revoked:jti:{jti}"
+
+
+class RevocableTokenMixin:
+    def verify(self) -> None:
+        super().verify()
+        if TokenRevocation.is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is revoked")
+
+
+class RevocableAccessToken(RevocableTokenMixin, AccessToken):
+    pass
+
+
+class RevocableRefreshToken(RevocableTokenMixin, RefreshToken):
+    access_token_class = RevocableAccessToken
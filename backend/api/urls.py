@@ -1,13 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .viewsets import ProjectViewSet, TaskViewSet, CommentViewSet, UserViewSet
+from .viewsets import (
+    ProjectViewSet,
+    TaskViewSet,
+    CommentViewSet,
+    UserViewSet,
+    NotificationViewSet,
+)
 from .auth_views import register, login, logout, me, refresh_token
+from . import async_views
+from .profiling import metrics
 
 router = DefaultRouter()
 router.register(r"projects", ProjectViewSet, basename="project")
 router.register(r"tasks", TaskViewSet, basename="task")
 router.register(r"comments", CommentViewSet, basename="comment")
 router.register(r"users", UserViewSet, basename="user")
+router.register(r"notifications", NotificationViewSet, basename="notification")
 
 urlpatterns = [
     path("auth/register/", register, name="auth-register"),
@@ -15,5 +24,14 @@ urlpatterns = [
     path("auth/logout/", logout, name="auth-logout"),
     path("auth/me/", me, name="auth-me"),
     path("auth/token/refresh/", refresh_token, name="auth-token-refresh"),
+    path("async/auth/me/", async_views.me, name="async-auth-me"),
+    path(
+        "async/projects/<int:project_id>/board/",
+        async_views.project_board,
+        name="async-project-board",
+    ),
+    path("async/tasks/", async_views.task_list, name="async-task-list"),
+    path("async/comments/", async_views.comment_list, name="async-comment-list"),
+    path("metrics/", metrics, name="metrics"),
     path("", include(router.urls)),
 ]
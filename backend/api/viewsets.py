@@ -1,12 +1,34 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, mixins, status, filters
+from rest_framework.serializers import BaseSerializer
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import (
+    Count,
+    Max,
+    Prefetch,
+    Q,
+    QuerySet,
+    prefetch_related_objects,
+)
+from django.http import Http404
 from django.views.decorators.csrf import csrf_exempt
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 from django.utils.decorators import method_decorator
+from typing import Any, Callable, Dict, List, Tuple
+import hashlib
 from .serializers import UserSerializer
 
 from .models import Project, Task, Comment, ProjectMember
@@ -16,15 +38,251 @@ from .serializers import (
     TaskListSerializer,
     TaskDetailSerializer,
     TaskStatusUpdateSerializer,
+    TaskHistorySerializer,
+    TaskHistoryArchiveSerializer,
+    ProjectActivitySerializer,
     CommentSerializer,
     ProjectMemberSerializer,
+    NotificationSerializer,
+    FastProjectListSerializer,
+    FastTaskListSerializer,
+    parse_field_list,
+)
+from .db_routers import (
+    has_recent_write,
+    mark_recent_write,
+    pin_to_primary,
+    replica_reads,
 )
+from .filters import TaskFilter
+from .pagination import HistoryPagination, CommentPagination, NotificationPagination
 from .permissions import ProjectPermission, TaskPermission, CommentPermission
-from .services import ProjectService, TaskService, CommentService, MembershipService
+from .services import (
+    ProjectService,
+    ProjectDeletionService,
+    TaskService,
+    TaskHistoryService,
+    CommentService,
+    MembershipService,
+    NotificationService,
+    PresenceService,
+    UserService,
+)
+
+
+class SparseFieldsetMixin:
+    """Narrows list querysets to what a ``?fields=`` request actually renders.
+
+    Forward relations the serializer still renders are joined with
+    ``select_related`` and all columns are restricted with ``only()``.
+    Reverse relations (and method fields backed by them) are prefetched only
+    when their field survives, using the lookups in ``sparse_prefetch``.
+    Detail actions keep the full queryset because object permissions walk
+    relations the serializer may not render.
+    """
+
+    sparse_prefetch: Dict[str, Any] = {}
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter_queryset(queryset)
+        if self.action == "list" and "fields" in self.request.query_params:
+            queryset = self.prune_queryset(queryset)
+        return queryset
+
+    def prune_queryset(self, queryset: QuerySet) -> QuerySet:
+        serializer = self.get_serializer()
+        source_columns = getattr(serializer.Meta, "source_columns", {})
+        opts = queryset.model._meta
+        columns = {opts.pk.name}
+        related = set()
+        prefetch = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in self.sparse_prefetch:
+                prefetch.append(self.sparse_prefetch[name])
+                continue
+            if name in source_columns:
+                columns.update(source_columns[name])
+                continue
+            if field.source == "*":
+                continue
+
+            head, _, rest = field.source.partition(".")
+            try:
+                model_field = opts.get_field(head)
+            except FieldDoesNotExist:
+                continue  # annotation
+            if not model_field.concrete:
+                continue
+
+            if model_field.is_relation and isinstance(field, BaseSerializer):
+                related.add(head)
+                remote_pk = model_field.related_model._meta.pk.name
+                columns.add(f"{head}__{remote_pk}")
+                columns.update(
+                    f"{head}__{sub.source}"
+                    for sub in field.fields.values()
+                    if sub.source != "*"
+                )
+            elif model_field.is_relation and rest:
+                related.add(head)
+                columns.add(f"{head}__{rest}")
+            else:
+                columns.add(head)
+
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .select_related(*related)
+            .prefetch_related(*prefetch)
+            .only(*columns)
+        )
+
+
+class FastListMixin:
+    """Serves plain list requests through ``fast_list_serializer``.
+
+    Requests that customise the representation (``?fields=``/``?expand=``)
+    still go through the regular DRF serializer.
+    """
+
+    fast_list_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if (
+            self.fast_list_serializer is None
+            or not settings.API_FAST_LIST_SERIALIZATION
+            or "fields" in request.query_params
+            or "expand" in request.query_params
+        ):
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_list_serializer()
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.render(page))
+        return Response(serializer.render(rows))
+
+
+class ConditionalGetMixin:
+    """ETag / Last-Modified for list and retrieve, answered before serializing.
+
+    Validators come from cheap queries (``MAX(updated_at)`` and a count for
+    lists, the object's own ``updated_at`` for details) plus project
+    generations where the representation includes related rows, and the
+    users' profile generation for the embedded user blocks. The ETag is
+    authoritative: Last-Modified is advertised, but deletions and related-row
+    changes don't move ``MAX(updated_at)``, so revalidation uses the ETag only.
+    """
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        # list() needs the filtered queryset for the validators and again for
+        # the page; filter backends (e.g. ModelChoiceFilter lookups) run once
+        if self.action != "list":
+            return super().filter_queryset(queryset)
+        if getattr(self, "_filtered_list_queryset", None) is None:
+            self._filtered_list_queryset = super().filter_queryset(queryset)
+        return self._filtered_list_queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        parts, last_modified = self.get_list_validators(queryset)
+        build_list = super().list
+        return self.conditional_response(
+            parts, last_modified, lambda: build_list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        parts, last_modified = self.get_object_validators(instance)
+        return self.conditional_response(
+            parts,
+            last_modified,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+    def get_list_validators(self, queryset: QuerySet) -> Tuple[List[Any], Any]:
+        stats = queryset.order_by().aggregate(
+            last_modified=Max("updated_at"), count=Count("pk", distinct=True)
+        )
+        return [stats["count"], stats["last_modified"]], stats["last_modified"]
+
+    def get_object_validators(self, instance: Any) -> Tuple[List[Any], Any]:
+        return [instance.pk, instance.updated_at], instance.updated_at
+
+    def conditional_response(
+        self, parts: List[Any], last_modified: Any, build: Callable[[], Response]
+    ) -> Any:
+        request = self.request
+        fingerprint = "|".join(
+            str(part)
+            for part in [
+                request.user.pk,
+                request.get_full_path(),
+                request.accepted_media_type,
+                UserService.get_profiles_generation(),
+                *parts,
+            ]
+        )
+        etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = build()
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class ReplicaReadMixin:
+    """Serves ``replica_actions`` from a read replica (see ``api.db_routers``).
+
+    Successful writes mark the user as a recent writer; their following
+    requests stay on the primary for REPLICA_STICKY_SECONDS.
+    """
+
+    replica_actions: Tuple[str, ...] = ("list", "retrieve")
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if settings.DATABASE_REPLICAS and action in self.replica_actions:
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        # Before permission checks, which read memberships the user may just
+        # have changed
+        if request.user.is_authenticated and settings.DATABASE_REPLICAS:
+            if has_recent_write(request.user.id):
+                pin_to_primary()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            mark_recent_write(request.user.id)
+        return super().finalize_response(request, response, *args, **kwargs)
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = [IsAuthenticated, ProjectPermission]
     filter_backends = [
         DjangoFilterBackend,
@@ -35,12 +293,49 @@ class ProjectViewSet(viewsets.ModelViewSet):
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "updated_at", "title"]
     ordering = ["-created_at"]
+    sparse_prefetch = {"members": "members__user"}
+    replica_actions = ("list", "retrieve", "statistics")
+    fast_list_serializer = FastProjectListSerializer
+    throttle_project_kwarg = "pk"
+    throttle_scopes = {
+        "list": "listing",
+        "statistics": "reports",
+        "activity": "reports",
+    }
+    # SQL queries per action, enforced by RequestProfilingMiddleware in tests
+    query_budgets = {
+        "list": 4,
+        "retrieve": 3,
+        "create": 5,
+        "update": 7,
+        "partial_update": 7,
+        "destroy": 4,
+        "deletion": 1,
+        "board": 4,
+        "statistics": 3,
+        "activity": 3,
+        "viewers": 2,
+        "add_member": 10,
+        "remove_member": 7,
+    }
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Project.objects.filter(members__user=user).exclude(status="deleting")
+        # These actions don't render the members prefetched below (membership
+        # changes prefetch them after the write instead)
+        if self.action in (
+            "board",
+            "viewers",
+            "statistics",
+            "activity",
+            "destroy",
+            "add_member",
+            "remove_member",
+        ):
+            return queryset
         return (
-            Project.objects.filter(members__user=user)
-            .select_related("owner")
+            queryset.select_related("owner")
             .prefetch_related("members__user")
             .distinct()
         )
@@ -55,12 +350,73 @@ class ProjectViewSet(viewsets.ModelViewSet):
         ProjectMember.objects.get_or_create(
             project=project, user=self.request.user, defaults={"role": "owner"}
         )
+        ProjectService.invalidate_member_roles(project.id)
         return project
 
+    def perform_update(self, serializer):
+        project = serializer.save()
+        ProjectService.invalidate_project_cache(project.id)
+
+    def destroy(self, request, *args, **kwargs):
+        """Удаление в фоне пакетами; прогресс доступен в deletion/"""
+        project = self.get_object()
+        progress = ProjectDeletionService.start(project, request.user)
+        return Response(progress, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"])
+    def deletion(self, request, pk=None):
+        """Прогресс удаления проекта (только для инициатора)"""
+        progress = ProjectDeletionService.get_progress(pk)
+        if progress is None or progress["requested_by"] != request.user.id:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(progress)
+
+    def get_list_validators(self, queryset):
+        rows = list(queryset.order_by().values_list("id", "updated_at"))
+        generations = ProjectService.get_generations([pk for pk, _ in rows])
+        last_modified = max((updated for _, updated in rows), default=None)
+        return [sorted(generations.items()), last_modified], last_modified
+
+    def get_object_validators(self, instance):
+        generation = ProjectService.get_generation(instance.id)
+        return [instance.pk, instance.updated_at, generation], instance.updated_at
+
     def retrieve(self, request, *args, **kwargs):
+        """Детали проекта из кэша поколения, общего для всех участников"""
+        if "fields" in request.query_params or not str(kwargs["pk"]).isdigit():
+            return super().retrieve(request, *args, **kwargs)
+        project_id = int(kwargs["pk"])
+        generation = ProjectService.get_generation(project_id)
+        profiles = UserService.get_profiles_generation()
+        detail = ProjectService.get_project_detail(
+            project_id, request.user, generation, profiles
+        )
+        if detail is None or detail["status"] == "deleting":
+            raise Http404
+        # Project edits, task and membership changes all bump the generation;
+        # renamed members the profiles generation
+        return self.conditional_response(
+            [project_id, generation],
+            parse_datetime(detail["updated_at"]),
+            lambda: Response(detail),
+        )
+
+    @action(detail=True, methods=["get"])
+    def board(self, request, pk=None):
+        """Снимок Kanban-доски одним запросом; неизменённая доска отдаёт 304"""
         project = self.get_object()
-        serializer = self.get_serializer(project)
-        return Response(serializer.data)
+        generation = ProjectService.get_generation(project.id)
+        # Members are listed with their names, like ConditionalGetMixin's users
+        profiles = UserService.get_profiles_generation()
+        etag = f'"board-{project.id}-{generation}-{profiles}"'
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(ProjectService.get_board(project, generation, profiles))
+        response["ETag"] = etag
+        return response
 
     @action(detail=True, methods=["get"])
     def statistics(self, request, pk=None):
@@ -68,6 +424,31 @@ class ProjectViewSet(viewsets.ModelViewSet):
         stats = ProjectService.get_project_statistics(project.id)
         return Response(stats)
 
+    @action(detail=True, methods=["get"])
+    def viewers(self, request, pk=None):
+        """Пользователи, которые сейчас смотрят доску проекта"""
+        project = self.get_object()
+        viewer_ids = PresenceService.get_viewers(project.id)
+        users = User.objects.filter(id__in=viewer_ids).values(
+            "id", "username", "first_name", "last_name"
+        )
+        return Response(list(users))
+
+    @extend_schema(
+        parameters=[OpenApiParameter("cursor", str)],
+        responses={200: ProjectActivitySerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def activity(self, request, pk=None):
+        """Лента изменений задач проекта (keyset-пагинация по changed_at, id)"""
+        project = self.get_object()
+        paginator = HistoryPagination()
+        page = paginator.paginate_queryset(
+            TaskHistoryService.get_project_activity(project.id), request, view=self
+        )
+        serializer = ProjectActivitySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @extend_schema(
         request=ProjectMemberSerializer,
         responses={200: ProjectDetailSerializer},
@@ -91,6 +472,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
             )
 
         MembershipService.add_member(project, user, role)
+        prefetch_related_objects([project], "owner", "members__user")
 
         serializer = ProjectDetailSerializer(project, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -118,39 +500,119 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 {"detail": "User not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        prefetch_related_objects([project], "owner", "members__user")
         serializer = ProjectDetailSerializer(project, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @method_decorator(csrf_exempt, name="dispatch")
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = [IsAuthenticated, TaskPermission]
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
         filters.OrderingFilter,
     ]
-    filterset_fields = ["project", "status", "priority", "assignee"]
+    filterset_class = TaskFilter
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "updated_at", "deadline", "priority", "order"]
     ordering = ["order", "-created_at"]
+    fast_list_serializer = FastTaskListSerializer
+    replica_actions = ("list", "retrieve", "overdue")
+    throttle_scopes = {"list": "listing", "overdue": "listing", "history": "reports"}
+    query_budgets = {
+        "list": 5,
+        "overdue": 3,
+        "retrieve": 3,
+        "create": 3,
+        "update": 7,
+        "partial_update": 7,
+        "destroy": 8,
+        "update_status": 8,
+        "comments": 3,
+        "history": 3,
+    }
 
     def get_queryset(self):
         user = self.request.user
-        return (
+        queryset = (
             Task.objects.filter(project__members__user=user)
+            # Their rows are being removed in batches, see ProjectDeletionService
+            .exclude(project__status="deleting")
             .select_related("project", "assignee", "created_by")
-            .prefetch_related("comments")
+            .with_overdue()
             .distinct()
         )
+        if "comments" in parse_field_list(self.request.query_params.get("expand")):
+            queryset = queryset.prefetch_related(
+                Prefetch("comments", queryset=Comment.objects.select_related("author"))
+            )
+        return queryset
 
     def get_serializer_class(self):
         return TaskListSerializer if self.action == "list" else TaskDetailSerializer
 
     def perform_create(self, serializer):
         task = serializer.save(created_by=self.request.user)
+        ProjectService.invalidate_project_cache(task.project_id)
         return task
 
+    def perform_update(self, serializer):
+        old_project_id = serializer.instance.project_id
+        task = serializer.save()
+        ProjectService.invalidate_project_cache(task.project_id)
+        if task.project_id != old_project_id:
+            ProjectService.invalidate_project_cache(old_project_id)
+
+    def perform_destroy(self, instance):
+        project_id = instance.project_id
+        instance.delete()
+        ProjectService.invalidate_project_cache(project_id)
+
+    def get_list_validators(self, queryset):
+        # Rows embed their project's title and, through is_overdue, the clock:
+        # per project, its generation and how many of the tasks are overdue
+        now = timezone.now()
+        per_project = list(
+            queryset.order_by()
+            .values("project_id")
+            .annotate(
+                count=Count("pk", distinct=True),
+                overdue_count=Count(
+                    "pk",
+                    distinct=True,
+                    filter=Q(deadline__lt=now) & ~Q(status="done"),
+                ),
+                last_modified=Max("updated_at"),
+            )
+        )
+        generations = ProjectService.get_generations(
+            [row["project_id"] for row in per_project]
+        )
+        parts = sorted(
+            (
+                row["project_id"],
+                row["count"],
+                row["overdue_count"],
+                generations[row["project_id"]],
+            )
+            for row in per_project
+        )
+        last_modified = max((row["last_modified"] for row in per_project), default=None)
+        return [parts, last_modified], last_modified
+
+    def get_object_validators(self, instance):
+        # Covers the project title and, with ?expand=comments, the comments
+        generation = ProjectService.get_generation(instance.project_id)
+        parts = [instance.pk, instance.updated_at, generation, instance.is_overdue]
+        return parts, instance.updated_at
+
     @extend_schema(
         request=TaskStatusUpdateSerializer,
         responses={200: TaskDetailSerializer},
@@ -170,42 +632,159 @@ class TaskViewSet(viewsets.ModelViewSet):
             return Response(TaskDetailSerializer(updated_task).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(responses={200: TaskListSerializer(many=True)})
+    @action(detail=False, methods=["get"])
+    def overdue(self, request):
+        """Просроченные задачи во всех проектах пользователя, самые давние первыми"""
+        ids = TaskService.get_overdue_task_ids(request.user)
+        page = self.paginate_queryset(ids)
+        serializer = FastTaskListSerializer()
+        rows = serializer.rows(
+            Task.objects.filter(id__in=ids if page is None else page).order_by(
+                "deadline", "id"
+            )
+        )
+        if page is None:
+            return Response(serializer.render(rows))
+        return self.get_paginated_response(serializer.render(rows))
+
+    @extend_schema(
+        parameters=[OpenApiParameter("cursor", str)],
+        responses={200: CommentSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def comments(self, request, pk=None):
+        """Комментарии задачи постранично (?expand=comments встраивает их в задачу)"""
+        task = self.get_object()
+        paginator = CommentPagination()
+        page = paginator.paginate_queryset(
+            CommentService.get_task_comments(task.id), request, view=self
+        )
+        serializer = CommentSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("archived", bool),
+            OpenApiParameter("cursor", str),
+        ],
+        responses={200: TaskHistorySerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """История изменений задачи: свежие записи, ?archived=true — сжатый архив"""
+        task = self.get_object()
+        if request.query_params.get("archived") == "true":
+            queryset = TaskHistoryService.get_archived_history(task.id)
+            serializer_class = TaskHistoryArchiveSerializer
+        else:
+            queryset = TaskHistoryService.get_task_history(task.id)
+            serializer_class = TaskHistorySerializer
+
+        paginator = HistoryPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 
 @method_decorator(csrf_exempt, name="dispatch")
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     permission_classes = [IsAuthenticated, CommentPermission]
     serializer_class = CommentSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["task"]
+    throttle_scopes = {"list": "listing"}
+    query_budgets = {
+        "list": 4,
+        "retrieve": 2,
+        "create": 3,
+        "update": 4,
+        "partial_update": 4,
+        "destroy": 4,
+    }
 
     def get_queryset(self):
         user = self.request.user
-        return Comment.objects.filter(task__project__members__user=user)
+        return (
+            Comment.objects.filter(task__project__members__user=user)
+            .exclude(task__project__status="deleting")
+            .select_related("author")
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        comment = serializer.save(author=self.request.user)
+        ProjectService.invalidate_project_cache(comment.task.project_id)
+
+    def perform_update(self, serializer):
+        comment = serializer.save()
+        ProjectService.invalidate_project_cache(comment.task.project_id)
+
+    def perform_destroy(self, instance):
+        project_id = instance.task.project_id
+        instance.delete()
+        ProjectService.invalidate_project_cache(project_id)
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+@method_decorator(csrf_exempt, name="dispatch")
+class NotificationViewSet(
+    SparseFieldsetMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationPagination
+    query_budgets = {"list": 1, "read": 3, "read_all": 1, "unread_count": 1}
+
+    def get_queryset(self):
+        unread_only = self.request.query_params.get("unread") == "true"
+        return NotificationService.get_inbox(self.request.user, unread_only)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("unread", bool, description="Только непрочитанные")
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        """Отметить уведомление прочитанным"""
+        notification = self.get_object()
+        NotificationService.mark_read(request.user, [notification.id])
+        return Response(
+            {"unread_count": NotificationService.get_unread_count(request.user.id)}
+        )
+
+    @action(detail=False, methods=["post"], url_path="read-all")
+    def read_all(self, request):
+        """Отметить все уведомления прочитанными"""
+        updated = NotificationService.mark_read(request.user)
+        return Response({"updated": updated, "unread_count": 0})
+
+    @action(detail=False, methods=["get"], url_path="unread-count")
+    def unread_count(self, request):
+        """Количество непрочитанных (из кэша)"""
+        return Response(
+            {"unread_count": NotificationService.get_unread_count(request.user.id)}
+        )
+
+
+class UserViewSet(ReplicaReadMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = ("list", "retrieve", "search")
+    throttle_scopes = {"list": "search", "search": "search"}
     filter_backends = [filters.SearchFilter]
     search_fields = ["username", "email", "first_name", "last_name"]
+    query_budgets = {"list": 2, "retrieve": 1, "search": 2}
 
     @action(detail=False, methods=["get"])
     def search(self, request):
-        from django.db.models import Q
-
         query = request.query_params.get("q", "")
         if len(query) < 2:
             return Response([])
 
-        users = User.objects.filter(
-            Q(email__icontains=query)
-            | Q(username__icontains=query)
-            | Q(first_name__icontains=query)
-            | Q(last_name__icontains=query)
-        ).values("id", "username", "email", "first_name", "last_name")[:10]
-
-        return Response(list(users))
+        return Response(UserService.search(query))
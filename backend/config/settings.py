@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+from urllib.parse import urlsplit
 import os
 
 
@@ -33,6 +34,8 @@ MIDDLEWARE = [
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "api.middleware.DisableCSRFForAPIMiddleware",
+    "api.middleware.RequestProfilingMiddleware",
+    "api.middleware.RateLimitHeadersMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -61,6 +64,13 @@ ASGI_APPLICATION = "config.asgi.application"
 WSGI_APPLICATION = "config.wsgi.application"
 
 
+# The login view authenticates the user it found by email through the first
+# backend; the admin signs in by username through ModelBackend
+AUTHENTICATION_BACKENDS = [
+    "api.auth_backends.PreloadedUserBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -76,6 +86,10 @@ USE_TZ = True
 
 
 REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -90,6 +104,25 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttling.UserRateThrottle",
+        "api.throttling.ProjectRateThrottle",
+        "api.throttling.EndpointRateThrottle",
+    ],
+    # Sliding windows; endpoint classes are named by the views' throttle_scopes
+    "DEFAULT_THROTTLE_RATES": {
+        "user_read": os.getenv("THROTTLE_USER_READ", "600/min"),
+        "user_write": os.getenv("THROTTLE_USER_WRITE", "120/min"),
+        "project_read": os.getenv("THROTTLE_PROJECT_READ", "1200/min"),
+        "project_write": os.getenv("THROTTLE_PROJECT_WRITE", "300/min"),
+        "listing": os.getenv("THROTTLE_LISTING", "300/min"),
+        "search": os.getenv("THROTTLE_SEARCH", "60/min"),
+        "reports": os.getenv("THROTTLE_REPORTS", "60/min"),
+    },
+    # Reverse proxies in front of the app. Throttles key anonymous clients on
+    # the address the last of them saw (X-Forwarded-For); with 0 they use
+    # REMOTE_ADDR and ignore the client-supplied header.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
 SIMPLE_JWT = {
@@ -105,18 +138,52 @@ SPECTACULAR_SETTINGS = {
 }
 
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1")
+
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1"),
-        "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        "BACKEND": "api.cache.ProfiledRedisCache",
+        "LOCATION": REDIS_URL,
+        # Bumped from 1 when values moved from pickle to msgpack, so entries
+        # written by older deployments are never decoded
+        "VERSION": 2,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SERIALIZER": "api.cache.CompactSerializer",
+            "COMPRESSOR": "api.cache.ZstdCompressor",
+            "COMPRESS_MIN_LENGTH": int(os.getenv("CACHE_COMPRESS_MIN_LENGTH", "1024")),
+        },
     }
 }
 
+# Per-process LRU tier of api.cache.TwoTierCache, in front of Redis. Entries
+# are evicted by pub/sub on writes; the age limit covers lost messages.
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "4096"))
+LOCAL_CACHE_SECONDS = int(os.getenv("LOCAL_CACHE_SECONDS", "60"))
+
+# api.cache.get_or_compute: one caller recomputes a missing entry under a lock
+# held at most this long; the others wait up to CACHE_COMPUTE_WAIT_SECONDS
+CACHE_COMPUTE_LOCK_SECONDS = int(os.getenv("CACHE_COMPUTE_LOCK_SECONDS", "10"))
+CACHE_COMPUTE_WAIT_SECONDS = int(os.getenv("CACHE_COMPUTE_WAIT_SECONDS", "5"))
+
+# Channel layer Redis is kept apart from the cache (cache.clear() flushes its DB):
+# by default the same server as REDIS_URL, the next DB index up.
+# A comma-separated list shards groups across instances by consistent hashing.
+_cache_redis = urlsplit(REDIS_URL)
+_channel_redis_db = int(_cache_redis.path.strip("/") or "0") + 1
+CHANNEL_REDIS_URLS = [
+    url.strip()
+    for url in os.getenv(
+        "CHANNEL_REDIS_URLS",
+        _cache_redis._replace(path=f"/{_channel_redis_db}").geturl(),
+    ).split(",")
+    if url.strip()
+]
+
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
-        "CONFIG": {"hosts": [os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1")]},
+        "BACKEND": "api.channel_layers.ConsistentHashRedisChannelLayer",
+        "CONFIG": {"hosts": CHANNEL_REDIS_URLS},
     },
 }
 
@@ -131,8 +198,87 @@ DATABASES = {
     }
 }
 
+# Read replicas ("host" or "host:port", comma-separated) share the primary's
+# credentials. Viewset replica_actions and ProjectService aggregates read from
+# them; a user who wrote within REPLICA_STICKY_SECONDS reads from the primary.
+DATABASE_REPLICAS = []
+_replica_hosts = [h for h in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if h]
+for _index, _host in enumerate(_replica_hosts):
+    _host, _, _port = _host.partition(":")
+    DATABASES[f"replica_{_index}"] = {
+        **DATABASES["default"],
+        "HOST": _host,
+        "PORT": _port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{_index}")
+DATABASE_ROUTERS = ["api.db_routers.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Login/register hash passwords on a bounded pool and answer 503 once this
+# many hashes are running and queued, instead of tying up request workers.
+# Each waiting login holds a sync worker thread (ASGI_THREADS, else Python's
+# ThreadPoolExecutor default), so running plus queued hashes are capped at
+# half of them and the rest of the API keeps the other half.
+SYNC_WORKER_THREADS = int(
+    os.getenv("ASGI_THREADS", str(min(32, (os.cpu_count() or 1) + 4)))
+)
+_hashing_slots = max(1, SYNC_WORKER_THREADS // 2)
+PASSWORD_HASHING_WORKERS = min(
+    int(os.getenv("PASSWORD_HASHING_WORKERS", "4")), _hashing_slots
+)
+PASSWORD_HASHING_QUEUE = min(
+    int(os.getenv("PASSWORD_HASHING_QUEUE", str(_hashing_slots))),
+    _hashing_slots - PASSWORD_HASHING_WORKERS,
+)
+# Seconds a login waits for its hash before answering 503
+PASSWORD_HASHING_TIMEOUT = int(os.getenv("PASSWORD_HASHING_TIMEOUT", "10"))
+
+# Auth attempts per client IP, and failed passwords per account, per window
+LOGIN_THROTTLE_WINDOW_SECONDS = int(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", "300"))
+LOGIN_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_ATTEMPTS_PER_IP", "30"))
+LOGIN_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_FAILURES_PER_ACCOUNT", "5"))
+
+# Serve plain list requests from .values_list() rows instead of DRF serializers
+API_FAST_LIST_SERIALIZATION = os.getenv("API_FAST_LIST_SERIALIZATION", "True") == "True"
+
+# Per-field TaskHistory rows older than this are compacted into TaskHistoryArchive
+TASK_HISTORY_RETENTION_DAYS = int(os.getenv("TASK_HISTORY_RETENTION_DAYS", "90"))
+
+# Opt-in per-request profiling: Server-Timing headers and /api/metrics/.
+# With ENFORCE_BUDGETS, exceeding a viewset's query_budgets raises (tests).
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "False") == "True"
+REQUEST_PROFILING_ENFORCE_BUDGETS = (
+    os.getenv("REQUEST_PROFILING_ENFORCE_BUDGETS", "False") == "True"
+)
+# Bearer token the Prometheus scraper sends to /api/metrics/; staff sessions
+# can read it too. Unset, only staff can.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Board viewers drop out of presence when no heartbeat arrives within this TTL;
+# clients are expected to send {"type": "heartbeat"} at about a third of it
+PRESENCE_TTL_SECONDS = int(os.getenv("PRESENCE_TTL_SECONDS", "90"))
+
+# Repeated notifications about the same task within this window are coalesced
+NOTIFICATION_DIGEST_WINDOW_SECONDS = int(
+    os.getenv("NOTIFICATION_DIGEST_WINDOW_SECONDS", "300")
+)
+# Cached unread counters are recounted at least this often, in case a delete
+# went around NotificationService
+NOTIFICATION_UNREAD_COUNT_SECONDS = int(
+    os.getenv("NOTIFICATION_UNREAD_COUNT_SECONDS", "3600")
+)
+
+# Project deletion removes tasks and their children in batches of this size
+# from a background thread, one transaction per batch. With
+# PROJECT_DELETE_IN_BACKGROUND=False the request that started it runs it.
+PROJECT_DELETE_BATCH_SIZE = int(os.getenv("PROJECT_DELETE_BATCH_SIZE", "1000"))
+PROJECT_DELETE_IN_BACKGROUND = (
+    os.getenv("PROJECT_DELETE_IN_BACKGROUND", "True") == "True"
+)
+
 FRONTEND_DIR = BASE_DIR.parent / "frontend" / "dist"
 
 STATIC_URL = "/static/"
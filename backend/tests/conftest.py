@@ -1,13 +1,39 @@
 import pytest
 import os
 import django
+from datetime import timedelta
+from types import SimpleNamespace
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django.setup()
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework.test import APIClient
-from api.models import Project, ProjectMember, Task, Comment
+from api.models import (
+    Project,
+    ProjectMember,
+    Task,
+    Comment,
+    TaskHistory,
+    Notification,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Test databases reuse primary keys, so cached per-id entries must not leak
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def query_budgets(settings):
+    """Profile requests and fail those over their viewset's query_budgets entry"""
+    settings.REQUEST_PROFILING = True
+    settings.REQUEST_PROFILING_ENFORCE_BUDGETS = True
 
 
 @pytest.fixture
@@ -90,3 +116,93 @@ def project_with_members(db, user, another_user):
     ProjectMember.objects.create(project=project, user=user, role="owner")
     ProjectMember.objects.create(project=project, user=another_user, role="member")
     return project
+
+
+DATA_SCALES = {
+    "small": {"projects": 2, "members": 3, "tasks": 4, "comments": 2},
+    "large": {"projects": 6, "members": 8, "tasks": 24, "comments": 5},
+}
+
+
+@pytest.fixture(params=list(DATA_SCALES))
+def dataset(request, db, user):
+    """Projects owned by ``user`` with members, tasks, comments, history and
+    notifications, at each scale in DATA_SCALES. Rows are bulk-created, so
+    no signals fire while seeding.
+    """
+    scale = DATA_SCALES[request.param]
+    members = [user] + [
+        User.objects.create_user(username=f"member{index}", email=f"m{index}@x.io")
+        for index in range(scale["members"] - 1)
+    ]
+    projects = Project.objects.bulk_create(
+        [
+            Project(title=f"Project {index}", owner=user)
+            for index in range(scale["projects"])
+        ]
+    )
+    ProjectMember.objects.bulk_create(
+        [
+            ProjectMember(
+                project=project,
+                user=member,
+                role="owner" if member == user else "member",
+            )
+            for project in projects
+            for member in members
+        ]
+    )
+
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    now = timezone.now()
+    tasks = Task.objects.bulk_create(
+        [
+            Task(
+                project=project,
+                title=f"Task {index}",
+                status=statuses[index % len(statuses)],
+                assignee=members[index % len(members)],
+                deadline=now + timedelta(days=index - scale["tasks"] // 2),
+                created_by=user,
+                order=index,
+            )
+            for project in projects
+            for index in range(scale["tasks"])
+        ]
+    )
+    Comment.objects.bulk_create(
+        [
+            Comment(task=task, author=members[index % len(members)], content="...")
+            for task in tasks
+            for index in range(scale["comments"])
+        ]
+    )
+    TaskHistory.objects.bulk_create(
+        [
+            TaskHistory(
+                task=task,
+                project_id=task.project_id,
+                changed_by=user,
+                field_name="status",
+                old_value="todo",
+                new_value=task.status,
+            )
+            for task in tasks
+        ]
+    )
+    Notification.objects.bulk_create(
+        [
+            Notification(recipient=user, task=task, kind="task_updated", title="...")
+            for task in tasks[: scale["tasks"]]
+        ]
+    )
+
+    project = projects[0]
+    return SimpleNamespace(
+        scale=request.param,
+        project=project,
+        task=tasks[0],
+        comment=Comment.objects.filter(task=tasks[0]).first(),
+        member=members[1],
+        notification=Notification.objects.filter(recipient=user).first(),
+    )
@@ -0,0 +1,99 @@
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.fixture
+def bearer(user):
+    return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+
+@pytest.mark.django_db
+def test_async_me_requires_token(api_client, user, bearer):
+    assert api_client.get("/api/async/auth/me/").status_code == 401
+
+    res = api_client.get("/api/async/auth/me/", **bearer)
+    assert res.status_code == 200
+    assert res.json()["email"] == "test@example.com"
+
+
+@pytest.mark.django_db
+def test_async_task_list_matches_sync(api_client, auth_client, project, task, bearer):
+    res = api_client.get(f"/api/async/tasks/?project={project.id}", **bearer)
+    assert res.status_code == 200
+    assert res.json() == auth_client.get(f"/api/tasks/?project={project.id}").json()
+
+
+@pytest.mark.django_db
+def test_async_board_and_comments(api_client, project, task, comment, bearer):
+    res = api_client.get(f"/api/async/projects/{project.id}/board/", **bearer)
+    assert res.status_code == 200
+    assert res.json()["columns"][0]["tasks"][0]["id"] == task.id
+
+    res2 = api_client.get(
+        f"/api/async/projects/{project.id}/board/",
+        HTTP_IF_NONE_MATCH=res["ETag"],
+        **bearer,
+    )
+    assert res2.status_code == 304
+
+    res3 = api_client.get(f"/api/async/comments/?task={task.id}", **bearer)
+    assert res3.json()["results"][0]["content"] == "Test comment"
+
+
+@pytest.mark.django_db
+def test_async_board_shows_renamed_members(
+    api_client, auth_client, project, user, bearer
+):
+    url = f"/api/async/projects/{project.id}/board/"
+    etag = api_client.get(url, **bearer)["ETag"]
+    assert auth_client.get(f"/api/projects/{project.id}/board/")["ETag"] == etag
+
+    user.first_name = "Renamed"
+    user.save()
+    res = api_client.get(url, HTTP_IF_NONE_MATCH=etag, **bearer)
+    assert res.status_code == 200
+    assert res.json()["members"][0]["first_name"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_async_views_check_membership(api_client, project, another_user):
+    token = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(another_user)}"}
+    res = api_client.get(f"/api/async/projects/{project.id}/board/", **token)
+    assert res.status_code == 404
+    res2 = api_client.get(f"/api/async/tasks/?project={project.id}", **token)
+    assert res2.status_code == 403
+
+
+@pytest.mark.django_db
+def test_async_views_share_the_drf_throttle_budgets(
+    api_client, auth_client, project, task, bearer, settings
+):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {
+            **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+            "listing": "2/min",
+        },
+    }
+    assert auth_client.get(f"/api/tasks/?project={project.id}").status_code == 200
+    res = api_client.get(f"/api/async/tasks/?project={project.id}", **bearer)
+    assert res.status_code == 200
+    assert res["X-RateLimit-Remaining"] == "0"
+
+    throttled = api_client.get(f"/api/async/tasks/?project={project.id}", **bearer)
+    assert throttled.status_code == 429
+    assert int(throttled["Retry-After"]) > 0
+    comments = api_client.get(f"/api/async/comments/?task={task.id}", **bearer)
+    assert comments.status_code == 429
+
+
+@pytest.mark.django_db
+def test_async_views_hide_projects_being_deleted(api_client, project, task, bearer):
+    project.status = "deleting"
+    project.save()
+    res = api_client.get(f"/api/async/projects/{project.id}/board/", **bearer)
+    assert res.status_code == 404
+    res2 = api_client.get(f"/api/async/tasks/?project={project.id}", **bearer)
+    assert res2.status_code == 403
+    res3 = api_client.get(f"/api/async/comments/?task={task.id}", **bearer)
+    assert res3.status_code == 404
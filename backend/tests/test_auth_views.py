@@ -0,0 +1,195 @@
+import threading
+
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.db import IntegrityError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import hashing
+from api.hashing import HashingPool
+from api.tokens import TokenRevocation
+
+
+@pytest.mark.django_db
+def test_login_matches_email_case_insensitively(api_client, user):
+    response = api_client.post(
+        "/api/auth/login/",
+        {"email": "TEST@Example.com", "password": "testpass123"},
+        format="json",
+    )
+    assert response.status_code == 200
+    assert response.data["user"]["id"] == user.id
+
+
+@pytest.mark.django_db
+def test_wrong_password_sends_user_login_failed(api_client, user):
+    failures = []
+
+    def receiver(sender, credentials, request, **kwargs):
+        failures.append(credentials)
+
+    user_login_failed.connect(receiver)
+    try:
+        response = api_client.post(
+            "/api/auth/login/",
+            {"email": user.email, "password": "wrong"},
+            format="json",
+        )
+    finally:
+        user_login_failed.disconnect(receiver)
+    assert response.status_code == 401
+    assert len(failures) == 1
+    assert failures[0]["user"] == user
+    assert failures[0]["password"] != "wrong"
+
+
+@pytest.mark.django_db
+def test_register_rejects_email_in_another_case(api_client, user):
+    response = api_client.post(
+        "/api/auth/register/",
+        {
+            "email": "Test@Example.com",
+            "password": "longpassword",
+            "password_confirm": "longpassword",
+        },
+        format="json",
+    )
+    assert response.status_code == 400
+    assert "email" in response.data
+
+
+@pytest.mark.django_db
+def test_email_index_is_unique_but_allows_blank_emails(user):
+    User.objects.create_user(username="blank1")
+    User.objects.create_user(username="blank2")
+    with pytest.raises(IntegrityError):
+        User.objects.create_user(username="upper", email="TEST@EXAMPLE.COM")
+
+
+@pytest.mark.django_db
+def test_user_search_by_email_prefix(auth_client, user, another_user):
+    response = auth_client.get("/api/users/search/?q=Another@")
+    assert [row["id"] for row in response.data] == [another_user.id]
+
+
+@pytest.mark.django_db
+def test_user_search_with_at_sign_still_matches_substrings(auth_client, user):
+    other = User.objects.create_user(
+        username="m@rk", email="mark@example.org", first_name="Mark"
+    )
+    # Not an email prefix of anyone, but part of an email and a username
+    for query in ["k@example.org", "m@r"]:
+        response = auth_client.get(f"/api/users/search/?q={query}")
+        assert [row["id"] for row in response.data] == [other.id], query
+
+    response = auth_client.get("/api/users/search/?q=@example")
+    assert {row["id"] for row in response.data} == {user.id, other.id}
+
+
+@pytest.mark.django_db
+def test_login_failures_lock_the_account_not_the_address(api_client, user, settings):
+    settings.LOGIN_FAILURES_PER_ACCOUNT = 2
+    for _ in range(2):
+        response = api_client.post(
+            "/api/auth/login/",
+            {"email": user.email, "password": "wrong"},
+            format="json",
+        )
+        assert response.status_code == 401
+
+    response = api_client.post(
+        "/api/auth/login/",
+        {"email": user.email, "password": "testpass123"},
+        format="json",
+    )
+    assert response.status_code == 429
+    assert int(response["Retry-After"]) > 0
+
+    response = api_client.post(
+        "/api/auth/login/",
+        {"email": "nobody@example.com", "password": "testpass123"},
+        format="json",
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_auth_attempts_are_limited_per_ip(api_client, user, settings):
+    settings.LOGIN_ATTEMPTS_PER_IP = 2
+    statuses = [
+        api_client.post(
+            "/api/auth/login/",
+            {"email": user.email, "password": "testpass123"},
+            format="json",
+        ).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+@pytest.mark.django_db
+def test_forwarded_for_header_does_not_reset_the_ip_budget(api_client, user, settings):
+    settings.LOGIN_ATTEMPTS_PER_IP = 2
+    statuses = [
+        api_client.post(
+            "/api/auth/login/",
+            {"email": user.email, "password": "testpass123"},
+            format="json",
+            HTTP_X_FORWARDED_FOR=f"203.0.113.{attempt}",
+        ).status_code
+        for attempt in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+@pytest.mark.django_db
+def test_login_answers_503_when_hashing_pool_is_saturated(
+    api_client, user, monkeypatch
+):
+    pool = HashingPool(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def hold_the_only_worker():
+        started.set()
+        release.wait()
+
+    busy = threading.Thread(target=pool.run, args=(hold_the_only_worker,))
+    busy.start()
+    started.wait()
+    try:
+        monkeypatch.setattr(hashing, "get_hashing_pool", lambda: pool)
+        response = api_client.post(
+            "/api/auth/login/",
+            {"email": user.email, "password": "testpass123"},
+            format="json",
+        )
+        assert response.status_code == 503
+        assert response["Retry-After"] == "1"
+    finally:
+        release.set()
+        busy.join()
+
+
+@pytest.mark.django_db
+def test_logout_revokes_refresh_and_access_tokens(api_client, user):
+    refresh = RefreshToken.for_user(user)
+    access = refresh.access_token
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    response = api_client.post("/api/auth/logout/", {"refresh": str(refresh)})
+    assert response.status_code == 200
+    assert TokenRevocation.is_revoked(refresh["jti"])
+    assert TokenRevocation.is_revoked(access["jti"])
+
+    api_client.credentials()
+    response = api_client.post("/api/auth/token/refresh/", {"refresh": str(refresh)})
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_logout_rejects_someone_elses_refresh_token(auth_client, another_user):
+    refresh = RefreshToken.for_user(another_user)
+    response = auth_client.post("/api/auth/logout/", {"refresh": str(refresh)})
+    assert response.status_code == 400
+    assert not TokenRevocation.is_revoked(refresh["jti"])
@@ -0,0 +1,148 @@
+"""Service-layer benchmarks against a generated dataset (pytest-benchmark).
+
+The dataset is seeded once per module by ``api.datagen`` and rolled back
+afterwards. BENCHMARK_SCALE multiplies its project count and
+BENCHMARK_USERS sizes auth_user for the email lookups (1000000 matches
+production). Results are machine specific, so baselines are stored locally
+and compared on the same host:
+
+    pytest tests/test_benchmarks.py -m slow --benchmark-save=baseline
+    pytest tests/test_benchmarks.py -m slow --benchmark-compare \
+        --benchmark-compare-fail=mean:20%
+
+Skip them in regular runs with ``-m "not slow"`` or ``--benchmark-skip``.
+"""
+
+import os
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from api.datagen import DatasetGenerator, DatasetSpec
+from api.models import Project, ProjectMember
+from api.services import ProjectService, TaskHistoryService, TaskService, UserService
+
+pytestmark = [pytest.mark.slow, pytest.mark.django_db]
+
+SCALE = float(os.environ.get("BENCHMARK_SCALE", "1"))
+SPEC = DatasetSpec(
+    users=50,
+    projects=max(1, int(20 * SCALE)),
+    members_per_project=10,
+    tasks_per_project=500,
+    prefix="benchmark",
+)
+PAGE_SIZE = 50
+USERS = int(os.environ.get("BENCHMARK_USERS", "20000"))
+
+
+@pytest.fixture(scope="module")
+def seeded(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            DatasetGenerator(SPEC).generate()
+            # The busiest member sees the most projects, like a team lead
+            busiest = (
+                ProjectMember.objects.filter(user__username__startswith="benchmark-")
+                .values("user")
+                .annotate(projects=Count("project"))
+                .order_by("-projects")
+                .first()
+            )
+            user = ProjectMember.objects.filter(user_id=busiest["user"]).first().user
+            project = Project.objects.filter(members__user=user).first()
+            yield user, project
+            transaction.set_rollback(True)
+
+
+@pytest.fixture(scope="module")
+def many_users(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            spec = DatasetSpec(users=USERS, projects=0, prefix="emailbench")
+            DatasetGenerator(spec).generate()
+            yield [f"EmailBench-{index}@Example.com" for index in (0, USERS // 2)]
+            transaction.set_rollback(True)
+
+
+def test_email_lookup_indexed(benchmark, many_users):
+    result = benchmark(lambda: [UserService.by_email(e).get() for e in many_users])
+    assert len(result) == 2
+
+
+def test_email_lookup_iexact_scan(benchmark, many_users):
+    # The pre-index lookup, for comparison
+    benchmark(lambda: [User.objects.get(email__iexact=e) for e in many_users])
+
+
+def test_tasks_for_user(benchmark, seeded):
+    user, _ = seeded
+    benchmark(lambda: list(TaskService.get_tasks_optimized(user=user)[:PAGE_SIZE]))
+
+
+def test_tasks_for_project(benchmark, seeded):
+    user, project = seeded
+    benchmark(
+        lambda: list(
+            TaskService.get_tasks_optimized(project_id=project.id, user=user)[
+                :PAGE_SIZE
+            ]
+        )
+    )
+
+
+def test_tasks_filtered_by_status_and_priority(benchmark, seeded):
+    user, _ = seeded
+    benchmark(
+        lambda: list(
+            TaskService.get_tasks_optimized(
+                user=user, status="in_progress", priority="high"
+            )[:PAGE_SIZE]
+        )
+    )
+
+
+def test_tasks_search(benchmark, seeded):
+    user, _ = seeded
+    benchmark(
+        lambda: list(
+            TaskService.get_tasks_optimized(user=user, search="Task 4")[:PAGE_SIZE]
+        )
+    )
+
+
+def test_projects_with_stats(benchmark, seeded):
+    user, _ = seeded
+    benchmark(lambda: list(ProjectService.get_projects_with_stats(user)))
+
+
+def test_project_detail_uncached(benchmark, seeded):
+    user, project = seeded
+    benchmark.pedantic(
+        ProjectService.get_project_detail,
+        args=(project.id, user),
+        setup=cache.clear,
+        rounds=20,
+    )
+
+
+def test_project_statistics(benchmark, seeded):
+    _, project = seeded
+    benchmark(ProjectService.get_project_statistics, project.id)
+
+
+def test_board_uncached(benchmark, seeded):
+    _, project = seeded
+    benchmark.pedantic(
+        ProjectService.get_board, args=(project,), setup=cache.clear, rounds=20
+    )
+
+
+def test_project_activity_page(benchmark, seeded):
+    _, project = seeded
+    benchmark(
+        lambda: list(TaskHistoryService.get_project_activity(project.id)[:PAGE_SIZE])
+    )
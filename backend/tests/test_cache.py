@@ -0,0 +1,312 @@
+import threading
+import time
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+import redis
+from django.core.cache import cache
+from django.core.management import call_command
+from django_redis import get_redis_connection
+from redis.exceptions import ResponseError
+
+from api.cache import (
+    CompactSerializer,
+    _compute_lock,
+    get_or_compute,
+    InvalidationListener,
+    TwoTierCache,
+    ZstdCompressor,
+    get_invalidation_listener,
+    key_prefix,
+    memory_by_prefix,
+)
+from api.db_routers import replica_reads
+from api.profiling import cache_tier_metrics
+from api.services import (
+    MembershipService,
+    ProjectDeletionService,
+    ProjectService,
+    UserService,
+)
+
+
+def test_compact_serializer_round_trips_plain_data():
+    value = {
+        "at": datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc),
+        "day": date(2026, 3, 1),
+        "amount": Decimal("1.50"),
+        "id": uuid.UUID(int=7),
+        "tags": ["a", None, 1.5, True],
+    }
+    serializer = CompactSerializer({})
+    assert serializer.loads(serializer.dumps(value)) == value
+
+
+def test_compact_serializer_rejects_model_instances(user):
+    with pytest.raises(TypeError):
+        CompactSerializer({}).dumps(user)
+
+
+def test_compressor_only_compresses_above_the_threshold():
+    compressor = ZstdCompressor({"COMPRESS_MIN_LENGTH": 100})
+    small, large = b"x" * 100, b"x" * 5000
+    assert compressor.compress(small) == small
+    compressed = compressor.compress(large)
+    assert len(compressed) < 100
+    assert compressor.decompress(compressed) == large
+
+
+@pytest.mark.django_db
+def test_project_detail_is_cached_as_plain_data(project, task, user):
+    detail = ProjectService.get_project_detail(project.id, user)
+    assert detail["tasks_count"] == 1
+
+    generation = ProjectService.get_generation(project.id)
+    profiles = UserService.get_profiles_generation()
+    key = f"project_detail_{project.id}_{generation}_{profiles}"
+    cached = cache.get(key)["value"]
+    assert cached == detail
+    assert cached["members"][0]["user"]["id"] == user.id
+
+
+@pytest.mark.django_db
+def test_project_detail_is_only_for_members(project, another_user):
+    assert ProjectService.get_project_detail(project.id, another_user) is None
+
+
+def test_key_prefix():
+    assert key_prefix(":1:project_board_5_17") == "project_board"
+    assert key_prefix("throttle:user:3:read:29") == "throttle:user"
+    assert key_prefix("presence:project:12") == "presence:project"
+
+
+@pytest.fixture
+def cached_keys():
+    cache.set("project_board_1_1", {"columns": ["x" * 4000]})
+    cache.set("project_board_2_1", {"columns": []})
+    get_redis_connection("default").set("revoked:jti:0f3a", 1)
+
+
+def test_memory_report_groups_keys_by_prefix(cached_keys, monkeypatch):
+    # Stand in for MEMORY USAGE with the value length
+    monkeypatch.setattr(
+        redis.Redis,
+        "memory_usage",
+        lambda self, key, samples=None: self.execute_command("STRLEN", key),
+    )
+    report = {entry["prefix"]: entry for entry in memory_by_prefix()}
+    assert report["project_board"]["keys"] == 2
+    # The large board is stored compressed
+    assert 0 < report["project_board"]["value_bytes"] < 1000
+    assert report["project_board"]["memory"] == report["project_board"]["value_bytes"]
+    assert report["revoked:jti"] == {
+        "prefix": "revoked:jti",
+        "keys": 1,
+        "value_bytes": 1,
+        "memory": 1,
+    }
+
+    out = StringIO()
+    call_command("cache_memory_report", stdout=out)
+    assert "project_board" in out.getvalue()
+
+
+def test_memory_report_without_memory_usage(cached_keys, monkeypatch):
+    def unsupported(self, key, samples=None):
+        raise ResponseError("unknown command 'memory'")
+
+    monkeypatch.setattr(redis.Redis, "memory_usage", unsupported)
+    report = {entry["prefix"]: entry for entry in memory_by_prefix()}
+    assert report["project_board"]["keys"] == 2
+    assert report["project_board"]["memory"] is None
+
+
+@pytest.fixture
+def two_tier():
+    assert get_invalidation_listener().ready.wait(5)
+    cache_tier_metrics.reset()
+    return TwoTierCache("test_tier")
+
+
+def test_two_tier_cache_serves_repeat_reads_locally(two_tier):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return {"title": "Roadmap"}
+
+    assert two_tier.get_or_set(1, load) == {"title": "Roadmap"}
+    assert two_tier.get_or_set(1, load) == {"title": "Roadmap"}
+    assert len(loads) == 1
+
+    metrics = cache_tier_metrics.render()
+    assert 'api_cache_tier_hits_total{cache="test_tier",tier="local"} 1' in metrics
+    assert 'api_cache_tier_misses_total{cache="test_tier",tier="redis"} 1' in metrics
+    assert 'api_cache_tier_hit_ratio{cache="test_tier",tier="local"} 0.5' in metrics
+
+
+def test_two_tier_cache_evicts_on_broadcast(two_tier):
+    two_tier.get_or_set(1, lambda: "old")
+
+    # What another process's invalidate() does
+    cache.incr("test_tier_version_1")
+    get_redis_connection("default").publish(InvalidationListener.CHANNEL, "test_tier:1")
+    deadline = time.monotonic() + 5
+    while two_tier.get_or_set(1, lambda: "loaded") == "old":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert two_tier.get_or_set(1, lambda: "new") == "loaded"
+
+
+def test_two_tier_cache_drops_loads_that_raced_an_invalidation(two_tier):
+    def load():
+        # Another request invalidates while this one is still loading
+        two_tier.invalidate(1)
+        return "old"
+
+    assert two_tier.get_or_set(1, load) == "old"
+    assert two_tier.get_or_set(1, lambda: "new") == "new"
+
+
+@pytest.mark.django_db
+def test_member_roles_follow_membership_changes(project, user, another_user):
+    assert ProjectService.get_member_roles(project.id) == {user.id: "owner"}
+    MembershipService.add_member(project, another_user, "member")
+    assert ProjectService.get_member_roles(project.id)[another_user.id] == "member"
+    MembershipService.remove_member(project, another_user)
+    assert another_user.id not in ProjectService.get_member_roles(project.id)
+
+
+@pytest.mark.django_db
+def test_removed_member_loses_access_on_the_next_read(
+    api_client, project, another_user, settings, django_capture_on_commit_callbacks
+):
+    MembershipService.add_member(project, another_user, "member")
+    api_client.force_authenticate(user=another_user)
+    assert api_client.get(f"/api/projects/{project.id}/").status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        MembershipService.remove_member(project, another_user)
+    assert api_client.get(f"/api/projects/{project.id}/").status_code == 404
+
+    # Roles are loaded from the primary even inside replica reads (this
+    # replica alias doesn't exist)
+    settings.DATABASE_REPLICAS = ["lagging_replica"]
+    ProjectService.invalidate_member_roles(project.id)
+    with replica_reads():
+        assert another_user.id not in ProjectService.get_member_roles(project.id)
+
+
+def test_concurrent_misses_compute_once():
+    computing, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def compute():
+        calls.append(1)
+        computing.set()
+        release.wait(5)
+        return "value"
+
+    first = threading.Thread(
+        target=lambda: results.append(get_or_compute("stampede", compute, 60))
+    )
+    first.start()
+    computing.wait(5)
+    waiter = threading.Thread(
+        target=lambda: results.append(get_or_compute("stampede", compute, 60))
+    )
+    waiter.start()
+    time.sleep(0.1)
+    release.set()
+    first.join()
+    waiter.join()
+
+    assert results == ["value", "value"]
+    assert len(calls) == 1
+
+
+def test_waiter_takes_over_when_the_lock_holder_fails(settings):
+    settings.CACHE_COMPUTE_WAIT_SECONDS = 30
+    computing, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def failing():
+        calls.append("failing")
+        computing.set()
+        release.wait(5)
+        raise RuntimeError("database went away")
+
+    def holder():
+        with pytest.raises(RuntimeError):
+            get_or_compute("takeover", failing, 60)
+
+    first = threading.Thread(target=holder)
+    first.start()
+    computing.wait(5)
+    waiter = threading.Thread(
+        target=lambda: results.append(
+            get_or_compute("takeover", lambda: calls.append("waiter") or "value", 60)
+        )
+    )
+    started = time.monotonic()
+    waiter.start()
+    time.sleep(0.1)
+    release.set()
+    first.join()
+    waiter.join()
+
+    # Well before CACHE_COMPUTE_WAIT_SECONDS, and under the lock
+    assert time.monotonic() - started < 5
+    assert results == ["value"]
+    assert calls == ["failing", "waiter"]
+
+
+@pytest.mark.django_db
+def test_cached_values_are_computed_on_the_primary(project, user, settings):
+    # Any read routed to this replica alias would fail
+    settings.DATABASE_REPLICAS = ["lagging_replica"]
+    with replica_reads():
+        assert ProjectService.get_project_statistics(project.id)["total"] == 0
+        assert ProjectService.get_project_detail(project.id, user)["id"] == project.id
+
+
+@pytest.mark.django_db
+def test_project_retrieve_is_served_from_the_detail_cache(
+    auth_client, project, task, user, django_assert_num_queries
+):
+    first = auth_client.get(f"/api/projects/{project.id}/")
+    assert first.data["tasks_count"] == 1
+    with django_assert_num_queries(0):
+        second = auth_client.get(f"/api/projects/{project.id}/")
+    assert second.data == first.data
+
+    auth_client.patch(f"/api/projects/{project.id}/", {"name": "Renamed"})
+    assert auth_client.get(f"/api/projects/{project.id}/").data["name"] == "Renamed"
+
+    ProjectDeletionService.start(project, user)
+    assert auth_client.get(f"/api/projects/{project.id}/").status_code == 404
+
+
+def test_expired_entry_is_served_stale_while_another_caller_refreshes():
+    cache.set("stale", {"value": "old", "expires": time.time() - 1, "delta": 0.1})
+    lock = _compute_lock("stale")
+    assert lock.acquire(blocking=False)
+    try:
+        assert get_or_compute("stale", lambda: "new", 60, stale_timeout=30) == "old"
+    finally:
+        lock.release()
+    assert get_or_compute("stale", lambda: "new", 60, stale_timeout=30) == "new"
+
+
+def test_early_refresh_scales_with_compute_time():
+    expires = time.time() + 30
+    cache.set("early", {"value": "old", "expires": expires, "delta": 0})
+    # A computation that takes no time is never refreshed before expiry
+    assert get_or_compute("early", lambda: "new", 60) == "old"
+
+    cache.set("early", {"value": "old", "expires": expires, "delta": 1e9})
+    # One that takes far longer than the time left is refreshed (almost) surely
+    assert get_or_compute("early", lambda: "new", 60) == "new"
@@ -0,0 +1,26 @@
+from api.channel_layers import ConsistentHashRedisChannelLayer, HashRing
+
+
+def test_hash_ring_moves_only_a_share_of_groups():
+    hosts = [f"redis://shard-{index}:6379/0" for index in range(4)]
+    groups = [f"project_{index}" for index in range(2000)]
+    before, after = HashRing(hosts), HashRing(hosts + ["redis://shard-4:6379/0"])
+
+    moved = sum(
+        hosts[before.get_index(group)] != (hosts + ["x"])[after.get_index(group)]
+        for group in groups
+    )
+    # Ideal is 1/5; the stock range-based mapping moves most groups
+    assert moved / len(groups) < 0.3
+
+
+def test_layer_routes_groups_by_host_identity():
+    layer = ConsistentHashRedisChannelLayer(
+        hosts=["redis://a:6379/0", "redis://b:6379/0"]
+    )
+    reordered = ConsistentHashRedisChannelLayer(
+        hosts=["redis://b:6379/0", "redis://a:6379/0"]
+    )
+    for group in ["project_1", "project_2", "user_7", "specific.abc!"]:
+        index = layer.consistent_hash(group)
+        assert layer.hosts[index] == reordered.hosts[reordered.consistent_hash(group)]
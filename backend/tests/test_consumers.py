@@ -0,0 +1,71 @@
+import pytest
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+from config.asgi import application
+from api.services import NotificationService, PresenceService
+from api.tokens import TokenRevocation
+
+
+def connect(path, user):
+    token = AccessToken.for_user(user)
+    return WebsocketCommunicator(application, f"{path}?token={token}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_project_presence_diff(project, user):
+    communicator = connect(f"/ws/projects/{project.id}/", user)
+    connected, _ = await communicator.connect()
+    assert connected
+
+    message = await communicator.receive_json_from(timeout=3)
+    assert message == {
+        "type": "presence.diff",
+        "data": {"joined": [user.id], "left": []},
+    }
+
+    await communicator.send_json_to({"type": "heartbeat"})
+    assert await communicator.receive_nothing(timeout=0.2)
+    await communicator.disconnect()
+
+    viewers = await database_sync_to_async(PresenceService.get_viewers)(project.id)
+    assert viewers == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_notification_unread_count_on_connect(task, user):
+    await database_sync_to_async(NotificationService.notify)(
+        user.id, "task_updated", "Task Updated", task=task
+    )
+    communicator = connect("/ws/notifications/", user)
+    connected, _ = await communicator.connect()
+    assert connected
+    assert await communicator.receive_json_from() == {
+        "type": "unread_count",
+        "data": {"count": 1},
+    }
+    await communicator.disconnect()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_revoked_access_token_is_rejected(project, user):
+    token = AccessToken.for_user(user)
+    await database_sync_to_async(TokenRevocation.revoke)(token)
+    communicator = WebsocketCommunicator(
+        application, f"/ws/projects/{project.id}/?token={token}"
+    )
+    connected, _ = await communicator.connect()
+    assert not connected
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_deactivated_user_is_rejected(project, user):
+    user.is_active = False
+    await database_sync_to_async(user.save)()
+    communicator = connect(f"/ws/projects/{project.id}/", user)
+    connected, _ = await communicator.connect()
+    assert not connected
@@ -0,0 +1,79 @@
+import pytest
+from django.conf import settings
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from api.db_routers import ReplicaRouter, replica_reads
+from api.models import Task
+
+
+@pytest.fixture
+def routed(settings, monkeypatch):
+    """Records read routing decisions, with ``default`` standing in as replica"""
+    settings.DATABASE_REPLICAS = ["default"]
+    decisions = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def record(self, model, **hints):
+        decisions.append(db_for_read(self, model, **hints))
+        return decisions[-1]
+
+    monkeypatch.setattr(ReplicaRouter, "db_for_read", record)
+    return decisions
+
+
+def test_reads_use_replicas_only_inside_replica_reads(settings):
+    router = ReplicaRouter()
+    settings.DATABASE_REPLICAS = ["replica_0"]
+    assert router.db_for_read(Task) is None
+    with replica_reads():
+        assert router.db_for_read(Task) == "replica_0"
+        assert router.db_for_write(Task) == "default"
+    assert router.allow_migrate("replica_0", "api") is False
+
+    settings.DATABASE_REPLICAS = []
+    with replica_reads():
+        assert router.db_for_read(Task) is None
+
+
+@pytest.mark.django_db
+def test_writers_read_their_writes_from_the_primary(auth_client, task, routed):
+    auth_client.get("/api/tasks/")
+    assert routed and set(routed) == {"default"}
+
+    routed.clear()
+    response = auth_client.patch(f"/api/tasks/{task.id}/", {"title": "Renamed"})
+    assert response.status_code == 200
+    assert set(routed) == {None}
+
+    routed.clear()
+    response = auth_client.get("/api/tasks/")
+    assert response.data["results"][0]["title"] == "Renamed"
+    assert set(routed) == {None}
+
+
+@pytest.mark.django_db
+def test_cached_statistics_are_computed_on_the_primary(
+    auth_client, project, task, routed
+):
+    response = auth_client.get(f"/api/projects/{project.id}/statistics/")
+    assert response.data["total"] == 1
+    # The project lookup reads the replica, the shared cached aggregate doesn't
+    assert set(routed) == {"default", None}
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not settings.DATABASE_REPLICAS, reason="POSTGRES_REPLICA_HOSTS is not set"
+)
+@pytest.mark.django_db(transaction=True, databases="__all__")
+def test_list_queries_run_on_the_replica_connection(auth_client, task):
+    # Test databases mirror replicas onto the primary, so this checks that a
+    # separate connection serves the reads
+    replica = connections[settings.DATABASE_REPLICAS[0]]
+    with CaptureQueriesContext(replica) as on_replica:
+        with CaptureQueriesContext(connection) as on_primary:
+            response = auth_client.get("/api/tasks/")
+    assert response.status_code == 200
+    assert len(on_replica) > 0
+    assert len(on_primary) == 0
@@ -0,0 +1,50 @@
+import pytest
+from api.profiling import QueryBudgetExceeded, route_metrics
+from api.viewsets import ProjectViewSet
+
+
+@pytest.mark.django_db
+def test_profiling_is_opt_in(auth_client, project):
+    response = auth_client.get(f"/api/projects/{project.id}/")
+    assert "Server-Timing" not in response
+    assert auth_client.get("/api/metrics/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_server_timing_and_route_metrics(
+    query_budgets, auth_client, project, task, settings
+):
+    settings.METRICS_TOKEN = "scrape-secret"
+    route_metrics.reset()
+    response = auth_client.get(f"/api/tasks/{task.id}/")
+    assert response.status_code == 200
+    timing = response["Server-Timing"]
+    assert 'desc="2 queries"' in timing
+    assert "serialize;dur=" in timing
+
+    metrics = auth_client.get(
+        "/api/metrics/", HTTP_AUTHORIZATION="Bearer scrape-secret"
+    ).content.decode()
+    assert 'api_requests_total{method="GET",route="task-detail"} 1' in metrics
+    assert 'api_db_queries_total{method="GET",route="task-detail"} 2' in metrics
+
+
+@pytest.mark.django_db
+def test_metrics_need_the_scrape_token_or_staff(query_budgets, client, user, settings):
+    assert client.get("/api/metrics/").status_code == 403
+    settings.METRICS_TOKEN = "scrape-secret"
+    wrong = client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer guess")
+    assert wrong.status_code == 403
+
+    client.force_login(user)
+    assert client.get("/api/metrics/").status_code == 403
+    user.is_staff = True
+    user.save()
+    assert client.get("/api/metrics/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_query_budget_overrun_raises(query_budgets, auth_client, project, monkeypatch):
+    monkeypatch.setattr(ProjectViewSet, "query_budgets", {"retrieve": 1})
+    with pytest.raises(QueryBudgetExceeded):
+        auth_client.get(f"/api/projects/{project.id}/")
@@ -0,0 +1,241 @@
+"""Query-count and latency regression suite for every route in api/urls.py.
+
+Each route runs against the ``dataset`` fixture at every scale in
+DATA_SCALES; the expected query count is the same at both scales, so any
+N+1 shows up as a failure on the large one.
+"""
+
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Wall-clock ceiling per request; password hashing routes get more room
+LATENCY_CEILING_MS = 500
+SLOW_ROUTES_CEILING_MS = {"auth-register": 3000, "auth-login": 3000}
+
+# (route name, method, path, body, expected status, expected queries)
+ROUTES = [
+    (
+        "auth-register",
+        "post",
+        "/api/auth/register/",
+        {
+            "email": "new@x.io",
+            "password": "longpassword",
+            "password_confirm": "longpassword",
+        },
+        201,
+        4,  # the insert runs in a savepoint
+    ),
+    (
+        "auth-login",
+        "post",
+        "/api/auth/login/",
+        {"email": "test@example.com", "password": "testpass123"},
+        200,
+        1,
+    ),
+    ("auth-logout", "post", "/api/auth/logout/", {"refresh": "{refresh}"}, 200, 0),
+    ("auth-me", "get", "/api/auth/me/", None, 200, 0),
+    (
+        "auth-token-refresh",
+        "post",
+        "/api/auth/token/refresh/",
+        {"refresh": "{refresh}"},
+        200,
+        0,
+    ),
+    ("async-auth-me", "get", "/api/async/auth/me/", None, 200, 1),
+    (
+        "async-project-board",
+        "get",
+        "/api/async/projects/{project}/board/",
+        None,
+        200,
+        6,
+    ),
+    ("async-task-list", "get", "/api/async/tasks/?project={project}", None, 200, 5),
+    ("async-comment-list", "get", "/api/async/comments/?task={task}", None, 200, 5),
+    # A user's API token is not the scrape token
+    ("metrics", "get", "/api/metrics/", None, 403, 0),
+    ("project-list", "get", "/api/projects/", None, 200, 4),
+    (
+        "project-create",
+        "post",
+        "/api/projects/",
+        {"name": "New", "description": ""},
+        201,
+        5,
+    ),
+    ("project-detail", "get", "/api/projects/{project}/", None, 200, 3),
+    (
+        "project-update",
+        "patch",
+        "/api/projects/{project}/",
+        {"description": "changed"},
+        200,
+        7,
+    ),
+    ("project-delete", "delete", "/api/projects/{project}/", None, 202, 4),
+    # No deletion was started for the project, so there is no progress to show
+    ("project-deletion", "get", "/api/projects/{project}/deletion/", None, 404, 1),
+    ("project-board", "get", "/api/projects/{project}/board/", None, 200, 4),
+    ("project-statistics", "get", "/api/projects/{project}/statistics/", None, 200, 3),
+    ("project-activity", "get", "/api/projects/{project}/activity/", None, 200, 3),
+    ("project-viewers", "get", "/api/projects/{project}/viewers/", None, 200, 2),
+    (
+        "project-add-member",
+        "post",
+        "/api/projects/{project}/members/add/",
+        {"user_id": "{outsider}", "role": "viewer"},
+        200,
+        10,
+    ),
+    (
+        "project-remove-member",
+        "post",
+        "/api/projects/{project}/members/remove/",
+        {"user_id": "{member}"},
+        200,
+        7,
+    ),
+    ("task-list", "get", "/api/tasks/", None, 200, 3),
+    ("task-list-project", "get", "/api/tasks/?project={project}", None, 200, 5),
+    (
+        "task-list-fields",
+        "get",
+        "/api/tasks/?fields=id,title,assignee.username",
+        None,
+        200,
+        3,
+    ),
+    (
+        "task-create",
+        "post",
+        "/api/tasks/",
+        {"project": "{project}", "title": "New"},
+        201,
+        3,
+    ),
+    ("task-overdue", "get", "/api/tasks/overdue/", None, 200, 3),
+    ("task-detail", "get", "/api/tasks/{task}/", None, 200, 2),
+    ("task-detail-expand", "get", "/api/tasks/{task}/?expand=comments", None, 200, 3),
+    ("task-update", "patch", "/api/tasks/{task}/", {"title": "Renamed"}, 200, 7),
+    ("task-delete", "delete", "/api/tasks/{task}/", None, 204, 8),
+    (
+        "task-update-status",
+        "patch",
+        "/api/tasks/{task}/update_status/",
+        {"status": "done"},
+        200,
+        8,
+    ),
+    ("task-comments", "get", "/api/tasks/{task}/comments/", None, 200, 3),
+    ("task-history", "get", "/api/tasks/{task}/history/", None, 200, 3),
+    (
+        "task-history-archived",
+        "get",
+        "/api/tasks/{task}/history/?archived=true",
+        None,
+        200,
+        3,
+    ),
+    ("comment-list", "get", "/api/comments/", None, 200, 3),
+    ("comment-list-task", "get", "/api/comments/?task={task}", None, 200, 4),
+    (
+        "comment-create",
+        "post",
+        "/api/comments/",
+        {"task": "{task}", "content": "Hi"},
+        201,
+        3,
+    ),
+    ("comment-detail", "get", "/api/comments/{comment}/", None, 200, 2),
+    (
+        "comment-update",
+        "patch",
+        "/api/comments/{comment}/",
+        {"content": "Edited"},
+        200,
+        4,
+    ),
+    ("comment-delete", "delete", "/api/comments/{comment}/", None, 204, 4),
+    ("user-list", "get", "/api/users/", None, 200, 2),
+    ("user-detail", "get", "/api/users/{member}/", None, 200, 1),
+    ("user-search", "get", "/api/users/search/?q=member", None, 200, 1),
+    ("notification-list", "get", "/api/notifications/", None, 200, 1),
+    (
+        "notification-read",
+        "post",
+        "/api/notifications/{notification}/read/",
+        None,
+        200,
+        3,
+    ),
+    ("notification-read-all", "post", "/api/notifications/read-all/", None, 200, 1),
+    (
+        "notification-unread-count",
+        "get",
+        "/api/notifications/unread-count/",
+        None,
+        200,
+        1,
+    ),
+]
+
+
+def fill(value, params):
+    if isinstance(value, str):
+        return value.format(**params)
+    if isinstance(value, dict):
+        return {key: fill(item, params) for key, item in value.items()}
+    return value
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "name, method, path, body, status, queries",
+    ROUTES,
+    ids=[route[0] for route in ROUTES],
+)
+def test_route_query_count(
+    query_budgets,
+    dataset,
+    api_client,
+    user,
+    another_user,
+    name,
+    method,
+    path,
+    body,
+    status,
+    queries,
+):
+    refresh = RefreshToken.for_user(user)
+    params = {
+        "project": dataset.project.id,
+        "task": dataset.task.id,
+        "comment": dataset.comment.id,
+        "member": dataset.member.id,
+        "outsider": another_user.id,
+        "notification": dataset.notification.id,
+        "refresh": str(refresh),
+    }
+    api_client.force_authenticate(user=user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = getattr(api_client, method)(
+            fill(path, params), fill(body, params), format="json"
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+
+    assert response.status_code == status, response.content
+    assert len(context) == queries, "\n".join(
+        query["sql"] for query in context.captured_queries
+    )
+    assert elapsed < SLOW_ROUTES_CEILING_MS.get(name, LATENCY_CEILING_MS)
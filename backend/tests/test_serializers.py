@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from api.models import Project, ProjectMember, Task
+from api.serializers import (
+    FastProjectListSerializer,
+    FastTaskListSerializer,
+    ProjectListSerializer,
+    TaskListSerializer,
+)
+
+
+def make_tasks(project, user, count):
+    now = timezone.now()
+    Task.objects.bulk_create(
+        Task(
+            project=project,
+            title=f"Task {i}",
+            status=["todo", "in_progress", "review", "done"][i % 4],
+            priority="high",
+            deadline=now + timedelta(days=i % 7 - 3) if i % 3 else None,
+            assignee=user if i % 2 else None,
+            created_by=user,
+            order=i,
+        )
+        for i in range(count)
+    )
+    return Task.objects.filter(project=project).select_related(
+        "project", "assignee", "created_by"
+    )
+
+
+@pytest.mark.django_db
+def test_fast_task_list_matches_drf(project, user):
+    queryset = make_tasks(project, user, 12)
+
+    expected = TaskListSerializer(queryset, many=True).data
+    fast = FastTaskListSerializer()
+    assert fast.render(fast.rows(queryset)) == expected
+
+
+@pytest.mark.django_db
+def test_fast_project_list_matches_drf(project, another_user):
+    ProjectMember.objects.create(project=project, user=another_user, role="member")
+    queryset = Project.objects.select_related("owner").prefetch_related("members__user")
+
+    expected = ProjectListSerializer(queryset, many=True).data
+    fast = FastProjectListSerializer()
+    assert fast.render(fast.rows(queryset)) == expected
+
+
+@pytest.mark.django_db
+def test_fast_project_list_matches_drf_field_by_field(project, user, another_user):
+    ProjectMember.objects.create(project=project, user=another_user, role="member")
+    other = Project.objects.create(title="Other", owner=another_user)
+    ProjectMember.objects.create(project=other, user=another_user, role="owner")
+    ProjectMember.objects.create(project=other, user=user, role="viewer")
+    Project.objects.create(title="Empty", owner=user)
+    queryset = (
+        Project.objects.select_related("owner")
+        .prefetch_related("members__user")
+        .order_by("id")
+    )
+
+    expected = ProjectListSerializer(queryset, many=True).data
+    fast = FastProjectListSerializer()
+    rendered = fast.render(fast.rows(queryset))
+
+    assert len(rendered) == len(expected) == 3
+    for fast_row, drf_row in zip(rendered, expected):
+        assert list(fast_row) == list(drf_row)
+        for field, value in drf_row.items():
+            assert fast_row[field] == value, field
+    assert [len(row["members"]) for row in rendered] == [2, 2, 0]
+
+
+@pytest.mark.slow
+@pytest.mark.django_db
+def test_fast_task_list_throughput(project, user):
+    queryset = make_tasks(project, user, 500)
+
+    def rows_per_second(render):
+        started = time.perf_counter()
+        rows = len(render())
+        return rows / (time.perf_counter() - started)
+
+    drf = rows_per_second(lambda: TaskListSerializer(queryset.all(), many=True).data)
+    fast_serializer = FastTaskListSerializer()
+    fast = rows_per_second(
+        lambda: fast_serializer.render(fast_serializer.rows(queryset.all()))
+    )
+    assert fast > drf, f"TaskListSerializer: {drf:.0f} rows/s, fast: {fast:.0f} rows/s"
@@ -1,5 +1,17 @@
 import pytest
-from api.services import ProjectService, TaskService, CommentService
+from datetime import timedelta
+from django.utils import timezone
+from django_redis import get_redis_connection
+from api.models import Notification, Task, TaskHistory, TaskHistoryArchive
+from api.services import (
+    ProjectDeletionService,
+    ProjectService,
+    TaskService,
+    TaskHistoryService,
+    CommentService,
+    NotificationService,
+    PresenceService,
+)
 
 
 @pytest.mark.django_db
@@ -20,3 +32,127 @@ def test_create_comment(task, user):
     comment = CommentService.create_comment(task.id, user, "service test")
     assert comment.content == "service test"
     assert comment.task == task
+
+
+@pytest.mark.django_db
+def test_compact_task_history(task, user):
+    now = timezone.now()
+    first_save = TaskHistoryService.record_changes(
+        task, user, {"assignee_id": (None, user.id)}
+    )
+    second_save = TaskHistoryService.record_changes(
+        task, user, {"status": ("todo", "review"), "priority": ("medium", "high")}
+    )
+    TaskHistory.objects.filter(id__in=[h.id for h in first_save]).update(
+        changed_at=now - timedelta(days=201)
+    )
+    TaskHistory.objects.filter(id__in=[h.id for h in second_save]).update(
+        changed_at=now - timedelta(days=200)
+    )
+    TaskHistoryService.record_changes(task, user, {"status": ("review", "done")})
+
+    compacted = TaskHistoryService.compact_history(
+        now - timedelta(days=90), batch_size=2
+    )
+
+    assert compacted == 3
+    assert TaskHistory.objects.filter(task=task).count() == 1
+    archived = list(TaskHistoryArchive.objects.filter(task=task))
+    assert [a.changes for a in archived] == [
+        {"status": ["todo", "review"], "priority": ["medium", "high"]},
+        {"assignee_id": ["", str(user.id)]},
+    ]
+
+
+@pytest.mark.django_db
+def test_notifications_are_coalesced_within_digest_window(task, user, another_user):
+    for _ in range(3):
+        NotificationService.notify(user.id, "task_updated", "Task Updated", task=task)
+    NotificationService.notify(user.id, "comment_created", "New Comment", task=task)
+
+    digest = Notification.objects.get(recipient=user, kind="task_updated")
+    assert digest.count == 3
+    assert NotificationService.get_unread_count(user.id) == 2
+
+    Notification.objects.filter(pk=digest.pk).update(
+        updated_at=timezone.now() - timedelta(hours=1)
+    )
+    NotificationService.notify(user.id, "task_updated", "Task Updated", task=task)
+    assert NotificationService.get_unread_count(user.id) == 3
+
+    assert NotificationService.mark_read(user) == 3
+    assert NotificationService.get_unread_count(user.id) == 0
+    assert NotificationService.get_unread_count(another_user.id) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unread_count_follows_cascading_deletes(project, task, user):
+    other = Task.objects.create(project=project, title="Other", created_by=user)
+    for notified in [task, other]:
+        NotificationService.notify(
+            user.id, "task_updated", "Task Updated", task=notified
+        )
+    assert NotificationService.get_unread_count(user.id) == 2
+
+    task.delete()
+    assert NotificationService.get_unread_count(user.id) == 1
+
+    ProjectDeletionService._delete_tasks([other.id])
+    assert NotificationService.get_unread_count(user.id) == 0
+
+
+@pytest.mark.django_db
+def test_presence_diffs_are_batched(project, user, another_user):
+    assert PresenceService.join(project.id, user.id, "a") is True
+    # Inside the broadcast interval the first caller's flush covers later changes
+    assert PresenceService.join(project.id, another_user.id, "b") is False
+    assert PresenceService.leave(project.id, user.id, "a") is False
+
+    assert PresenceService.flush(project.id) == {
+        "joined": [another_user.id],
+        "left": [user.id],
+    }
+    assert PresenceService.flush(project.id) is None
+    assert PresenceService.get_viewers(project.id) == [another_user.id]
+    assert PresenceService.heartbeat(project.id, another_user.id, "b") is False
+
+
+@pytest.mark.django_db
+def test_presence_counts_sockets_and_heartbeats_keep_the_keys(project, user):
+    key = f"presence:project:{project.id}"
+    PresenceService.join(project.id, user.id, "a")
+    PresenceService.join(project.id, user.id, "b")
+    PresenceService.flush(project.id)
+
+    # Closing one of two tabs keeps the viewer
+    assert PresenceService.leave(project.id, user.id, "a") is False
+    assert PresenceService.get_viewers(project.id) == [user.id]
+
+    redis = get_redis_connection("default")
+    redis.expire(key, 1)
+    redis.expire(f"{key}:sockets:{user.id}", 1)
+    PresenceService.heartbeat(project.id, user.id, "b")
+    assert redis.ttl(key) > 1
+    assert redis.ttl(f"{key}:sockets:{user.id}") > 1
+
+    PresenceService.leave(project.id, user.id, "b")
+    assert PresenceService.flush(project.id) == {"joined": [], "left": [user.id]}
+    assert PresenceService.get_viewers(project.id) == []
+
+
+@pytest.mark.django_db
+def test_presence_rejoin_after_expiry_keeps_every_open_socket(project, user):
+    for socket in ["a", "b"]:
+        PresenceService.join(project.id, user.id, socket)
+    PresenceService.flush(project.id)
+
+    # Both tabs missed their heartbeats, then both come back
+    redis = get_redis_connection("default")
+    redis.zadd(f"presence:project:{project.id}", {user.id: 0})
+    assert PresenceService.flush(project.id) == {"joined": [], "left": [user.id]}
+    for socket in ["a", "b"]:
+        PresenceService.heartbeat(project.id, user.id, socket)
+    PresenceService.flush(project.id)
+
+    assert PresenceService.leave(project.id, user.id, "a") is False
+    assert PresenceService.get_viewers(project.id) == [user.id]
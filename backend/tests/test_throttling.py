@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from rest_framework.test import APIClient
+
+from api import throttling
+
+
+@pytest.fixture
+def rates(settings):
+    def override(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                **settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+                **rates,
+            },
+        }
+
+    return override
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_reads_and_writes_have_separate_user_budgets(auth_client, project, rates):
+    rates(user_read="2/min", user_write="5/min")
+
+    first = auth_client.get("/api/notifications/")
+    assert first.status_code == 200
+    assert first["X-RateLimit-Limit"] == "2"
+    assert first["X-RateLimit-Remaining"] == "1"
+    assert auth_client.get("/api/notifications/").status_code == 200
+
+    throttled = auth_client.get("/api/notifications/")
+    assert throttled.status_code == 429
+    assert throttled["X-RateLimit-Remaining"] == "0"
+    assert int(throttled["Retry-After"]) > 0
+
+    response = auth_client.post(
+        "/api/tasks/", {"project": project.id, "title": "Write"}, format="json"
+    )
+    assert response.status_code == 201
+    assert response["X-RateLimit-Remaining"] == "4"
+
+
+@pytest.mark.django_db
+def test_project_budget_is_shared_by_its_members(
+    project_with_members, user, another_user, rates
+):
+    rates(project_read="3/min")
+    path = f"/api/projects/{project_with_members.id}/"
+    statuses = [
+        client_for(member).get(path).status_code
+        for member in (user, another_user, user, another_user)
+    ]
+    assert statuses == [200, 200, 200, 429]
+    # Other projects keep their own budget
+    assert client_for(user).get("/api/projects/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_endpoint_class_budget(auth_client, rates):
+    rates(search="1/min")
+    assert auth_client.get("/api/users/search/?q=test").status_code == 200
+    assert auth_client.get("/api/users/search/?q=test").status_code == 429
+    assert auth_client.get("/api/auth/me/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_refused_requests_do_not_spend_other_budgets(auth_client, project, rates):
+    rates(user_read="1/min", project_read="2/min")
+    path = f"/api/projects/{project.id}/"
+    assert auth_client.get(path).status_code == 200
+    assert auth_client.get(path).status_code == 429
+    assert auth_client.get(path).status_code == 429
+    assert throttling._sliding_window(f"throttle:project:{project.id}:read", 60, 2)[0]
+
+
+@pytest.mark.django_db
+def test_later_refusals_give_back_earlier_budgets(auth_client, project, rates):
+    # UserRateThrottle runs first and is charged before the project refuses
+    rates(user_read="2/min", project_read="1/min")
+    path = f"/api/projects/{project.id}/"
+    assert auth_client.get(path).status_code == 200
+    assert auth_client.get(path).status_code == 429
+    response = auth_client.get("/api/notifications/")
+    assert response.status_code == 200
+    assert response["X-RateLimit-Remaining"] == "0"
+
+
+@pytest.mark.django_db
+def test_non_members_do_not_spend_a_project_budget(project, user, another_user, rates):
+    rates(project_read="1/min")
+    outsider = client_for(another_user)
+    for _ in range(3):
+        outsider.get(f"/api/tasks/?project={project.id}")
+    assert client_for(user).get(f"/api/tasks/?project={project.id}").status_code == 200
+
+
+def test_sliding_window_admits_exactly_the_limit_under_concurrency():
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(
+                lambda _: throttling._sliding_window("throttle:test:burst", 60, 5)[0],
+                range(20),
+            )
+        )
+    assert results.count(True) == 5
+
+
+def test_sliding_window_weighs_the_previous_window(monkeypatch):
+    clock = [600.0]
+    monkeypatch.setattr(throttling.time, "time", lambda: clock[0])
+    key = "throttle:test:sliding"
+    assert [throttling._sliding_window(key, 60, 4)[0] for _ in range(5)] == [
+        True,
+        True,
+        True,
+        True,
+        False,
+    ]
+
+    # Halfway through the next window half of the previous one still counts
+    clock[0] = 690.0
+    assert [throttling._sliding_window(key, 60, 4)[0] for _ in range(3)] == [
+        True,
+        True,
+        False,
+    ]
+
+
+def test_counters_fall_back_to_the_django_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    results = [throttling._sliding_window("throttle:t", 60, 2) for _ in range(3)]
+    assert [allowed for allowed, *_ in results] == [True, True, False]
+    throttling.SlidingWindowThrottle.refund([results[1][3]])
+    assert throttling._sliding_window("throttle:t", 60, 2)[0] is True
+
+    counts = [throttling._window_count("throttle:w", 300, True)[0] for _ in range(2)]
+    assert counts == [1, 2]
+    assert throttling._window_count("throttle:w", 300, False)[0] == 2
@@ -1,4 +1,18 @@
 import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from api.models import Comment, Notification, Project, ProjectMember, Task
+from api.services import (
+    NotificationService,
+    PresenceService,
+    ProjectDeletionService,
+    RealtimeService,
+    TaskHistoryService,
+)
 
 
 @pytest.mark.django_db
@@ -39,6 +53,53 @@ def test_task_crud(auth_client, project):
     assert res3.status_code == 204
 
 
+@pytest.mark.django_db
+def test_overdue_filter_and_cross_project_endpoint(
+    auth_client, project, user, another_user
+):
+    past = timezone.now() - timedelta(days=1)
+    other = Project.objects.create(title="Other", owner=user)
+    ProjectMember.objects.create(project=other, user=user, role="owner")
+    foreign = Project.objects.create(title="Foreign", owner=another_user)
+    ProjectMember.objects.create(project=foreign, user=another_user, role="owner")
+
+    def add(target, title, deadline, status="todo"):
+        return Task.objects.create(
+            project=target,
+            title=title,
+            deadline=deadline,
+            status=status,
+            created_by=target.owner,
+        )
+
+    late = add(project, "Late", past)
+    add(project, "Done late", past, status="done")
+    add(project, "Future", timezone.now() + timedelta(days=1))
+    add(project, "No deadline", None)
+    older = add(other, "Older", past - timedelta(days=1), status="review")
+    add(foreign, "Not mine", past)
+
+    res = auth_client.get(f"/api/tasks/?project={project.id}&overdue=true")
+    assert [t["title"] for t in res.data["results"]] == ["Late"]
+    assert res.data["results"][0]["is_overdue"] is True
+    res = auth_client.get(f"/api/tasks/?project={project.id}&overdue=false")
+    assert {t["title"] for t in res.data["results"]} == {
+        "Done late",
+        "Future",
+        "No deadline",
+    }
+
+    res = auth_client.get("/api/tasks/overdue/")
+    assert res.status_code == 200
+    assert res.data["count"] == 2
+    assert [t["id"] for t in res.data["results"]] == [older.id, late.id]
+    assert all(t["is_overdue"] for t in res.data["results"])
+
+    # The annotation loaded with the task must not outlive an update
+    res = auth_client.patch(f"/api/tasks/{late.id}/", {"status": "done"})
+    assert res.data["is_overdue"] is False
+
+
 @pytest.mark.django_db
 def test_comment_api(auth_client, task):
     res = auth_client.post("/api/comments/", {"task": task.id, "content": "Hello!"})
@@ -54,3 +115,385 @@ def test_comment_api(auth_client, task):
         else res2.data
     )
     assert any("Hello!" in c["content"] for c in comments)
+
+
+@pytest.mark.django_db
+def test_task_history(auth_client, task, user):
+    auth_client.patch(
+        f"/api/tasks/{task.id}/update_status/", {"status": "review"}, format="json"
+    )
+
+    res = auth_client.get(f"/api/tasks/{task.id}/history/")
+    assert res.status_code == 200
+    assert res.data["results"][0]["field_name"] == "status"
+    assert res.data["results"][0]["new_value"] == "review"
+
+    res2 = auth_client.get(f"/api/tasks/{task.id}/history/?archived=true")
+    assert res2.status_code == 200
+    assert res2.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_project_activity_keyset_pages(auth_client, project, task, user):
+    for new_status in ["in_progress", "review", "done"]:
+        TaskHistoryService.record_changes(task, user, {"status": ("todo", new_status)})
+
+    res = auth_client.get(f"/api/projects/{project.id}/activity/?page_size=2")
+    assert res.status_code == 200
+    assert [h["new_value"] for h in res.data["results"]] == ["done", "review"]
+    assert res.data["results"][0]["task_title"] == task.title
+
+    res2 = auth_client.get(res.data["next"])
+    assert [h["new_value"] for h in res2.data["results"]] == ["in_progress"]
+    assert res2.data["next"] is None
+
+    res3 = auth_client.get(f"/api/projects/{project.id}/activity/?cursor=bogus")
+    assert res3.status_code == 404
+
+
+@pytest.mark.django_db
+def test_task_detail_comments_are_opt_in(auth_client, task, comment):
+    res = auth_client.get(f"/api/tasks/{task.id}/")
+    assert res.status_code == 200
+    assert "comments" not in res.data
+
+    res2 = auth_client.get(f"/api/tasks/{task.id}/?expand=comments")
+    assert [c["content"] for c in res2.data["comments"]] == ["Test comment"]
+
+    res3 = auth_client.get(f"/api/tasks/{task.id}/?fields=id,title")
+    assert set(res3.data) == {"id", "title"}
+
+    res4 = auth_client.get(f"/api/tasks/{task.id}/comments/")
+    assert res4.status_code == 200
+    assert res4.data["results"][0]["author"]["username"] == "testuser"
+    assert res4.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_task_comments_expand_loads_authors_in_one_query(
+    auth_client, task, user, another_user, django_assert_num_queries
+):
+    Comment.objects.create(task=task, author=user, content="first")
+    # Warm the cached member roles so both measured requests skip them
+    auth_client.get(f"/api/tasks/{task.id}/")
+    with CaptureQueriesContext(connection) as single_author:
+        auth_client.get(f"/api/tasks/{task.id}/?expand=comments")
+
+    for i in range(5):
+        author = another_user if i % 2 else user
+        Comment.objects.create(task=task, author=author, content=f"c{i}")
+
+    with django_assert_num_queries(len(single_author)):
+        res = auth_client.get(f"/api/tasks/{task.id}/?expand=comments")
+    assert len(res.data["comments"]) == 6
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets_prune_serializer_and_query(auth_client, project, task):
+    with CaptureQueriesContext(connection) as queries:
+        res = auth_client.get(
+            f"/api/tasks/?project={project.id}&fields=id,title,assignee.id"
+        )
+    assert res.status_code == 200
+    assert res.data["results"][0] == {
+        "id": task.id,
+        "title": "Test Task",
+        "assignee": {"id": task.assignee_id},
+    }
+    task_sql = [q["sql"] for q in queries if "api_task" in q["sql"]][-1]
+    assert "description" not in task_sql
+    assert "email" not in task_sql
+
+    res2 = auth_client.get("/api/projects/?fields=id,name")
+    assert res2.data["results"] == [{"id": project.id, "name": "Test Project"}]
+
+
+@pytest.mark.django_db
+def test_project_list_members_are_prefetched(auth_client, user, another_user):
+    def add_project(title):
+        project = Project.objects.create(title=title, owner=user)
+        ProjectMember.objects.create(project=project, user=user, role="owner")
+        ProjectMember.objects.create(project=project, user=another_user)
+
+    add_project("First")
+    with CaptureQueriesContext(connection) as one_project:
+        auth_client.get("/api/projects/")
+
+    for i in range(4):
+        add_project(f"Project {i}")
+    with CaptureQueriesContext(connection) as five_projects:
+        res = auth_client.get("/api/projects/")
+
+    assert len(res.data["results"]) == 5
+    assert len(five_projects) == len(one_project)
+
+
+@pytest.mark.django_db
+def test_project_board_snapshot_and_etag(auth_client, project, task, user):
+    res = auth_client.get(f"/api/projects/{project.id}/board/")
+    assert res.status_code == 200
+    columns = {c["status"]: c["tasks"] for c in res.data["columns"]}
+    assert list(columns) == ["todo", "in_progress", "review", "done"]
+    assert [t["id"] for t in columns["todo"]] == [task.id]
+    assert res.data["members"][0]["role"] == "owner"
+
+    etag = res["ETag"]
+    res2 = auth_client.get(
+        f"/api/projects/{project.id}/board/", HTTP_IF_NONE_MATCH=etag
+    )
+    assert res2.status_code == 304
+
+    auth_client.patch(f"/api/tasks/{task.id}/", {"status": "done"}, format="json")
+    res3 = auth_client.get(
+        f"/api/projects/{project.id}/board/", HTTP_IF_NONE_MATCH=etag
+    )
+    assert res3.status_code == 200
+    assert res3["ETag"] != etag
+    columns = {c["status"]: c["tasks"] for c in res3.data["columns"]}
+    assert [t["id"] for t in columns["done"]] == [task.id]
+
+    user.first_name = "Renamed"
+    user.save()
+    res4 = auth_client.get(
+        f"/api/projects/{project.id}/board/", HTTP_IF_NONE_MATCH=res3["ETag"]
+    )
+    assert res4.status_code == 200
+    assert res4.data["members"][0]["first_name"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_project_board_query_count_is_fixed(
+    auth_client, project, user, another_user, django_assert_max_num_queries
+):
+    ProjectMember.objects.create(project=project, user=another_user, role="member")
+    for i in range(20):
+        Task.objects.create(
+            project=project, title=f"Task {i}", created_by=user, assignee=another_user
+        )
+
+    with django_assert_max_num_queries(4):
+        res = auth_client.get(f"/api/projects/{project.id}/board/")
+    assert sum(len(c["tasks"]) for c in res.data["columns"]) == 20
+
+    with django_assert_max_num_queries(2):
+        auth_client.get(f"/api/projects/{project.id}/board/")
+
+
+@pytest.mark.django_db
+def test_conditional_get_on_lists_and_details(auth_client, project, task, comment):
+    for url in [
+        f"/api/tasks/?project={project.id}",
+        f"/api/tasks/{task.id}/",
+        "/api/projects/",
+        f"/api/projects/{project.id}/",
+        f"/api/comments/{comment.id}/",
+    ]:
+        res = auth_client.get(url)
+        assert res.status_code == 200
+        assert res.has_header("Last-Modified")
+        res2 = auth_client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+        assert res2.status_code == 304, url
+        assert not res2.content
+
+
+@pytest.mark.django_db
+def test_conditional_get_detects_changes(auth_client, project, task, another_user):
+    res = auth_client.get(f"/api/tasks/?project={project.id}")
+    auth_client.delete(f"/api/tasks/{task.id}/")
+    res2 = auth_client.get(
+        f"/api/tasks/?project={project.id}", HTTP_IF_NONE_MATCH=res["ETag"]
+    )
+    assert res2.status_code == 200
+
+    res3 = auth_client.get("/api/projects/")
+    auth_client.post(
+        f"/api/projects/{project.id}/members/add/",
+        {"user_id": another_user.id, "role": "member"},
+        format="json",
+    )
+    res4 = auth_client.get("/api/projects/", HTTP_IF_NONE_MATCH=res3["ETag"])
+    assert res4.status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_etags_cover_embedded_rows_and_the_clock(
+    auth_client, project, task, comment, user
+):
+    tasks_url = f"/api/tasks/?project={project.id}"
+    comments_url = f"/api/comments/?task={task.id}"
+
+    def changed(url, change):
+        etag = auth_client.get(url)["ETag"]
+        change()
+        return auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    assert changed(
+        tasks_url,
+        lambda: auth_client.patch(f"/api/projects/{project.id}/", {"name": "X"}),
+    )
+
+    def rename_user():
+        user.first_name = "Renamed"
+        user.save()
+
+    assert changed(comments_url, rename_user)
+    # A deadline passing changes is_overdue without touching updated_at
+    assert changed(
+        tasks_url,
+        lambda: Task.objects.filter(pk=task.pk).update(
+            deadline=timezone.now() - timedelta(minutes=1)
+        ),
+    )
+    # Logins don't invalidate anything
+    assert not changed(
+        tasks_url,
+        lambda: User.objects.filter(pk=user.pk)
+        .first()
+        .save(update_fields=["last_login"]),
+    )
+
+
+@pytest.mark.django_db
+def test_project_detail_shows_renamed_members(auth_client, project, another_user):
+    ProjectMember.objects.create(project=project, user=another_user, role="member")
+    url = f"/api/projects/{project.id}/"
+    etag = auth_client.get(url)["ETag"]
+
+    another_user.first_name = "Renamed"
+    another_user.save()
+    res = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert res.status_code == 200
+    names = {m["user"]["id"]: m["user"]["first_name"] for m in res.data["members"]}
+    assert names[another_user.id] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_notification_inbox(api_client, project_with_members, user, another_user):
+    task = Task.objects.create(
+        project=project_with_members, title="Shared", created_by=user, assignee=user
+    )
+    api_client.force_authenticate(user=another_user)
+    for content in ["first", "second"]:
+        response = api_client.post(
+            "/api/comments/", {"task": task.id, "content": content}
+        )
+        assert response.status_code == 201
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get("/api/notifications/unread-count/")
+    assert response.data == {"unread_count": 1}
+
+    response = api_client.get("/api/notifications/?unread=true")
+    assert response.status_code == 200
+    [notification] = response.data["results"]
+    assert notification["kind"] == "comment_created"
+    assert notification["count"] == 2
+
+    response = api_client.post(f"/api/notifications/{notification['id']}/read/")
+    assert response.data == {"unread_count": 0}
+    assert api_client.get("/api/notifications/?unread=true").data["results"] == []
+
+    api_client.force_authenticate(user=another_user)
+    response = api_client.post(f"/api/notifications/{notification['id']}/read/")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_notification_pages_ignore_digest_updates(api_client, task, user):
+    for kind in ["task_updated", "comment_created", "comment_created"]:
+        Notification.objects.create(recipient=user, task=task, kind=kind, title=kind)
+    api_client.force_authenticate(user=user)
+    first = api_client.get("/api/notifications/?page_size=2")
+
+    # A digest bump of an unseen row must not move it onto the first page
+    oldest = Notification.objects.order_by("id").first()
+    NotificationService.notify(user.id, oldest.kind, oldest.title, task=task)
+    second = api_client.get(first.data["next"])
+
+    ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+    assert sorted(ids) == sorted(Notification.objects.values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+def test_project_viewers(auth_client, project, user, another_user):
+    PresenceService.join(project.id, user.id, "a")
+    PresenceService.join(project.id + 1, another_user.id, "b")
+
+    response = auth_client.get(f"/api/projects/{project.id}/viewers/")
+    assert response.status_code == 200
+    assert [viewer["id"] for viewer in response.data] == [user.id]
+
+
+@pytest.mark.django_db
+def test_no_new_tasks_in_a_project_being_deleted(auth_client, project, task, user):
+    ProjectDeletionService.start(project, user)
+    data = {"title": "Late Task", "project": project.id}
+
+    response = auth_client.post("/api/tasks/", data)
+    assert response.status_code == 403
+
+    # Without the cached progress the serializer still sees the status
+    cache.delete(ProjectDeletionService._progress_key(project.id))
+    response = auth_client.post("/api/tasks/", data)
+    assert response.status_code == 400
+    assert "project" in response.data
+
+    assert not Task.objects.filter(title="Late Task").exists()
+
+
+@pytest.mark.django_db
+def test_tasks_of_a_project_being_deleted_are_hidden(
+    auth_client, project, task, comment, user
+):
+    ProjectDeletionService.start(project, user)
+
+    response = auth_client.get(f"/api/tasks/?project={project.id}")
+    assert response.data["results"] == []
+    assert auth_client.get(f"/api/tasks/{task.id}/").status_code == 404
+    response = auth_client.patch(f"/api/tasks/{task.id}/", {"title": "Late edit"})
+    assert response.status_code == 404
+    assert auth_client.get(f"/api/comments/{comment.id}/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_project_deletion_runs_in_batches(
+    auth_client,
+    project,
+    comment,
+    user,
+    another_user,
+    settings,
+    monkeypatch,
+    django_capture_on_commit_callbacks,
+):
+    settings.PROJECT_DELETE_IN_BACKGROUND = False
+    settings.PROJECT_DELETE_BATCH_SIZE = 2
+    Task.objects.bulk_create(
+        [Task(project=project, title=f"Task {i}", created_by=user) for i in range(4)]
+    )
+    TaskHistoryService.record_changes(comment.task, user, {"status": ("todo", "done")})
+    events = []
+    monkeypatch.setattr(
+        RealtimeService,
+        "send_to_project",
+        lambda project_id, event_type, payload: events.append(event_type),
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = auth_client.delete(f"/api/projects/{project.id}/")
+    assert response.status_code == 202
+    assert response.data["tasks_total"] == 5
+
+    assert not Project.objects.filter(pk=project.pk).exists()
+    assert not Task.objects.filter(project_id=project.id).exists()
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+    # One event for the whole project instead of task_deleted per task
+    assert events == ["project_deleted"]
+
+    response = auth_client.get(f"/api/projects/{project.id}/deletion/")
+    assert response.data["status"] == "deleted"
+    assert response.data["tasks_deleted"] == 5
+
+    auth_client.force_authenticate(user=another_user)
+    response = auth_client.get(f"/api/projects/{project.id}/deletion/")
+    assert response.status_code == 404